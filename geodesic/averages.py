@@ -0,0 +1,208 @@
+import numpy as np
+from numpy import sqrt, errstate, asarray, broadcast_arrays
+from scipy.special import ellipk, elliprd
+
+try:
+    from geodesic.elliptic import ellippi
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.constants.constants_gen import calc_f, calc_d
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+    from geodesic.frequencies_batch import radial_r2_average
+    from geodesic.frequencies_quad import QUAD_NODES, radial_quadrature, polar_quadrature
+except:
+    from .elliptic import ellippi
+    from .constants.constants import calc_constants_batch
+    from .constants.constants_gen import calc_f, calc_d
+    from .geo_roots import radial_roots_batch, polar_roots_batch
+    from .frequencies_batch import radial_r2_average
+    from .frequencies_quad import QUAD_NODES, radial_quadrature, polar_quadrature
+
+# ------------------------------------------------------------------------------
+#  Mino time averages over bound orbits
+#
+#  r(lambda) and z(lambda) are independent, so the Mino time average of a
+#  function of r (or z) is an average over one radial (or polar) period.
+#  Polynomials of low degree in r and z have closed forms in K, E and Pi of
+#  the radial and polar moduli; everything else is integrated with the
+#  midpoint rule in psi and chi of frequencies_quad, at a fixed number of
+#  nodes per orbit.
+#
+#  The constants_gen functions calc_delta, calc_f, calc_h and calc_d take
+#  zm = sqrt(1 - x^2) as a constant of the orbit, so only r is averaged.
+# ------------------------------------------------------------------------------
+
+
+def _orbits(aa, slr, ecc, x):
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    return aa, slr, ecc, x, En, Lz, Q
+
+
+def _average(values, dlam):
+    return (dlam * values).sum(-1) / dlam.sum(-1)
+
+
+def radial_average_batch(func, aa, slr, ecc, x, n=QUAD_NODES):
+    """
+    Mino time average of func(r) over the radial motion, by quadrature.
+
+    Parameters:
+        func (function): called with r of shape S + (n,); orbit parameters
+            it depends on need a trailing axis of length 1
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        avg (array): <func(r)>
+    """
+    aa, slr, ecc, x, En, Lz, Q = _orbits(aa, slr, ecc, x)
+    r, dlam = radial_quadrature(En, Lz, Q, aa, slr, ecc, n)
+    return _average(func(r), dlam)
+
+
+def polar_average_batch(func, aa, slr, ecc, x, n=QUAD_NODES):
+    """
+    Mino time average of func(z) over the polar motion, by quadrature,
+    with z = cos(theta).
+
+    Parameters:
+        func (function): called with z of shape S + (n,); orbit parameters
+            it depends on need a trailing axis of length 1
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        avg (array): <func(z)>
+    """
+    aa, slr, ecc, x, En, Lz, Q = _orbits(aa, slr, ecc, x)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    z, dlam = polar_quadrature(zp, zm, En, aa, n)
+    return _average(func(z), dlam)
+
+
+def radial_r_average(r1, r2, r3, r4):
+    """
+    Mino time average of r over the radial motion.
+
+    Parameters:
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+
+    Returns:
+        r_avg (array): <r>
+    """
+    kr2 = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    hr = (r1 - r2) / (r1 - r3)
+    return r3 + (r2 - r3) * ellippi(hr, kr2) / ellipk(kr2)
+
+
+def polar_z2_average_zm(zp, zm, En, aa):
+    """
+    Mino time average of z^2 over the polar motion.
+
+    Unlike polar_z2_average this is not scaled by aa^2, and is finite for
+    aa = 0, where <z^2> = zm^2 / 2. (K - E) / k is written as the Carlson
+    integral R_D(0, 1 - k, 1) / 3, which has no cancellation at small k.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        aa (array): spin
+
+    Returns:
+        z2_avg (array): <z^2>
+    """
+    ktheta2 = (aa * aa * (1 - En * En) * zm * zm) / (zp * zp)
+    return zm * zm * elliprd(0, 1 - ktheta2, 1) / (3 * ellipk(ktheta2))
+
+
+def r_moments_batch(aa, slr, ecc, x, powers, n=QUAD_NODES):
+    """
+    Mino time averages <r^k> for a list of powers k (e.g. k = -1, -2, ...
+    for the inverse moments used in PN comparisons).
+
+    The radial nodes are computed once and shared by every power.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        powers (list): powers k
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        moments (array): shape S + (len(powers),)
+    """
+    aa, slr, ecc, x, En, Lz, Q = _orbits(aa, slr, ecc, x)
+    r, dlam = radial_quadrature(En, Lz, Q, aa, slr, ecc, n)
+    powers = asarray(powers, dtype=float)
+    w = dlam / dlam.sum(-1, keepdims=True)
+    return np.einsum("...n,...nk->...k", w, r[..., None] ** powers)
+
+
+def orbit_averages_batch(aa, slr, ecc, x, n=QUAD_NODES):
+    """
+    Mino time averages of r, r^2, z^2, Delta and Sigma, and of the
+    constants_gen functions calc_f, calc_h and calc_d, for arrays of orbits.
+
+    <r>, <r^2>, <z^2>, <Delta> = <r^2> - 2 <r> + aa^2,
+    <Sigma> = <r^2> + aa^2 <z^2> and <h> are closed forms; <f> and <d>,
+    which are quartic in r, are computed by quadrature.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        n (int): number of quadrature nodes for <f> and <d>
+
+    Returns:
+        r_avg (array): <r>
+        r2_avg (array): <r^2>
+        z2_avg (array): <z^2>
+        delta_avg (array): <Delta>
+        sigma_avg (array): <Sigma>
+        f_avg (array): <calc_f(r, zm, aa)>
+        h_avg (array): <calc_h(r, zm, aa)>, infinite for polar orbits
+        d_avg (array): <calc_d(r, zm, aa)>
+    """
+    aa, slr, ecc, x, En, Lz, Q = _orbits(aa, slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    r_avg = radial_r_average(r1, r2, r3, r4)
+    r2_avg = radial_r2_average(r1, r2, r3, r4)
+    z2_avg = polar_z2_average_zm(zp, zm, En, aa)
+    aa2 = aa * aa
+    delta_avg = r2_avg - 2 * r_avg + aa2
+    sigma_avg = r2_avg + aa2 * z2_avg
+
+    # the zm of calc_f, calc_h and calc_d is sqrt(1 - x^2)
+    zm_x = sqrt(1 - x * x)
+    with errstate(divide="ignore"):
+        h_avg = r2_avg - 2 * r_avg + zm_x * zm_x * delta_avg / (x * x)
+
+    r, dlam = radial_quadrature(En, Lz, Q, aa, slr, ecc, n)
+    zm_x, aa_n = zm_x[..., None], aa[..., None]
+    f_avg = _average(calc_f(r, zm_x, aa_n), dlam)
+    d_avg = _average(calc_d(r, zm_x, aa_n), dlam)
+    return r_avg, r2_avg, z2_avg, delta_avg, sigma_avg, f_avg, h_avg, d_avg
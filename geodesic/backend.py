@@ -0,0 +1,461 @@
+from types import SimpleNamespace
+
+import numpy as np
+from numpy import asarray, broadcast_arrays, errstate
+from scipy.special import ellipk, ellipe, ellipeinc, ellipj
+
+try:
+    from geodesic.elliptic import ellippi, ellippiinc
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.constants.constants_gen import calc_d, calc_f, calc_g, calc_h
+    from geodesic.geo_roots import radial_roots_batch
+    from geodesic.precision import mp_context, precision, get_precision
+    from geodesic.double_double import (
+        DD,
+        DD_PI,
+        dd_sqrt,
+        dd_ellipk,
+        dd_ellipe,
+        dd_ellippi,
+    )
+except:
+    from .elliptic import ellippi, ellippiinc
+    from .constants.constants import calc_constants_batch
+    from .constants.constants_gen import calc_d, calc_f, calc_g, calc_h
+    from .geo_roots import radial_roots_batch
+    from .precision import mp_context, precision, get_precision
+    from .double_double import DD, DD_PI, dd_sqrt, dd_ellipk, dd_ellipe, dd_ellippi
+
+# ------------------------------------------------------------------------------
+#  Float64 and mpmath backends of the generic orbit pipeline
+#
+#  Constants -> roots -> Mino and Boyer-Lindquist frequencies -> coordinates
+#  of generic Kerr orbits (aa != 0, 0 < x^2 < 1, ecc > 0), written once
+#  against a backend namespace of elementary and elliptic functions:
+#
+#    float64: numpy, scipy.special and the Carlson forms of elliptic.py, on
+#             float64 arrays
+#    mpmath:  the same functions of mpmath, mapped over numpy object arrays
+#             of mpf with np.frompyfunc, at dps digits
+#    dd:      double-double arrays (double_double.py), ~32 digits, for
+#             constants, roots and frequencies only
+#
+#  The backend is chosen once, in calc_orbit, and every later stage of that
+#  orbit (calc_orbit_coords) uses it; no value changes type on the way. The
+#  mpmath backend evaluates in the precision context of the calling thread
+#  (geodesic.precision), set to the orbit's precision for each call.
+#
+#  Orbits that are not bound and stable (judged in float64) are nan; only
+#  the other entries are evaluated, so mpmath never sees them. SC,
+#  equatorial, spherical and polar orbits are nan as well and are marked in
+#  the "generic" flag of the orbit, as the kernels here hold only the
+#  generic expressions (see mino_freqs_batch for those).
+#
+#  As in mino_freqs and mino_freqs_batch, ups_theta is positive for
+#  retrograde orbits too, and calc_orbit_coords follows mino_coords.
+# ------------------------------------------------------------------------------
+
+BACKENDS = ("float64", "mpmath", "dd")
+ORBIT_KEYS = (
+    "En",
+    "Lz",
+    "Q",
+    "r1",
+    "r2",
+    "r3",
+    "r4",
+    "zp",
+    "zm",
+    "ups_r",
+    "ups_theta",
+    "ups_phi",
+    "gamma",
+    "omega_r",
+    "omega_theta",
+    "omega_phi",
+)
+
+
+def _float64_sn_am(u, m):
+    sn, __, __, am = ellipj(u, m)
+    return sn, am
+
+
+def _float64_ops():
+    return SimpleNamespace(
+        name="float64",
+        asarray=lambda v: asarray(v, dtype=float),
+        full=lambda shape: np.full(shape, np.nan),
+        pi=np.pi,
+        sqrt=np.sqrt,
+        sin=np.sin,
+        cos=np.cos,
+        arccos=np.arccos,
+        ellipk=ellipk,
+        ellipe=ellipe,
+        ellipeinc=ellipeinc,
+        ellippi=ellippi,
+        ellippiinc=ellippiinc,
+        sn_am=_float64_sn_am,
+    )
+
+
+def _mpmath_ops():
+    """
+    mpmath backend in the context of the calling thread, at its current
+    precision.
+    """
+    ctx = mp_context()
+
+    def sn_am(u, m):
+        # reduce u to [-K, K], where cn >= 0 and am = atan2(sn, cn)
+        K = ctx.ellipk(m)
+        j = ctx.nint(u / (2 * K))
+        v = u - 2 * K * j
+        sn = ctx.ellipfun("sn", v, m=m)
+        cn = ctx.ellipfun("cn", v, m=m)
+        return (-1) ** int(j) * sn, ctx.atan2(sn, cn) + j * ctx.pi
+
+    mpf = np.frompyfunc(ctx.mpf, 1, 1)
+    return SimpleNamespace(
+        name="mpmath",
+        asarray=lambda v: np.asarray(mpf(np.asarray(v, dtype=object)), dtype=object),
+        full=lambda shape: np.full(shape, ctx.nan, dtype=object),
+        pi=+ctx.pi,
+        sqrt=np.frompyfunc(ctx.sqrt, 1, 1),
+        sin=np.frompyfunc(ctx.sin, 1, 1),
+        cos=np.frompyfunc(ctx.cos, 1, 1),
+        arccos=np.frompyfunc(ctx.acos, 1, 1),
+        ellipk=np.frompyfunc(ctx.ellipk, 1, 1),
+        ellipe=np.frompyfunc(ctx.ellipe, 1, 1),
+        ellipeinc=np.frompyfunc(ctx.ellipe, 2, 1),
+        ellippi=np.frompyfunc(ctx.ellippi, 2, 1),
+        ellippiinc=np.frompyfunc(ctx.ellippi, 3, 1),
+        sn_am=np.frompyfunc(sn_am, 2, 2),
+    )
+
+
+def _dd_ops():
+    return SimpleNamespace(
+        name="dd",
+        asarray=DD,
+        full=lambda shape: DD(np.full(shape, np.nan)),
+        pi=DD_PI,
+        sqrt=dd_sqrt,
+        ellipk=dd_ellipk,
+        ellipe=dd_ellipe,
+        ellippi=dd_ellippi,
+    )
+
+
+def _ops(backend):
+    if backend == "float64":
+        return _float64_ops()
+    if backend == "mpmath":
+        return _mpmath_ops()
+    if backend == "dd":
+        return _dd_ops()
+    raise ValueError("backend must be one of %s" % (BACKENDS,))
+
+
+def _generic_constants(ops, aa, slr, ecc, x):
+    """
+    En, Lz, Q of generic orbits, as calc_gen_constants.
+    """
+    zm = ops.sqrt(1 - x * x)
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+    dr1, dr2 = calc_d(r1, zm, aa), calc_d(r2, zm, aa)
+    gr1, gr2 = calc_g(r1, aa), calc_g(r2, aa)
+    hr1, hr2 = calc_h(r1, zm, aa), calc_h(r2, zm, aa)
+    fr1, fr2 = calc_f(r1, zm, aa), calc_f(r2, zm, aa)
+
+    kappa = dr1 * hr2 - hr1 * dr2
+    epsilon = dr1 * gr2 - gr1 * dr2
+    rho = fr1 * hr2 - hr1 * fr2
+    eta = fr1 * gr2 - gr1 * fr2
+    sigma = gr1 * hr2 - hr1 * gr2
+    x2 = x * x
+
+    disc = sigma * (
+        -(eta * kappa * kappa) + epsilon * kappa * rho + epsilon * epsilon * sigma
+    )
+    En = ops.sqrt(
+        (kappa * rho + 2 * epsilon * sigma - 2 * ops.sqrt(disc / x2) * x)
+        / (rho * rho + 4 * eta * sigma)
+    )
+    En2 = En * En
+    Lz = (
+        -(En * gr1) + x * ops.sqrt((-(dr1 * hr1) + En2 * (gr1 * gr1 + fr1 * hr1)) / x2)
+    ) / hr1
+    Q = zm * zm * (aa * aa * (1 - En2) + Lz * Lz / x2)
+    return En, Lz, Q
+
+
+def _generic_roots(ops, En, Lz, Q, aa, slr, ecc, x):
+    """
+    r1, r2, r3, r4, zp, zm of generic orbits, as radial_roots and
+    polar_roots.
+    """
+    En2 = En * En
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+    AplusB = 2 / (1 - En2) - (r1 + r2)
+    AB = (aa * aa * Q) / ((1 - En2) * r1 * r2)
+    r3 = (AplusB + ops.sqrt(AplusB * AplusB - 4 * AB)) / 2
+    r4 = AB / r3
+    zm = ops.sqrt(1 - x * x)
+    zp = ops.sqrt(aa * aa * (1 - En2) + Lz * Lz / (x * x))
+    return r1, r2, r3, r4, zp, zm
+
+
+def _horizon_terms(ops, aa, r1, r2, r3):
+    rp = 1 + ops.sqrt(1 - aa * aa)
+    rm = 1 - ops.sqrt(1 - aa * aa)
+    hr = (r1 - r2) / (r1 - r3)
+    hp = ((r1 - r2) * (r3 - rp)) / ((r1 - r3) * (r2 - rp))
+    hm = ((r1 - r2) * (r3 - rm)) / ((r1 - r3) * (r2 - rm))
+    return rp, rm, hr, hp, hm
+
+
+def _generic_freqs(ops, r1, r2, r3, r4, zp, zm, En, Lz, aa):
+    """
+    Mino frequencies of generic orbits, as radial_sector and polar_sector
+    (M = 1).
+    """
+    aa2 = aa * aa
+    En2 = En * En
+    kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    rp, rm, hr, hp, hm = _horizon_terms(ops, aa, r1, r2, r3)
+
+    K_r = ops.ellipk(kr)
+    E_r = ops.ellipe(kr)
+    Pi_hr = ops.ellippi(hr, kr)
+    Im = (K_r - ((r2 - r3) * ops.ellippi(hm, kr)) / (r2 - rm)) / (r3 - rm)
+    Ip = (K_r - ((r2 - r3) * ops.ellippi(hp, kr)) / (r2 - rp)) / (r3 - rp)
+
+    ups_r = (ops.pi * ops.sqrt((1 - En2) * (r1 - r3) * (r2 - r4))) / (2 * K_r)
+    phi_r = (
+        aa
+        * (-(-(aa * Lz) + 2 * En * rm) * Im + (-(aa * Lz) + 2 * En * rp) * Ip)
+        / (K_r * (rp - rm))
+    )
+    r2_avg = (
+        (r1 - r3) * (r2 - r4) * E_r
+        + (-(r1 * r2) + r3 * (r1 + r2 + r3)) * K_r
+        + (r2 - r3) * (r1 + r2 + r3 + r4) * Pi_hr
+    ) / (2 * K_r)
+    t_r = (
+        4 * En
+        + (
+            2
+            * (
+                -(-2 * aa2 * En + (-(aa * Lz) + 4 * En) * rm) * Im
+                + (-2 * aa2 * En + (-(aa * Lz) + 4 * En) * rp) * Ip
+            )
+            / (rp - rm)
+            + 2 * En * (r3 * K_r + (r2 - r3) * Pi_hr)
+        )
+        / K_r
+        + En * r2_avg
+    )
+
+    zm2 = zm * zm
+    ktheta = (aa2 * (1 - En2) * zm2) / (zp * zp)
+    K_theta = ops.ellipk(ktheta)
+    ups_theta = (ops.pi * zp) / (2 * K_theta)
+    phi_z = Lz * ops.ellippi(zm2, ktheta) / K_theta
+    t_z = (En * zp * zp * (K_theta - ops.ellipe(ktheta))) / ((1 - En2) * K_theta)
+    return ups_r, ups_theta, phi_r + phi_z, t_r + t_z
+
+
+def _radial_phase(ops, qr, orbit):
+    """
+    r, delta_t_r and delta_phi_r at radial phase qr, as calc_rq, calc_t_r
+    and calc_phi_r.
+    """
+    r1, r2, r3, r4 = (orbit[k] for k in ("r1", "r2", "r3", "r4"))
+    En, Lz, aa = orbit["En"], orbit["Lz"], orbit["aa"]
+    kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    rp, rm, hr, hp, hm = _horizon_terms(ops, aa, r1, r2, r3)
+    sn, psi = ops.sn_am(qr * ops.ellipk(kr) / ops.pi, kr)
+
+    def J(n):
+        return (qr * ops.ellippi(n, kr)) / ops.pi - ops.ellippiinc(n, psi, kr)
+
+    Jr, Jp, Jm = J(hr), J(hp), J(hm)
+    root = ops.sqrt((1 - En * En) * (r1 - r3) * (r2 - r4))
+    s, c = ops.sin(psi), ops.cos(psi)
+    r = (-(r2 * (r1 - r3)) + (r1 - r2) * r3 * sn * sn) / (
+        -r1 + r3 + (r1 - r2) * sn * sn
+    )
+    t_r = -(
+        En
+        * (
+            -4
+            * (r2 - r3)
+            * (
+                -((-2 * aa * aa + (4 - (aa * Lz) / En) * rm) * Jm)
+                / ((r2 - rm) * (r3 - rm))
+                + ((-2 * aa * aa + (4 - (aa * Lz) / En) * rp) * Jp)
+                / ((r2 - rp) * (r3 - rp))
+            )
+            / (rp - rm)
+            + (r2 - r3) * (4 + r1 + r2 + r3 + r4) * Jr
+            + (r1 - r3)
+            * (r2 - r4)
+            * (
+                (qr * ops.ellipe(kr)) / ops.pi
+                - ops.ellipeinc(psi, kr)
+                + (hr * c * s * ops.sqrt(1 - kr * s * s)) / (1 - hr * s * s)
+            )
+        )
+        / root
+    )
+    phi_r = (
+        2
+        * aa
+        * En
+        * (
+            -((r2 - r3) * (-((aa * Lz) / En) + 2 * rm) * Jm) / ((r2 - rm) * (r3 - rm))
+            + ((r2 - r3) * (-((aa * Lz) / En) + 2 * rp) * Jp) / ((r2 - rp) * (r3 - rp))
+        )
+    ) / (root * (rp - rm))
+    return r, t_r, phi_r
+
+
+def _polar_phase(ops, qz, orbit):
+    """
+    theta, delta_t_theta and delta_phi_theta at polar phase qz, as
+    calc_zq, calc_t_z and calc_phi_z.
+    """
+    zp, zm, En, Lz, aa = (orbit[k] for k in ("zp", "zm", "En", "Lz", "aa"))
+    ktheta = (aa * aa * (1 - En * En) * zm * zm) / (zp * zp)
+    w = 2 * (ops.pi / 2 + qz)
+    sn, psi = ops.sn_am(w * ops.ellipk(ktheta) / ops.pi, ktheta)
+    theta = ops.arccos(zm * sn)
+    t_z = (En * zp * (w * ops.ellipe(ktheta) / ops.pi - ops.ellipeinc(psi, ktheta))) / (
+        1 - En * En
+    )
+    phi_z = -(
+        Lz
+        * (
+            w * ops.ellippi(zm * zm, ktheta) / ops.pi
+            - ops.ellippiinc(zm * zm, psi, ktheta)
+        )
+        / zp
+    )
+    return theta, t_z, phi_z
+
+
+def _valid(aa, slr, ecc, x):
+    """
+    Generic orbits, and those of them that are bound and stable, judged in
+    float64.
+    """
+    generic = (aa != 0) & (x != 0) & (x * x != 1) & (ecc != 0)
+    with errstate(invalid="ignore", divide="ignore"):
+        En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+        r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    return generic & (r2 > r3) & (En < 1), generic
+
+
+def _scatter(ops, valid, values):
+    """
+    Values of the valid entries into an array of valid.shape, nan elsewhere.
+    """
+    out = ops.full(valid.shape)
+    out[valid] = values
+    return out
+
+
+def calc_orbit(aa, slr, ecc, x, backend="float64", dps=None):
+    """
+    Constants, roots and frequencies of generic orbits (aa != 0,
+    0 < x^2 < 1, ecc > 0) in one backend. Other orbits give nan and are
+    marked by "generic".
+
+    Parameters:
+        aa (array): spin parameter
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc); with the
+            mpmath backend, strings are read at full precision
+
+    Keyword Args:
+        backend (str) ["float64"]: "float64" for float64 arrays, "mpmath"
+            for object arrays of mpf, "dd" for double_double.DD arrays
+        dps (int) [None]: decimal digits of the mpmath backend; the working
+            precision of the calling thread if None
+
+    Returns:
+        orbit (dict): aa, slr, ecc, x and the ORBIT_KEYS quantities, arrays
+            of the broadcast input shape, nan where the orbit is not generic
+            ("generic" is False) or not bound and stable ("valid" is
+            False); "backend" and "prec" record the backend for
+            calc_orbit_coords
+    """
+    if backend not in BACKENDS:
+        raise ValueError("backend must be one of %s" % (BACKENDS,))
+    params = broadcast_arrays(*(np.asarray(v) for v in (aa, slr, ecc, x)))
+    valid, generic = _valid(*(v.astype(float) for v in params))
+    prec = get_precision() if dps is None else None
+
+    with precision(prec=prec, dps=dps) as ctx:
+        ops = _ops(backend)
+        params = [ops.asarray(v) for v in params]
+        aa, slr, ecc, x = (v[valid] for v in params)
+        En, Lz, Q = _generic_constants(ops, aa, slr, ecc, x)
+        r1, r2, r3, r4, zp, zm = _generic_roots(ops, En, Lz, Q, aa, slr, ecc, x)
+        freqs = _generic_freqs(ops, r1, r2, r3, r4, zp, zm, En, Lz, aa)
+        ups_r, ups_theta, ups_phi, gamma = freqs
+        omegas = (ups_r / gamma, ups_theta / gamma, ups_phi / gamma)
+        values = (En, Lz, Q, r1, r2, r3, r4, zp, zm) + freqs + omegas
+        prec = ctx.prec
+
+    orbit = dict(zip(("aa", "slr", "ecc", "x"), params))
+    orbit.update((k, _scatter(ops, valid, v)) for k, v in zip(ORBIT_KEYS, values))
+    orbit.update(valid=valid, generic=generic, backend=backend, prec=prec)
+    return orbit
+
+
+def calc_orbit_coords(orbit, mino_t, qr0=0, qz0=0):
+    """
+    Coordinates of generic orbits in Mino time, in the backend of the
+    orbit, as mino_coords. Not available for the dd backend.
+
+    Parameters:
+        orbit (dict): output of calc_orbit
+        mino_t (array): Mino time, broadcast against the orbit arrays
+
+    Keyword Args:
+        qr0 (array) [0]: initial radial phase
+        qz0 (array) [0]: initial polar phase
+
+    Returns:
+        t (array): Boyer-Lindquist time
+        r (array): radius
+        theta (array): polar angle
+        phi (array): azimuthal angle
+    """
+    if orbit["backend"] == "dd":
+        raise ValueError("coordinates are not available in the dd backend")
+    keys = ("aa",) + ORBIT_KEYS
+    with precision(prec=orbit["prec"]):
+        ops = _ops(orbit["backend"])
+        arrays = broadcast_arrays(
+            orbit["valid"],
+            *(ops.asarray(v) for v in (mino_t, qr0, qz0)),
+            *(orbit[k] for k in keys),
+        )
+        valid = arrays[0]
+        mino_t, qr0, qz0 = (v[valid] for v in arrays[1:4])
+        sub = {k: v[valid] for k, v in zip(keys, arrays[4:])}
+
+        r, t_r, phi_r = _radial_phase(ops, qr0 + sub["ups_r"] * mino_t, sub)
+        theta, t_z, phi_z = _polar_phase(ops, qz0 + sub["ups_theta"] * mino_t, sub)
+        __, Ct_r, Cz_r = _radial_phase(ops, qr0, sub)
+        __, Ct_z, Cz_z = _polar_phase(ops, qz0, sub)
+        t = sub["gamma"] * mino_t + t_r + t_z - (Ct_r + Ct_z)
+        phi = sub["ups_phi"] * mino_t + phi_r + phi_z - (Cz_r + Cz_z)
+    return tuple(_scatter(ops, valid, v) for v in (t, r, theta, phi))
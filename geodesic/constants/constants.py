@@ -1,15 +1,31 @@
+from numpy import asarray, broadcast_arrays, full, nan, errstate
+
 try:
     from geodesic.constants.constants_eq import calc_eq_constants
     from geodesic.constants.constants_gen import calc_gen_constants
     from geodesic.constants.constants_pol import calc_pol_constants
     from geodesic.constants.constants_sc import calc_sc_constants
     from geodesic.constants.constants_sph import calc_sph_constants
+    from geodesic.constants.constants_fused import (
+        eq_constants,
+        gen_constants,
+        pol_constants,
+        sc_constants,
+        sph_constants,
+    )
 except:
     from .constants_eq import calc_eq_constants
     from .constants_gen import calc_gen_constants
     from .constants_pol import calc_pol_constants
     from .constants_sc import calc_sc_constants
     from .constants_sph import calc_sph_constants
+    from .constants_fused import (
+        eq_constants,
+        gen_constants,
+        pol_constants,
+        sc_constants,
+        sph_constants,
+    )
 
 
 def calc_constants(aa, slr, ecc, x):
@@ -44,3 +60,55 @@ def calc_constants(aa, slr, ecc, x):
         return calc_sph_constants(aa, slr, x)
     else:
         return calc_gen_constants(aa, slr, ecc, x)
+
+
+def calc_constants_batch(aa, slr, ecc, x):
+    """
+    Array version of calc_constants.
+
+    The inputs are broadcast against each other and every orbit class
+    (SC, polar, equatorial, spherical, generic) is evaluated on its own subset
+    of the batch. The kernels are the calc_constants expressions after common
+    subexpression elimination (see constants_fused.py). Input values are not
+    validated; unphysical orbits produce nan.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+                   x < 0 -> retrograde
+                   x > 0 -> prograde
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    En = full(aa.shape, nan)
+    Lz = full(aa.shape, nan)
+    Q = full(aa.shape, nan)
+
+    sc = aa == 0
+    pol = ~sc & (x == 0)
+    eq = ~sc & ~pol & (x * x == 1)
+    sph = ~sc & ~pol & ~eq & (ecc == 0)
+    gen = ~sc & ~pol & ~eq & ~sph
+
+    with errstate(invalid="ignore", divide="ignore"):
+        if sc.any():
+            En[sc], Lz[sc], Q[sc] = sc_constants(slr[sc], ecc[sc], x[sc])
+        if pol.any():
+            En[pol], Lz[pol], Q[pol] = pol_constants(aa[pol], slr[pol], ecc[pol])
+        if eq.any():
+            En[eq], Lz[eq], Q[eq] = eq_constants(aa[eq], slr[eq], ecc[eq], x[eq])
+        if sph.any():
+            En[sph], Lz[sph], Q[sph] = sph_constants(aa[sph], slr[sph], x[sph])
+        if gen.any():
+            En[gen], Lz[gen], Q[gen] = gen_constants(
+                aa[gen], slr[gen], ecc[gen], x[gen]
+            )
+    return En, Lz, Q
@@ -0,0 +1,204 @@
+# ------------------------------------------------------------------------------
+#  Fused, CSE-optimized constant kernels
+#
+#  GENERATED by scripts/generate_constants.py from the expressions in
+#  constants_sc.py, constants_pol.py, constants_eq.py, constants_sph.py and
+#  constants_gen.py. Do not edit by hand; edit those files and rerun the script.
+# ------------------------------------------------------------------------------
+from numpy import sqrt, abs
+
+
+def sc_constants(slr, ecc, x):
+    """
+    En, Lz and Q for SC orbits (aa = 0).
+
+    Parameters:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    x_0 = (ecc*ecc)
+    x_1 = -slr + x_0 + 3
+    x_2 = -x_1
+    return (
+        sqrt((-4*x_0 + ((slr - 2)*(slr - 2)))/(slr*x_2)),
+        slr*x/sqrt(x_2),
+        (slr*slr)*((x*x) - 1)/x_1,
+    )
+
+
+def pol_constants(aa, slr, ecc):
+    """
+    En, Lz and Q for Kerr polar orbits (x = 0).
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    x_0 = (slr*slr)
+    x_1 = (ecc*ecc)
+    x_2 = slr - 2
+    x_3 = (aa*aa*aa*aa)*((x_1 - 1)*(x_1 - 1))
+    x_4 = x_1*(slr + 2)
+    x_5 = 2*(aa*aa)
+    x_6 = slr*x_5*(x_2 + x_4) + x_3
+    x_7 = (slr*slr*slr*slr)
+    x_8 = 1 / (-x_0*x_5*(-(ecc*ecc*ecc*ecc) + slr + x_4 - 1) - x_3*(slr - x_1 + 1) + x_7*(-slr + x_1 + 3))
+    return (
+        sqrt(-slr*x_8*(x_0*(-4*x_1 + (x_2*x_2)) + x_6)),
+        0 + 0 * ecc,
+        -x_0*x_8*(x_6 + x_7),
+    )
+
+
+def eq_constants(aa, slr, ecc, x):
+    """
+    En, Lz and Q for Kerr equatorial orbits (x = +/- 1).
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    x_0 = (ecc*ecc)
+    x_1 = x_0 - 1
+    x_2 = (aa*aa)
+    x_3 = (x_1*x_1)
+    x_4 = -slr + x_0 + 3
+    x_5 = 1 / ((x*x))
+    x_6 = slr - 2
+    x_7 = (-slr*(2*x*sqrt(x_5*((aa*aa*aa*aa)*x_3 + (slr*slr)*(-4*x_0 + (x_6*x_6)) + 2*slr*x_2*(x_0*(slr + 2) + x_6))/(slr*slr*slr))*abs(aa) + x_4) + x_2*(slr + 3*x_0 + 1))/(slr*(x_4*x_4) - 4*x_2*x_3)
+    x_8 = sqrt(1 + x_1*(x_1*x_7 + 1)/slr)
+    return (
+        x_8,
+        aa*x_8 + slr*x*sqrt(x_5*x_7),
+        0 + 0 * x,
+    )
+
+
+def sph_constants(aa, slr, x):
+    """
+    En, Lz and Q for Kerr spherical orbits (ecc = 0).
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    x_0 = (slr*slr)
+    x_1 = (aa*aa)
+    x_2 = (x*x)
+    x_3 = x_2 - 1
+    x_4 = x_1*x_3
+    x_5 = -x_4
+    x_6 = x_0 + x_5
+    x_7 = (slr*slr*slr*slr)
+    x_8 = slr - 3
+    x_9 = 2*slr
+    x_10 = x_0*x_3
+    x_11 = x_0*x_1
+    x_12 = (aa*aa*aa*aa)
+    x_13 = (slr*slr*slr*slr*slr)
+    x_14 = slr - 2
+    x_15 = x_0 + x_4
+    x_16 = sqrt(slr*x_15)
+    x_17 = 2*x_16
+    x_18 = (slr*slr*slr)
+    x_19 = 2*x
+    x_20 = (-(aa*aa*aa*aa*aa*aa)*(x_3*x_3)*(-slr*(2*x_2 + 1) + x_10 + x_2) - (aa*aa*aa*aa*aa)*x*x_17*x_3 + (aa*aa*aa)*x_19*(x_16*x_3*x_9 - x_2*sqrt(x_13*x_15)) + aa*x_19*(-slr**4.5*sqrt(x_15) + x_17*x_18) + x_1*x_18*(slr*(12 - 7*x_2) + x_0*(10*x_2 - 13) - 3*x_18*x_3 - 4*x_2 + 4) + x_10*x_12*(-5*slr*x_3 + 3*x_10 + 4) + x_13*(x_14*x_14)*x_8)/(x_6*(-2*x_11*(x_10 - 3*x_2 + x_9 + 3) + x_12*x_3*(x_10 + x_3 - x_9*(x_2 + 1)) + x_7*(x_8*x_8)))
+    x_21 = sqrt(x_20)
+    x_22 = slr*x_14
+    x_23 = x_22 + x_5
+    x_24 = 1 / (x_2)
+    x_25 = x_1 + x_22
+    x_26 = x_23*x_24
+    x_27 = -aa*x_21*x_9 + x*sqrt(x_24*(x_20*(4*x_11 + x_26*(x_1*(slr*(slr + 2) - x_25*x_3) + x_7)) - x_25*x_26*x_6))
+    x_28 = 1 - x_2
+    return (
+        x_21,
+        x_2*x_27/x_23,
+        x_28*((x*x*x*x)*(x_27*x_27)/((x_23*x_23)*(1 - x_28)) + x_1*(1 - x_20)),
+    )
+
+
+def gen_constants(aa, slr, ecc, x):
+    """
+    En, Lz and Q for generic Kerr orbits.
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    x_0 = (slr*slr*slr*slr)
+    x_1 = ecc + 1
+    x_2 = 1 / (x_1)
+    x_3 = slr*x_2
+    x_4 = (aa*aa)
+    x_5 = 2*x_4
+    x_6 = (slr*slr)
+    x_7 = x_6/(x_1*x_1)
+    x_8 = x_3*(x_3 - 2)
+    x_9 = x_4 + x_8
+    x_10 = (x*x)
+    x_11 = 1 - x_10
+    x_12 = x_11*x_4
+    x_13 = x_0/(x_1*x_1*x_1*x_1) + x_12*x_9 + x_3*x_5 + x_4*x_7
+    x_14 = 1 - ecc
+    x_15 = 1 / (x_14)
+    x_16 = slr*x_15
+    x_17 = x_16*(x_16 - 2)
+    x_18 = x_17 + x_4
+    x_19 = 1 / (1 - x_11)
+    x_20 = x_11*x_19
+    x_21 = x_17 + x_18*x_20
+    x_22 = x_20*x_9 + x_8
+    x_23 = x_6/(x_14*x_14)
+    x_24 = x_23*x_4
+    x_25 = x_0/(x_14*x_14*x_14*x_14) + x_12*x_18 + x_16*x_5 + x_24
+    x_26 = -x_13*x_21 + x_22*x_25
+    x_27 = -x_13*x_15 + x_2*x_25
+    x_28 = x_15*x_22 - x_2*x_21
+    x_29 = x_28*x_4*x_6
+    x_30 = x_9*(x_12 + x_7)
+    x_31 = x_18*(x_12 + x_23)
+    x_32 = -x_15*x_30 + x_2*x_31
+    x_33 = -x_21*x_30 + x_22*x_31
+    x_34 = x_26*x_33
+    x_35 = 1 / (x_10)
+    x_36 = (-4*x*sqrt(x_28*x_35*(-x_27*(x_33*x_33) + 4*x_29*(x_32*x_32) + x_32*x_34))*abs(aa)*abs(slr) + 8*x_29*x_32 + x_34)/((x_26*x_26) + 16*x_27*x_29)
+    x_37 = sqrt(x_36)
+    x_38 = -2*aa*x_16*x_37 + x*sqrt(x_35*(-x_21*x_31 + x_36*(x_21*x_25 + 4*x_24)))
+    return (
+        x_37,
+        x_38/x_21,
+        x_11*(x_19*(x_38*x_38)/(x_21*x_21) + x_4*(1 - x_36)),
+    )
@@ -1,9 +1,15 @@
 try:
     from geodesic.coordinates.coords_gen import calc_equatorial_coords, calc_gen_coords
     from geodesic.coordinates.coords_circ_eq import calc_circular_eq_coords
+    from geodesic.coordinates.coords_sph import calc_sph_coords, SPH_ECC_TOL
+    from geodesic.coordinates.coords_pol import calc_pol_coords
+    from geodesic.coordinates.coords_sc import calc_sc_coords
 except:
     from .coords_gen import calc_equatorial_coords, calc_gen_coords
     from .coords_circ_eq import calc_circular_eq_coords
+    from .coords_sph import calc_sph_coords, SPH_ECC_TOL
+    from .coords_pol import calc_pol_coords
+    from .coords_sc import calc_sc_coords
 
 def calc_coords(
     psi,
@@ -31,10 +37,11 @@ def calc_coords(
     qphi0=0,
     M=1
 ):
-    if x ** 2 == 1 and ecc == 0:
-        # print('detected circ_eq orbit')
+    if x ** 2 == 1 and ecc < SPH_ECC_TOL:
+        # circular equatorial orbit: the equatorial kernel loses accuracy as
+        # ecc -> 0, and r = slr is off by at most ecc slr; qr0 has no effect
         t, r, theta, phi = calc_circular_eq_coords(psi, En, Lz, aa, slr, M)
-        return t, r, theta, phi
+        return qt0 + t, r, theta, qphi0 + phi
     elif x ** 2 == 1:
         # print('detected equatorial orbit')
         t, r, theta, phi = calc_equatorial_coords(
@@ -60,6 +67,18 @@ def calc_coords(
             qphi0
         )
         return t, r, theta, phi
+    elif aa == 0:
+        # SC orbit: computed in the orbital plane and rotated
+        t, r, theta, phi = calc_sc_coords(psi, slr, ecc, x, qt0, qr0, qz0, qphi0)
+        return t, r, theta, phi
+    elif ecc < SPH_ECC_TOL:
+        # spherical orbit: only the polar sector oscillates
+        t, r, theta, phi = calc_sph_coords(psi, aa, slr, x, qt0, qz0, qphi0, M)
+        return t, r, theta, phi
+    elif x == 0:
+        # polar orbit: Lz = 0, phi only advances through frame dragging
+        t, r, theta, phi = calc_pol_coords(psi, aa, slr, ecc, qt0, qr0, qz0, qphi0)
+        return t, r, theta, phi
     else:
         # print('detected generic orbit')
         t, r, theta, phi = calc_gen_coords(
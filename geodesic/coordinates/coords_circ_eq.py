@@ -1,10 +1,74 @@
-from numpy import sqrt
+import numpy as np
+from numpy import sqrt, sign, pi
+
+# ------------------------------------------------------------------------------
+#  Kerr circular equatorial orbits (ecc = 0, x = +/- 1)
+#
+#  Every quantity is elementary: the orbit sits at r = slr, theta = pi/2 and
+#  t, phi grow linearly in Mino time. psi = ups_r * lambda, matching the
+#  radial angle of the eccentric routines in the limit ecc -> 0.
+# ------------------------------------------------------------------------------
+
+
+def circ_eq_constants(aa, slr, x, M=1):
+    """
+    Energy and angular momentum of a circular equatorial orbit.
+
+    Parameters:
+        aa (float or array): MBH spin
+        slr (float or array): orbital radius
+        x (float or array): +1 -> prograde, -1 -> retrograde
+        M (float) [1]: MBH mass
+
+    Returns:
+        En (float or array): energy
+        Lz (float or array): angular momentum
+    """
+    s = sign(x)
+    ahat = aa / M
+    v = sqrt(M / slr)
+    v2 = v * v
+    v3 = v2 * v
+    denom = sqrt(1 - 3 * v2 + 2 * s * ahat * v3)
+    En = (1 - 2 * v2 + s * ahat * v3) / denom
+    Lz = s * sqrt(M * slr) * (1 - 2 * s * ahat * v3 + ahat * ahat * v2 * v2) / denom
+    return En, Lz
+
+
+def circ_eq_freqs(En, Lz, aa, slr, M=1):
+    """
+    Radial, azimuthal and temporal Mino frequencies of a circular
+    equatorial orbit.
+
+    Parameters:
+        En (float or array): energy
+        Lz (float or array): angular momentum
+        aa (float or array): MBH spin
+        slr (float or array): orbital radius
+        M (float) [1]: MBH mass
+
+    Returns:
+        ups_r (float or array): radial Mino frequency
+        ups_phi (float or array): azimuthal Mino frequency
+        gamma (float or array): temporal Mino frequency
+    """
+    aa2 = aa * aa
+    slr2 = slr * slr
+    En2m1 = En * En - 1
+    delta = slr2 - 2 * M * slr + aa2
+    x = Lz - aa * En
+    P = En * (slr2 + aa2) - aa * Lz
+    # ups_r^2 = -R''(slr) / 2 for the radial potential R(r)
+    ups_r = sqrt(-(6 * En2m1 * slr2 + 6 * M * slr + aa2 * En2m1 - Lz * Lz))
+    ups_phi = aa * P / delta + x
+    gamma = (slr2 + aa2) * P / delta + aa * x
+    return ups_r, ups_phi, gamma
 
 
 def calc_circular_eq_coords(psi, En, Lz, aa, slr, M=1):
     """
     Parameters:
-        psi (float): angle associated with radial motion.
+        psi (float or array): angle associated with radial motion.
         En (float): constant energy
         Lz (float): angular momentum constant
         aa (float): MBH spin
@@ -12,28 +76,70 @@ def calc_circular_eq_coords(psi, En, Lz, aa, slr, M=1):
         M (float) [1]: stellar mass black hole mass
 
     Returns:
-        t (float): time coordinate
-        r (float): radial coordinate
-        theta (float): polar coordinate
-        phi (float): azimuthal coordinate
+        t (float or array): time coordinate
+        r (float or array): radial coordinate
+        theta (float or array): polar coordinate
+        phi (float or array): azimuthal coordinate
     """
-    # lam_psi is used to cross check with circular orbits in BHPTK
-    # lam_psi = (psi / (sqrt(1 - En**2 + 3*(1 - En**2) + 2*(1 - En**2 - 1/slr) + 
-    #            (aa**2*(1 - En**2) + Lz**2)/slr**2 - 4/slr)*slr))
-    # print(lam_psi)
+    ups_r, ups_phi, gamma = circ_eq_freqs(En, Lz, aa, slr, M)
+    return calc_circular_eq_coords_mino(psi / ups_r, En, Lz, aa, slr, M)
 
-    aa2 = aa * aa
-    slr2 = slr * slr
-    x = Lz - aa * En
-    x2 = x * x
-
-    Vr = aa2 + x2 + 2 * aa * x * En - 6 * M * x2 / slr
-    Vphi = x + aa * En - 2 * M * x / slr
-    Vt = aa2 * En - 2 * aa * M * x / slr + En * slr2
-    J = 1 - 2 * M / slr + aa2 / slr2
-    denom = J * sqrt(Vr)
-    t = Vt / denom * psi
-    phi = Vphi / denom * psi
-    r = slr
-    theta = mp.pi / 2
+
+def calc_circular_eq_coords_mino(mino_t, En, Lz, aa, slr, M=1):
+    """
+    Parameters:
+        mino_t (float or array): Mino time
+        En (float): constant energy
+        Lz (float): angular momentum constant
+        aa (float): MBH spin
+        slr (float): semi-latus rectum
+        M (float) [1]: stellar mass black hole mass
+
+    Returns:
+        t (float or array): time coordinate
+        r (float or array): radial coordinate
+        theta (float or array): polar coordinate
+        phi (float or array): azimuthal coordinate
+    """
+    ups_r, ups_phi, gamma = circ_eq_freqs(En, Lz, aa, slr, M)
+    t = gamma * mino_t
+    phi = ups_phi * mino_t
+    r = slr + 0 * t
+    theta = pi / 2 + 0 * t
     return t, r, theta, phi
+
+
+def calc_circular_eq_coords_batch(psi, aa, slr, x, M=1, mino=False):
+    """
+    Coordinates of many circular equatorial orbits at once.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + psi.shape.
+
+    Parameters:
+        psi (float or array): radial angle (Mino time if mino is True)
+        aa (float or array): MBH spin
+        slr (float or array): orbital radius
+        x (float or array): +1 -> prograde, -1 -> retrograde
+
+    Keyword Args:
+        M (float) [1]: MBH mass
+        mino (bool) [False]: interpret psi as Mino time
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    psi = np.asarray(psi, dtype=float)
+    aa, slr, x = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (aa, slr, x))
+    )
+    expand = aa.shape + (1,) * psi.ndim
+    aa, slr, x = (v.reshape(expand) for v in (aa, slr, x))
+
+    En, Lz = circ_eq_constants(aa, slr, x, M)
+    if mino:
+        return calc_circular_eq_coords_mino(psi, En, Lz, aa, slr, M)
+    return calc_circular_eq_coords(psi, En, Lz, aa, slr, M)
@@ -6,7 +6,12 @@ from numpy import sqrt, floor, pi, tan, real
 from scipy.special import ellipj, ellipk, ellipe
 from scipy.special import ellipkinc
 from scipy.special import ellipeinc
-from mpmath import ellippi  # elliptic integral of third kind not implemented in scipy yet
+
+try:
+    # mpmath ellippi in the precision context of the calling thread
+    from geodesic.precision import mp_ellippi as ellippi
+except:
+    from ..precision import mp_ellippi as ellippi
 
 
 def calc_radius(psi, slr, ecc):
@@ -338,7 +343,23 @@ def calc_Cz(qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa):
 
 
 def calc_t(
-    mino_t, ups_r, ups_theta, gamma, qt0, qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa
+    mino_t,
+    ups_r,
+    ups_theta,
+    gamma,
+    qt0,
+    qr0,
+    qz0,
+    r1,
+    r2,
+    r3,
+    r4,
+    zp,
+    zm,
+    En,
+    Lz,
+    aa,
+    Ct=None,
 ):
     """
     time geodesic coordinate
@@ -361,6 +382,9 @@ def calc_t(
         Lz (float): angular momentum
         aa (float): spin
 
+    Keyword Args:
+        Ct (float) [None]: phase constant from calc_Ct, computed if None
+
     Returns:
         t (float)
     """
@@ -375,7 +399,9 @@ def calc_t(
         t_z = 0
     else:
         t_z = calc_t_z(eta_z, zp, zm, En, aa)
-    if qr0 == 0 and qz0 == 0:
+    if Ct is not None:
+        pass  # precomputed, e.g. by the orbit cache
+    elif qr0 == 0 and qz0 == 0:
         Ct = 0
     else:
         Ct = calc_Ct(qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa)
@@ -439,6 +465,7 @@ def calc_phi(
     En,
     Lz,
     aa,
+    Cz=None,
 ):
     """
     phi in terms of Mino time
@@ -461,6 +488,9 @@ def calc_phi(
         Lz (float): angular momentum
         aa (float): spin
 
+    Keyword Args:
+        Cz (float) [None]: phase constant from calc_Cz, computed if None
+
     Returns:
         phi (float)
     """
@@ -475,7 +505,9 @@ def calc_phi(
         phi_z = 0
     else:
         phi_z = calc_phi_z(eta_theta, zp, zm, En, Lz, aa)
-    if qr0 == 0 and qz0 == 0:
+    if Cz is not None:
+        pass  # precomputed, e.g. by the orbit cache
+    elif qr0 == 0 and qz0 == 0:
         Cz = 0
     else:
         Cz = calc_Cz(qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa)
@@ -806,6 +838,8 @@ def calc_gen_coords_mino(
     qr0=0,
     qz0=0,
     qt0=0,
+    Ct=None,
+    Cz=None,
 ):
     t = calc_t(
         mino_t,
@@ -824,6 +858,7 @@ def calc_gen_coords_mino(
         En,
         Lz,
         aa,
+        Ct=Ct,
     )
     r = calc_r(mino_t, ups_r, qr0, r1, r2, r3, r4)
     theta = calc_theta(mino_t, ups_theta, qz0, zp, zm, En, aa)
@@ -844,6 +879,7 @@ def calc_gen_coords_mino(
         En,
         Lz,
         aa,
+        Cz=Cz,
     )
     return t, r, theta, phi
 
@@ -0,0 +1,248 @@
+import numpy as np
+from numpy import sqrt, pi, sin, cos, arcsin, arccos, floor, where, errstate
+from scipy.special import ellipj, ellipk, ellipe, ellipeinc, ellipkinc
+
+try:
+    from geodesic.elliptic import ellippi, ellippiinc
+    from geodesic.constants.constants_pol import calc_pol_constants
+    from geodesic.geo_roots import radial_roots_batch
+    from geodesic.frequencies_batch import mino_freqs_kerr_batch
+    from geodesic.coordinates.coords_sph import calc_polar_batch
+except:
+    from ..elliptic import ellippi, ellippiinc
+    from ..constants.constants_pol import calc_pol_constants
+    from ..geo_roots import radial_roots_batch
+    from ..frequencies_batch import mino_freqs_kerr_batch
+    from .coords_sph import calc_polar_batch
+
+# ------------------------------------------------------------------------------
+#  Kerr polar orbits (x = 0)
+#
+#  Lz = 0, so phi only advances through frame dragging in the radial sector;
+#  the polar sector has no phi term and Pi(zm^2 | k_theta^2), which diverges
+#  at zm = 1, is never evaluated.
+# ------------------------------------------------------------------------------
+
+
+def calc_radial_batch(eta_r, r1, r2, r3, r4, En, Lz, aa, M=1):
+    """
+    Array version of calc_rq, calc_t_r and calc_phi_r.
+
+    Parameters:
+        eta_r (array): radial phase ups_r * lambda + qr0
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Keyword Args:
+        M (float): mass
+
+    Returns:
+        r (array): radius
+        t_r (array): oscillating radial part of t
+        phi_r (array): oscillating radial part of phi
+    """
+    aa2 = aa * aa
+    M2 = M * M
+    kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    rp = M + sqrt(M2 - aa2)
+    rm = M - sqrt(M2 - aa2)
+    hr = (r1 - r2) / (r1 - r3)
+    hp = ((r1 - r2) * (r3 - rp)) / ((r1 - r3) * (r2 - rp))
+    hm = ((r1 - r2) * (r3 - rm)) / ((r1 - r3) * (r2 - rm))
+
+    sn, __, __, psi_r = ellipj(eta_r * ellipk(kr) / pi, kr)
+    sn2 = sn * sn
+    r = (-(r2 * (r1 - r3)) + (r1 - r2) * r3 * sn2) / (-r1 + r3 + (r1 - r2) * sn2)
+
+    def osc(h):
+        # secular part minus the accumulated integral
+        return (eta_r * ellippi(h, kr)) / pi - ellippiinc(h, psi_r, kr)
+
+    osc_r = osc(hr)
+    osc_m = (r2 - r3) * osc(hm) / ((r2 - rm) * (r3 - rm))
+    osc_p = (r2 - r3) * osc(hp) / ((r2 - rp) * (r3 - rp))
+    sin_r = sin(psi_r)
+    root = sqrt((1 - En * En) * (r1 - r3) * (r2 - r4))
+
+    t_r = -(
+        (
+            -4 * M
+            * (
+                -(-2 * aa2 * En * M + (4 * En * M2 - aa * Lz) * rm) * osc_m
+                + (-2 * aa2 * En * M + (4 * En * M2 - aa * Lz) * rp) * osc_p
+            )
+            / (rp - rm)
+            + En * (r2 - r3) * (4 * M + r1 + r2 + r3 + r4) * osc_r
+            + En
+            * (r1 - r3)
+            * (r2 - r4)
+            * (
+                (eta_r * ellipe(kr)) / pi
+                - ellipeinc(psi_r, kr)
+                + (hr * cos(psi_r) * sin_r * sqrt(1 - kr * sin_r * sin_r))
+                / (1 - hr * sin_r * sin_r)
+            )
+        )
+        / root
+    )
+    phi_r = (
+        2
+        * aa
+        * (
+            -(2 * En * M * rm - aa * Lz) * osc_m
+            + (2 * En * M * rp - aa * Lz) * osc_p
+        )
+    ) / (root * (rp - rm))
+    return r, t_r, phi_r
+
+
+def calc_lambda_psi_batch(psi, ups_r, r1, r2, r3, r4, En, slr, ecc):
+    """
+    Array version of calc_lambda_psi. Mino time increases monotonically with
+    psi, and for ecc = 0 it reduces to psi / ups_r.
+
+    Parameters:
+        psi (array): radial angle
+        ups_r (array): radial Mino frequency
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+        En (array): energy
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+
+    Returns:
+        r (array): radius
+        lambda_psi (array)
+    """
+    r = slr / (1 + ecc * cos(psi))
+    kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    with errstate(invalid="ignore", divide="ignore"):
+        yr = sqrt(((r - r2) * (r1 - r3)) / ((r1 - r2) * (r - r3)))
+        lam = (2 * ellipkinc(arcsin(yr), kr)) / (
+            sqrt(1 - En * En) * sqrt((r1 - r3) * (r2 - r4))
+        )
+    lam_r = 2 * pi / ups_r  # radial period
+    turns = floor(psi / (2 * pi))
+    res = where(psi - 2 * pi * turns <= pi, lam, lam_r - lam)
+    return r, where(ecc == 0, psi / ups_r, lam_r * turns + res)
+
+
+def _pol_orbit(aa, slr, ecc):
+    """
+    Constants, roots and Mino frequencies of polar orbits.
+    """
+    aa, slr, ecc = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (aa, slr, ecc))
+    )
+    En, Lz, Q = calc_pol_constants(aa, slr, ecc)
+    Lz = 0 * En
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    zp = sqrt(Q)
+    zm = 1 + 0 * zp
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_kerr_batch(
+        r1, r2, r3, r4, zp, zm, En, Lz, aa
+    )
+    return ups_r, ups_theta, ups_phi, gamma, r1, r2, r3, r4, zp, zm, En, Lz, aa
+
+
+def _pol_trajectory(mino_t, orbit, qt0, qr0, qz0, qphi0):
+    """
+    Evaluate the trajectory; the arrays in orbit must broadcast with mino_t.
+    """
+    ups_r, ups_theta, ups_phi, gamma, r1, r2, r3, r4, zp, zm, En, Lz, aa = orbit
+    r, t_r, phi_r = calc_radial_batch(
+        qr0 + ups_r * mino_t, r1, r2, r3, r4, En, Lz, aa
+    )
+    z, t_z, __ = calc_polar_batch(qz0 + ups_theta * mino_t, zp, zm, En, Lz, aa)
+    if qr0 != 0 or qz0 != 0:
+        __, Ct_r, Cz_r = calc_radial_batch(qr0, r1, r2, r3, r4, En, Lz, aa)
+        __, Ct_z, __ = calc_polar_batch(qz0, zp, zm, En, Lz, aa)
+        t_r = t_r - Ct_r - Ct_z
+        phi_r = phi_r - Cz_r
+
+    t = qt0 + gamma * mino_t + t_r + t_z
+    theta = arccos(z)
+    phi = qphi0 + ups_phi * mino_t + phi_r
+    return t, r, theta, phi
+
+
+def calc_pol_coords_mino(mino_t, aa, slr, ecc, qt0=0, qr0=0, qz0=0, qphi0=0):
+    """
+    Coordinates of polar orbits as functions of Mino time.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + mino_t.shape.
+
+    Parameters:
+        mino_t (float or array): Mino time
+        aa (float or array): SMBH spin
+        slr (float or array): semi-latus rectum
+        ecc (float or array): eccentricity
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qr0 (float): initial radial phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    mino_t = np.asarray(mino_t, dtype=float)
+    orbit = _pol_orbit(aa, slr, ecc)
+    expand = orbit[0].shape + (1,) * mino_t.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    return _pol_trajectory(mino_t, orbit, qt0, qr0, qz0, qphi0)
+
+
+def calc_pol_coords(psi, aa, slr, ecc, qt0=0, qr0=0, qz0=0, qphi0=0):
+    """
+    Coordinates of polar orbits as functions of the radial angle psi. psi
+    fixes r = slr / (1 + ecc cos(psi)), so the result is calc_pol_coords_mino
+    at lambda(psi) - qr0 / ups_r.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + psi.shape.
+
+    Parameters:
+        psi (float or array): radial angle
+        aa (float or array): SMBH spin
+        slr (float or array): semi-latus rectum
+        ecc (float or array): eccentricity
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qr0 (float): initial radial phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    psi = np.asarray(psi, dtype=float)
+    aa, slr, ecc = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (aa, slr, ecc))
+    )
+    orbit = _pol_orbit(aa, slr, ecc)
+    expand = orbit[0].shape + (1,) * psi.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    ups_r, __, __, __, r1, r2, r3, r4, __, __, En, __, __ = orbit
+    __, lam_psi = calc_lambda_psi_batch(
+        psi, ups_r, r1, r2, r3, r4, En, slr.reshape(expand), ecc.reshape(expand)
+    )
+    # psi fixes the radial phase, so qr0 only shifts the Mino time
+    mino_t = lam_psi - qr0 / ups_r
+    return _pol_trajectory(mino_t, orbit, qt0, qr0, qz0, qphi0)
@@ -0,0 +1,173 @@
+import numpy as np
+from numpy import sqrt, sign, sin, cos, arccos, arctan2
+from scipy.special import ellipkinc
+
+try:
+    from geodesic.constants.constants_sc import calc_sc_constants
+    from geodesic.geo_roots import radial_roots_batch
+    from geodesic.frequencies_batch import mino_freqs_sc_batch
+    from geodesic.coordinates.coords_pol import calc_radial_batch
+except:
+    from ..constants.constants_sc import calc_sc_constants
+    from ..geo_roots import radial_roots_batch
+    from ..frequencies_batch import mino_freqs_sc_batch
+    from .coords_pol import calc_radial_batch
+
+# ------------------------------------------------------------------------------
+#  Schwarzschild orbits (aa = 0)
+#
+#  Every SC orbit is planar. The orbit is computed in its own plane, as for an
+#  equatorial orbit, and then rotated to Boyer-Lindquist (theta, phi). The
+#  in-plane angle is measured from the highest point of the orbit, z = zm, so
+#  that lambda = 0 matches the Kerr routines (periastron at theta_min).
+# ------------------------------------------------------------------------------
+
+
+def calc_plane_angle(psi, slr, ecc):
+    """
+    Angle swept in the orbital plane as a function of the radial angle psi
+    (Darwin's parameterization).
+
+    Parameters:
+        psi (float or array): radial angle
+        slr (float or array): semi-latus rectum
+        ecc (float or array): eccentricity
+
+    Returns:
+        phi_p (float or array): in-plane angle
+    """
+    n = slr - 6 - 2 * ecc
+    return 2 * sqrt(slr / n) * ellipkinc(psi / 2, -4 * ecc / n)
+
+
+def rotate_orbital_plane(phi_p, x):
+    """
+    Boyer-Lindquist angles of the point at in-plane angle phi_p on an orbit
+    with inclination x = cos(inc). phi is continuous in phi_p and vanishes at
+    phi_p = 0; for polar orbits it is identically 0 and theta bounces
+    between 0 and pi, as in the Kerr routines.
+
+    Parameters:
+        phi_p (float or array): in-plane angle from the highest point
+        x (float or array): inclination value given by cos(theta_inc)
+
+    Returns:
+        theta (float or array): polar coordinate
+        phi (float or array): azimuthal coordinate
+    """
+    ax = abs(x)
+    s = sin(phi_p)
+    c = cos(phi_p)
+    theta = arccos(sqrt(1 - x * x) * c)
+    # phi - phi_p, bounded and continuous for x != 0
+    delta = arctan2((1 - ax) * s * c, ax * c * c + s * s)
+    phi = sign(x) * (phi_p + delta)
+    return theta, phi
+
+
+def _sc_orbit(slr, ecc, x):
+    """
+    Constants, roots and Mino frequencies of SC orbits.
+    """
+    slr, ecc, x = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (slr, ecc, x))
+    )
+    En, Lz, Q = calc_sc_constants(slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, 0, slr, ecc)
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_sc_batch(slr, ecc, x)
+    # ups_theta is the total angular momentum, the in-plane Mino frequency
+    return ups_r, ups_theta, gamma, r1, r2, r3, r4 + 0 * r1, En, x
+
+
+def _sc_trajectory(mino_t, phi_p, orbit, qt0, qr0, qz0, qphi0):
+    """
+    Evaluate the trajectory; the arrays in orbit must broadcast with mino_t.
+    With aa = 0, k_theta = 0 and z = zm cos(qz), so the polar phase qz is
+    the in-plane angle.
+    """
+    ups_r, ups_theta, gamma, r1, r2, r3, r4, En, x = orbit
+    r, t_r, __ = calc_radial_batch(qr0 + ups_r * mino_t, r1, r2, r3, r4, En, 0, 0)
+    theta, phi = rotate_orbital_plane(qz0 + phi_p, x)
+    if qr0 != 0:
+        __, Ct, __ = calc_radial_batch(qr0, r1, r2, r3, r4, En, 0, 0)
+        t_r = t_r - Ct
+    if qz0 != 0:
+        phi = phi - rotate_orbital_plane(qz0, x)[1]
+    t = qt0 + gamma * mino_t + t_r
+    return t, r, theta, qphi0 + phi
+
+
+def calc_sc_coords_mino(mino_t, slr, ecc, x, qt0=0, qr0=0, qz0=0, qphi0=0):
+    """
+    Coordinates of SC orbits as functions of Mino time.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + mino_t.shape.
+
+    Parameters:
+        mino_t (float or array): Mino time
+        slr (float or array): semi-latus rectum
+        ecc (float or array): eccentricity
+        x (float or array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qr0 (float): initial radial phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    mino_t = np.asarray(mino_t, dtype=float)
+    orbit = _sc_orbit(slr, ecc, x)
+    expand = orbit[0].shape + (1,) * mino_t.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    phi_p = orbit[1] * mino_t
+    return _sc_trajectory(mino_t, phi_p, orbit, qt0, qr0, qz0, qphi0)
+
+
+def calc_sc_coords(psi, slr, ecc, x, qt0=0, qr0=0, qz0=0, qphi0=0):
+    """
+    Coordinates of SC orbits as functions of the radial angle psi. psi fixes
+    r = slr / (1 + ecc cos(psi)), so the result is calc_sc_coords_mino at
+    lambda(psi) - qr0 / ups_r.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + psi.shape.
+
+    Parameters:
+        psi (float or array): radial angle
+        slr (float or array): semi-latus rectum
+        ecc (float or array): eccentricity
+        x (float or array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qr0 (float): initial radial phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    psi = np.asarray(psi, dtype=float)
+    slr, ecc, x = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (slr, ecc, x))
+    )
+    orbit = _sc_orbit(slr, ecc, x)
+    expand = orbit[0].shape + (1,) * psi.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    ups_r, ups_theta = orbit[:2]
+    phi_p = calc_plane_angle(psi, slr.reshape(expand), ecc.reshape(expand))
+    lam_psi = phi_p / ups_theta
+    # psi fixes the radial phase, so qr0 only shifts the Mino time
+    mino_t = lam_psi - qr0 / ups_r
+    phi_p = ups_theta * mino_t
+    return _sc_trajectory(mino_t, phi_p, orbit, qt0, qr0, qz0, qphi0)
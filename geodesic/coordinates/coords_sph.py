@@ -0,0 +1,161 @@
+import numpy as np
+from numpy import pi, arccos, errstate, where
+from scipy.special import ellipj, ellipk, ellipe, ellipeinc
+
+try:
+    from geodesic.elliptic import ellippi, ellippiinc
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+    from geodesic.frequencies_batch import mino_freqs_kerr_batch
+except:
+    from ..elliptic import ellippi, ellippiinc
+    from ..constants.constants import calc_constants_batch
+    from ..geo_roots import radial_roots_batch, polar_roots_batch
+    from ..frequencies_batch import mino_freqs_kerr_batch
+
+# ------------------------------------------------------------------------------
+#  Kerr spherical orbits (ecc = 0)
+#
+#  r is constant, so only the polar sector oscillates. The radial angle psi is
+#  mapped to Mino time by psi = ups_r * lambda, which is the ecc -> 0 limit
+#  of the eccentric routines.
+# ------------------------------------------------------------------------------
+
+SPH_ECC_TOL = 1e-10  # orbits with ecc below this are treated as spherical
+
+
+def calc_polar_batch(eta_z, zp, zm, En, Lz, aa):
+    """
+    Array version of calc_zq, calc_t_z and calc_phi_z.
+
+    Parameters:
+        eta_z (array): polar phase ups_theta * lambda + qz0
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Returns:
+        z (array): cos(theta)
+        t_z (array): oscillating polar part of t
+        phi_z (array): oscillating polar part of phi (0 when Lz = 0)
+    """
+    En2 = En * En
+    zm2 = zm * zm
+    ktheta2 = (aa * aa * (1 - En2) * zm2) / (zp * zp)
+    ellipticK_theta = ellipk(ktheta2)
+    # u / K runs from 1 at eta_z = 0, i.e. the orbit starts at z = zm
+    u_K = 2 * (pi / 2.0 + eta_z) / pi
+    sn, __, __, psi_z = ellipj(u_K * ellipticK_theta, ktheta2)
+
+    z = zm * sn
+    t_z = (En * zp * (u_K * ellipe(ktheta2) - ellipeinc(psi_z, ktheta2))) / (1 - En2)
+    # Pi(zm^2 | k_theta^2) diverges at zm = 1, but then Lz = 0
+    with errstate(invalid="ignore", divide="ignore"):
+        phi_z = where(
+            Lz == 0,
+            0,
+            -(Lz * (u_K * ellippi(zm2, ktheta2) - ellippiinc(zm2, psi_z, ktheta2)))
+            / zp,
+        )
+    return z, t_z, phi_z
+
+
+def _sph_orbit(aa, slr, x, M=1):
+    """
+    Constants, roots and Mino frequencies of spherical orbits.
+    """
+    aa, slr, x = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (aa, slr, x))
+    )
+    En, Lz, Q = calc_constants_batch(aa, slr, 0, x)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, 0, M)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_kerr_batch(
+        r1, r2, r3, r4, zp, zm, En, Lz, aa, M
+    )
+    return ups_r, ups_theta, ups_phi, gamma, zp, zm, En, Lz, aa, slr
+
+
+def _sph_trajectory(mino_t, orbit, qt0, qz0, qphi0):
+    """
+    Evaluate the trajectory; the arrays in orbit must broadcast with mino_t.
+    """
+    ups_theta, ups_phi, gamma, zp, zm, En, Lz, aa, slr = orbit
+    z, t_z, phi_z = calc_polar_batch(qz0 + ups_theta * mino_t, zp, zm, En, Lz, aa)
+    if qz0 != 0:
+        __, Ct, Cz = calc_polar_batch(qz0, zp, zm, En, Lz, aa)
+        t_z = t_z - Ct
+        phi_z = phi_z - Cz
+
+    t = qt0 + gamma * mino_t + t_z
+    r = slr + 0 * t
+    theta = arccos(z)
+    phi = qphi0 + ups_phi * mino_t + phi_z
+    return t, r, theta, phi
+
+
+def calc_sph_coords_mino(mino_t, aa, slr, x, qt0=0, qz0=0, qphi0=0, M=1):
+    """
+    Coordinates of spherical orbits as functions of Mino time.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + mino_t.shape.
+
+    Parameters:
+        mino_t (float or array): Mino time
+        aa (float or array): SMBH spin
+        slr (float or array): orbital radius
+        x (float or array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+        M (float) [1]: SMBH mass
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    mino_t = np.asarray(mino_t, dtype=float)
+    ups_r, *orbit = _sph_orbit(aa, slr, x, M)
+    expand = ups_r.shape + (1,) * mino_t.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    return _sph_trajectory(mino_t, orbit, qt0, qz0, qphi0)
+
+
+def calc_sph_coords(psi, aa, slr, x, qt0=0, qz0=0, qphi0=0, M=1):
+    """
+    Coordinates of spherical orbits as functions of the radial angle psi.
+
+    The orbit parameters broadcast against each other to a batch shape S,
+    and the outputs have shape S + psi.shape.
+
+    Parameters:
+        psi (float or array): radial angle
+        aa (float or array): SMBH spin
+        slr (float or array): orbital radius
+        x (float or array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qt0 (float): initial time phase
+        qz0 (float): initial theta phase
+        qphi0 (float): initial phi phase
+        M (float) [1]: SMBH mass
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): polar coordinate
+        phi (array): azimuthal coordinate
+    """
+    psi = np.asarray(psi, dtype=float)
+    ups_r, *orbit = _sph_orbit(aa, slr, x, M)
+    expand = ups_r.shape + (1,) * psi.ndim
+    orbit = [v.reshape(expand) for v in orbit]
+    mino_t = psi / ups_r.reshape(expand)
+    return _sph_trajectory(mino_t, orbit, qt0, qz0, qphi0)
@@ -0,0 +1,264 @@
+import numpy as np
+from numpy import asarray, broadcast_arrays, errstate
+
+# ------------------------------------------------------------------------------
+#  Double-double arithmetic on numpy arrays
+#
+#  A DD holds an unevaluated sum hi + lo of two float64 arrays with
+#  |lo| <= ulp(hi) / 2, about 32 significant digits. Sums and products are
+#  built from the error-free transformations two_sum and two_prod (Dekker's
+#  splitting, as numpy has no fused multiply-add); division and sqrt take
+#  one correction step each, as in the QD library of Hida, Li and Bailey.
+#  Everything is elementwise, so a DD of shape S carries a batch of orbits.
+#
+#  The complete elliptic integrals use Bulirsch's cel, an AGM-type iteration
+#  that converges quadratically, so ~32 digits cost one or two steps more
+#  than ~16. The exponent range is that of float64, less a factor 2^27 in
+#  the splitting (|values| < ~1e300).
+# ------------------------------------------------------------------------------
+
+_SPLITTER = 134217729.0  # 2^27 + 1
+CEL_TOL = 1e-16  # relative convergence of cel, about sqrt(DD epsilon)
+CEL_MAX_ITER = 64
+
+
+def two_sum(a, b):
+    """
+    s + e = a + b exactly, with s = fl(a + b).
+    """
+    s = a + b
+    bb = s - a
+    return s, (a - (s - bb)) + (b - bb)
+
+
+def quick_two_sum(a, b):
+    """
+    s + e = a + b exactly, for |a| >= |b|.
+    """
+    s = a + b
+    return s, b - (s - a)
+
+
+def _split(a):
+    t = _SPLITTER * a
+    hi = t - (t - a)
+    return hi, a - hi
+
+
+def two_prod(a, b):
+    """
+    p + e = a * b exactly, with p = fl(a * b).
+    """
+    p = a * b
+    ah, al = _split(a)
+    bh, bl = _split(b)
+    return p, ((ah * bh - p) + ah * bl + al * bh) + al * bl
+
+
+class DD:
+    """
+    Array of double-double numbers, hi + lo.
+
+    Parameters:
+        hi (array): leading float64 part, or values to convert
+
+    Keyword Args:
+        lo (array) [0]: trailing float64 part
+    """
+
+    # numpy operands defer to the reflected DD operators
+    __array_ufunc__ = None
+
+    def __init__(self, hi, lo=0.0):
+        hi, lo = broadcast_arrays(asarray(hi, dtype=float), asarray(lo, dtype=float))
+        self.hi = hi.copy()
+        self.lo = lo.copy()
+
+    @property
+    def shape(self):
+        return self.hi.shape
+
+    def __len__(self):
+        return len(self.hi)
+
+    def __repr__(self):
+        return "DD(%r, %r)" % (self.hi, self.lo)
+
+    def float64(self):
+        """
+        Values rounded to float64.
+
+        Returns:
+            values (array)
+        """
+        return self.hi + self.lo
+
+    def __getitem__(self, key):
+        return DD(self.hi[key], self.lo[key])
+
+    def __setitem__(self, key, value):
+        value = _dd(value)
+        self.hi[key] = value.hi
+        self.lo[key] = value.lo
+
+    def __neg__(self):
+        return DD(-self.hi, -self.lo)
+
+    def __add__(self, other):
+        other = _dd(other)
+        s, e = two_sum(self.hi, other.hi)
+        t, f = two_sum(self.lo, other.lo)
+        s, e = quick_two_sum(s, e + t)
+        return DD(*quick_two_sum(s, e + f))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -_dd(other)
+
+    def __rsub__(self, other):
+        return _dd(other) + -self
+
+    def __mul__(self, other):
+        other = _dd(other)
+        p, e = two_prod(self.hi, other.hi)
+        e = e + (self.hi * other.lo + self.lo * other.hi)
+        return DD(*quick_two_sum(p, e))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = _dd(other)
+        q1 = self.hi / other.hi
+        r = self - other * q1
+        q2 = r.hi / other.hi
+        r = r - other * q2
+        q3 = r.hi / other.hi
+        return DD(*quick_two_sum(q1, q2)) + q3
+
+    def __rtruediv__(self, other):
+        return _dd(other) / self
+
+
+def _dd(v):
+    return v if isinstance(v, DD) else DD(v)
+
+
+def dd_sqrt(a):
+    """
+    Square root, nan for negative values.
+
+    Parameters:
+        a (DD)
+
+    Returns:
+        sqrt(a) (DD)
+    """
+    a = _dd(a)
+    with errstate(divide="ignore", invalid="ignore"):
+        x = 1.0 / np.sqrt(a.hi)
+        ax = a.hi * x
+        # one Newton step from the float64 root
+        p, e = two_prod(ax, ax)
+        root = DD(ax) + (a - DD(p, e)).hi * (x * 0.5)
+    zero = a.hi == 0
+    return DD(np.where(zero, 0.0, root.hi), np.where(zero, 0.0, root.lo))
+
+
+def dd_where(mask, a, b):
+    """
+    Elementwise a where mask, else b.
+    """
+    a, b = _dd(a), _dd(b)
+    return DD(np.where(mask, a.hi, b.hi), np.where(mask, a.lo, b.lo))
+
+
+# pi to double-double precision
+DD_PI = DD(3.141592653589793, 1.2246467991473532e-16)
+
+
+def cel(kc, p, a, b):
+    """
+    Bulirsch's general complete elliptic integral,
+    int_0^{pi/2} (a cos^2 + b sin^2) / ((cos^2 + p sin^2)
+    sqrt(cos^2 + kc^2 sin^2)) dtheta, for kc != 0 and p > 0.
+
+    Parameters:
+        kc (DD): complementary modulus
+        p (DD): p > 0
+        a (DD)
+        b (DD)
+
+    Returns:
+        cel (DD)
+    """
+    kc, p, a, b = (_dd(v) for v in (kc, p, a, b))
+    shape = np.broadcast_shapes(kc.shape, p.shape, a.shape, b.shape)
+    qc = DD(np.abs(kc.hi), np.sign(kc.hi) * kc.lo) * np.ones(shape)
+    p = dd_sqrt(p) * np.ones(shape)
+    b = b / p
+    a = a * np.ones(shape)
+    e = qc
+    em = DD(np.ones(shape))
+    done = np.zeros(shape, dtype=bool)
+    for __ in range(CEL_MAX_ITER):
+        g = e / p
+        a_next = a + b / p
+        b_next = (b + a * g) * 2
+        p_next = g + p
+        em_next = em + qc
+        converged = np.abs((em - qc).hi) <= em.hi * CEL_TOL
+        a, b, p, em = (
+            dd_where(done, old, new)
+            for old, new in ((a, a_next), (b, b_next), (p, p_next), (em, em_next))
+        )
+        step = ~done & ~converged
+        qc_next = dd_sqrt(e) * 2
+        qc = dd_where(step, qc_next, qc)
+        e = dd_where(step, qc_next * em, e)
+        done |= converged
+        if done.all():
+            break
+    return (DD_PI / 2) * (b + a * em) / (em * (em + p))
+
+
+def dd_ellipk(m):
+    """
+    Complete elliptic integral of the first kind, K(m), m < 1.
+
+    Parameters:
+        m (DD): parameter k^2
+
+    Returns:
+        K (DD)
+    """
+    return cel(dd_sqrt(1 - _dd(m)), 1.0, 1.0, 1.0)
+
+
+def dd_ellipe(m):
+    """
+    Complete elliptic integral of the second kind, E(m), m < 1.
+
+    Parameters:
+        m (DD): parameter k^2
+
+    Returns:
+        E (DD)
+    """
+    mc = 1 - _dd(m)
+    return cel(dd_sqrt(mc), 1.0, 1.0, mc)
+
+
+def dd_ellippi(n, m):
+    """
+    Complete elliptic integral of the third kind, Pi(n | m), in the
+    convention of mpmath.ellippi, for n < 1 and m < 1.
+
+    Parameters:
+        n (DD): characteristic
+        m (DD): parameter k^2
+
+    Returns:
+        Pi (DD)
+    """
+    return cel(dd_sqrt(1 - _dd(m)), 1 - _dd(n), 1.0, 1.0)
@@ -0,0 +1,128 @@
+from numpy import sin, cos, pi, floor, asarray
+from scipy.special import elliprf, elliprj
+
+# ------------------------------------------------------------------------------
+#  Vectorized elliptic integrals of the third kind (Carlson symmetric forms)
+# ------------------------------------------------------------------------------
+
+
+def ellippi(n, m):
+    """
+    Complete elliptic integral of the third kind, Pi(n | m).
+
+    Uses the same (n, m) parameter convention as mpmath.ellippi, but accepts
+    numpy arrays and is evaluated in double precision.
+
+    Parameters:
+        n (float): characteristic (n < 1)
+        m (float): parameter k^2 (m < 1)
+
+    Returns:
+        Pi (float)
+    """
+    n = asarray(n, dtype=float)
+    m = asarray(m, dtype=float)
+    return elliprf(0, 1 - m, 1) + n / 3 * elliprj(0, 1 - m, 1, 1 - n)
+
+
+def ellippiinc(n, phi, m):
+    """
+    Incomplete elliptic integral of the third kind, Pi(n; phi | m).
+
+    The amplitude phi may take any real value; it is reduced to [-pi/2, pi/2]
+    using the quasi-periodicity Pi(n; phi + j pi | m) = Pi(n; phi | m)
+    + 2 j Pi(n | m).
+
+    Parameters:
+        n (float): characteristic (n < 1)
+        phi (float): amplitude
+        m (float): parameter k^2 (m < 1)
+
+    Returns:
+        Pi (float)
+    """
+    n = asarray(n, dtype=float)
+    phi = asarray(phi, dtype=float)
+    m = asarray(m, dtype=float)
+
+    turns = floor(phi / pi + 0.5)
+    phi_red = phi - turns * pi
+    s = sin(phi_red)
+    c = cos(phi_red)
+    s2 = s * s
+    c2 = c * c
+    res = s * elliprf(c2, 1 - m * s2, 1) + n * s2 * s / 3 * elliprj(
+        c2, 1 - m * s2, 1, 1 - n * s2
+    )
+    return res + 2 * turns * ellippi(n, m)
+
+
+# ------------------------------------------------------------------------------
+#  Derivatives of the complete integrals
+#
+#  Written in terms of K(m), E(m) and Pi(n | m), which the callers have
+#  already evaluated, so a derivative costs a few arithmetic operations.
+# ------------------------------------------------------------------------------
+
+
+def ellipk_dm(m, K, E):
+    """
+    dK/dm for 0 < m < 1.
+
+    Parameters:
+        m (float): parameter k^2
+        K (float): K(m)
+        E (float): E(m)
+
+    Returns:
+        dK/dm (float)
+    """
+    return (E - (1 - m) * K) / (2 * m * (1 - m))
+
+
+def ellipe_dm(m, K, E):
+    """
+    dE/dm for 0 < m < 1.
+
+    Parameters:
+        m (float): parameter k^2
+        K (float): K(m)
+        E (float): E(m)
+
+    Returns:
+        dE/dm (float)
+    """
+    return (E - K) / (2 * m)
+
+
+def ellippi_dn(n, m, K, E, Pi):
+    """
+    dPi(n | m)/dn for n != 0, n != m and n < 1.
+
+    Parameters:
+        n (float): characteristic
+        m (float): parameter k^2
+        K (float): K(m)
+        E (float): E(m)
+        Pi (float): Pi(n | m)
+
+    Returns:
+        dPi/dn (float)
+    """
+    return (E + (m - n) * K / n + (n * n - m) * Pi / n) / (2 * (m - n) * (n - 1))
+
+
+def ellippi_dm(n, m, E, Pi):
+    """
+    dPi(n | m)/dm for n != m and m < 1.
+
+    Parameters:
+        n (float): characteristic
+        m (float): parameter k^2
+        E (float): E(m)
+        Pi (float): Pi(n | m)
+
+    Returns:
+        dPi/dm (float)
+    """
+    return (E / (m - 1) + Pi) / (2 * (n - m))
@@ -1,6 +1,12 @@
 from numpy import sqrt, pi
 from scipy.special import ellipk, ellipe
-from mpmath import ellippi
+
+try:
+    from geodesic.frequencies_batch import radial_sector, polar_sector_pol
+    from geodesic.precision import mp_ellippi as ellippi
+except:
+    from .frequencies_batch import radial_sector, polar_sector_pol
+    from .precision import mp_ellippi as ellippi
 
 
 def mino_freqs_sc(slr, ecc, x):
@@ -153,7 +159,8 @@ def mino_freqs_kerr(r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x, M=1):
     ellipticE_ktheta = ellipe(ktheta2)
 
     ups_r = (pi * sqrt((1 - En2) * (r1 - r3) * (r2 - r4))) / (2 * ellipticK_r)
-    ups_theta = (sqrt(eps0zp) * Lz * pi) / (2.0 * ellipticK_theta)
+    # sqrt(eps0zp) |Lz| = a zp, so ups_theta > 0 for retrograde orbits too
+    ups_theta = (sqrt(eps0zp) * abs(Lz) * pi) / (2.0 * ellipticK_theta)
     ups_phi = (
         2
         * aa
@@ -173,20 +180,16 @@ def mino_freqs_kerr(r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x, M=1):
             / (r3 - rp)
         )
     ) / (pi * sqrt((1 - En2) * (r1 - r3) * (r2 - r4)) * (-rm + rp)) + (
-        2 * ups_theta * ellipticPi_zmktheta
-    ) / (
-        sqrt(eps0zp) * pi
-    )
+        Lz * ellipticPi_zmktheta
+    ) / ellipticK_theta
     gamma = (
         4 * En * M2
         + (
-            2
-            * En
-            * ups_theta
+            En
             * (L2 + aa2 * (-1 + En2) * (-1 + zm))
             * (-ellipticE_ktheta + ellipticK_theta)
         )
-        / ((-1 + En2) * sqrt(eps0zp) * Lz * pi * (-1 + zm))
+        / ((-1 + En2) * (-1 + zm) * ellipticK_theta)
         + (
             2
             * ups_r
@@ -231,9 +234,42 @@ def mino_freqs_kerr(r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x, M=1):
     return ups_r, ups_theta, ups_phi, gamma
 
 
+def mino_freqs_pol(r1, r2, r3, r4, En, Q, aa, M=1):
+    """
+    Mino frequencies for polar orbits (x = 0, Lz = 0). mino_freqs_kerr
+    divides by Lz and evaluates Pi(zm, k_theta) at zm = 1, where it diverges.
+    The radial Pi terms use mpmath at the working precision of the calling
+    thread, as in mino_freqs_kerr; the polar sector has no Pi term.
+
+    Parameters:
+        r1 (float): radial root
+        r2 (float): radial root
+        r3 (float): radial root
+        r4 (float): radial root
+        En (float): energy
+        Q (float): Carter constant
+        aa (float): spin
+
+    Keyword Args:
+        M (float): mass
+
+    Returns:
+        ups_r (float): radial Mino frequency
+        ups_theta (float): polar Mino frequency
+        ups_phi (float): azimuthal Mino frequency
+        gamma (float): time Mino frequency
+    """
+    ups_r, phi_r, t_r = radial_sector(
+        r1, r2, r3, r4, En, 0, aa, M, ellippi=ellippi
+    )
+    ups_theta, phi_z, t_z = polar_sector_pol(sqrt(Q), En, aa)
+    return ups_r, ups_theta, phi_r + phi_z, t_r + t_z
+
+
 def mino_freqs(r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x):
     """
-    Mino frequency calculation using mpmath with arbitrary precision
+    Mino frequency calculation using mpmath at the working precision of the
+    calling thread (see geodesic.precision)
 
     Parameters:
         r1 (float): radial root
@@ -256,7 +292,10 @@ def mino_freqs(r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x):
         ups_phi (float): phi frequency
         gamma (float): time frequency
     """
-    if aa == 0:
+    if x == 0:
+        ups_r, ups_theta, ups_phi, gamma = mino_freqs_pol(r1, r2, r3, r4, En, Q, aa)
+        return ups_r, ups_theta, ups_phi, gamma
+    elif aa == 0:
         ups_r, ups_theta, ups_phi, gamma = mino_freqs_sc(slr, ecc, x)
         return ups_r, ups_theta, ups_phi, gamma
     else:
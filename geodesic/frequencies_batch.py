@@ -0,0 +1,580 @@
+import numpy as np
+from numpy import sqrt, pi, sign, errstate
+from numpy import asarray, broadcast_arrays, full, nan, inf
+from scipy.special import ellipk, ellipe
+
+try:
+    from geodesic.elliptic import ellippi
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+except:
+    from .elliptic import ellippi
+    from .constants.constants import calc_constants_batch
+    from .geo_roots import radial_roots_batch, polar_roots_batch
+
+# ------------------------------------------------------------------------------
+#  Vectorized (float64) Mino frequency kernels
+# ------------------------------------------------------------------------------
+
+
+def mino_freqs_sc_batch(slr, ecc, x):
+    """
+    Array version of mino_freqs_sc (aa = 0).
+
+    Parameters:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency (0 for polar orbits)
+        gamma (array): time Mino frequency
+    """
+    ecc2 = ecc * ecc
+    kr = (4 * ecc) / (-6 + 2 * ecc + slr)
+    ellipticK_r = ellipk(kr)
+    ellipticE_r = ellipe(kr)
+    ellipticPi_1 = ellippi((2 * ecc * (-4 + slr)) / ((1 + ecc) * (-6 + 2 * ecc + slr)), kr)
+    ellipticPi_2 = ellippi((16 * ecc) / (12 + 8 * ecc - 4 * ecc2 - 8 * slr + slr ** 2), kr)
+
+    ups_r = (pi * sqrt(-((slr * (-6 + 2 * ecc + slr)) / (3 + ecc2 - slr)))) / (
+        2 * ellipticK_r
+    )
+    ups_theta = slr / sqrt(-3 - ecc2 + slr)
+    ups_phi = sign(x) * ups_theta
+    gamma = (
+        sqrt((-4 * ecc2 + (-2 + slr) ** 2) / (slr * (-3 - ecc2 + slr)))
+        * (
+            8
+            + (
+                -((-4 + slr) * slr ** 2 * (-6 + 2 * ecc + slr) * ellipticE_r)
+                / (-1 + ecc2)
+                + (slr ** 2 * (28 + 4 * ecc2 - 12 * slr + slr ** 2) * ellipticK_r)
+                / (-1 + ecc2)
+                - (2 * (6 + 2 * ecc - slr) * (3 + ecc2 - slr) * slr ** 2 * ellipticPi_1)
+                / ((-1 + ecc) * (1 + ecc) ** 2)
+                + (
+                    4
+                    * (-4 + slr)
+                    * slr
+                    * (2 * (1 + ecc) * ellipticK_r + (-6 - 2 * ecc + slr) * ellipticPi_1)
+                )
+                / (1 + ecc)
+                + 2
+                * (-4 + slr) ** 2
+                * (
+                    (-4 + slr) * ellipticK_r
+                    - ((6 + 2 * ecc - slr) * slr * ellipticPi_2) / (2 + 2 * ecc - slr)
+                )
+            )
+            / ((-4 + slr) ** 2 * ellipticK_r)
+        )
+    ) / 2.0
+
+    return ups_r, ups_theta, ups_phi, gamma
+
+
+def _r2_average(r1, r2, r3, r4, ellipticK_r, ellipticE_r, ellipticPi_hrkr):
+    """
+    Mino time average of r^2 from the radial elliptic integrals.
+    """
+    return (
+        (r1 - r3) * (r2 - r4) * ellipticE_r
+        + (-(r1 * r2) + r3 * (r1 + r2 + r3)) * ellipticK_r
+        + (r2 - r3) * (r1 + r2 + r3 + r4) * ellipticPi_hrkr
+    ) / (2 * ellipticK_r)
+
+
+def radial_r2_average(r1, r2, r3, r4):
+    """
+    Mino time average of r^2 over the radial motion.
+
+    Parameters:
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+
+    Returns:
+        r2_avg (array): <r^2>
+    """
+    kr2 = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    hr = (r1 - r2) / (r1 - r3)
+    return _r2_average(r1, r2, r3, r4, ellipk(kr2), ellipe(kr2), ellippi(hr, kr2))
+
+
+def polar_z2_average(zp, zm, En, aa):
+    """
+    Mino time average of aa^2 z^2 over the polar motion.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        aa (array): spin
+
+    Returns:
+        z2_avg (array): <aa^2 z^2>
+    """
+    ktheta2 = (aa * aa * (1 - En * En) * zm * zm) / (zp * zp)
+    ellipticK_theta = ellipk(ktheta2)
+    return (zp * zp * (ellipticK_theta - ellipe(ktheta2))) / (
+        (1 - En * En) * ellipticK_theta
+    )
+
+
+def radial_sector(r1, r2, r3, r4, En, Lz, aa, M=1, tau=False, ellippi=ellippi):
+    """
+    Radial contributions to the Mino frequencies of a Kerr orbit.
+
+    Parameters:
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Keyword Args:
+        M (float): mass
+        tau (bool): also return <r^2>
+        ellippi (callable): complete elliptic integral of the third kind,
+            Pi(n, m); mino_freqs_pol passes the mpmath one for scalar input
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        phi_r (array): radial part of ups_phi
+        t_r (array): radial part of gamma
+        r2_avg (array): Mino time average of r^2 (only if tau)
+    """
+    aa2 = aa * aa
+    En2 = En * En
+    M2 = M * M
+
+    kr2 = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    rp = M + sqrt(M2 - aa2)
+    rm = M - sqrt(M2 - aa2)
+    hr = (r1 - r2) / (r1 - r3)
+    hp = ((r1 - r2) * (r3 - rp)) / ((r1 - r3) * (r2 - rp))
+    hm = ((r1 - r2) * (r3 - rm)) / ((r1 - r3) * (r2 - rm))
+
+    ellipticK_r = ellipk(kr2)
+    ellipticE_r = ellipe(kr2)
+    ellipticPi_hmkr = ellippi(hm, kr2)
+    ellipticPi_hpkr = ellippi(hp, kr2)
+    ellipticPi_hrkr = ellippi(hr, kr2)
+
+    # (K - (r2 - r3) Pi(h) / (r2 - r)) / (r3 - r) at the two horizons
+    Im = (ellipticK_r - ((r2 - r3) * ellipticPi_hmkr) / (r2 - rm)) / (r3 - rm)
+    Ip = (ellipticK_r - ((r2 - r3) * ellipticPi_hpkr) / (r2 - rp)) / (r3 - rp)
+
+    ups_r = (pi * sqrt((1 - En2) * (r1 - r3) * (r2 - r4))) / (2 * ellipticK_r)
+    phi_r = (
+        aa
+        * (-(-(aa * Lz) + 2 * En * M * rm) * Im + (-(aa * Lz) + 2 * En * M * rp) * Ip)
+        / (ellipticK_r * (rp - rm))
+    )
+    r2_avg = _r2_average(r1, r2, r3, r4, ellipticK_r, ellipticE_r, ellipticPi_hrkr)
+    t_r = (
+        4 * En * M2
+        + (
+            2
+            * M
+            * (
+                -(-2 * aa2 * En * M + (-(aa * Lz) + 4 * En * M2) * rm) * Im
+                + (-2 * aa2 * En * M + (-(aa * Lz) + 4 * En * M2) * rp) * Ip
+            )
+            / (rp - rm)
+            + 2 * En * M * (r3 * ellipticK_r + (r2 - r3) * ellipticPi_hrkr)
+        )
+        / ellipticK_r
+        + En * r2_avg
+    )
+    if tau:
+        return ups_r, phi_r, t_r, r2_avg
+    return ups_r, phi_r, t_r
+
+
+def polar_sector(zp, zm, En, Lz, aa):
+    """
+    Polar contributions to the Mino frequencies of a Kerr orbit.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Returns:
+        ups_theta (array): polar Mino frequency
+        phi_z (array): polar part of ups_phi
+        t_z (array): polar part of gamma
+    """
+    En2 = En * En
+    zm2 = zm * zm
+    ktheta2 = (aa * aa * (1 - En2) * zm2) / (zp * zp)
+
+    ellipticK_theta = ellipk(ktheta2)
+    ellipticE_theta = ellipe(ktheta2)
+    ellipticPi_zmktheta = ellippi(zm2, ktheta2)
+
+    ups_theta = (pi * zp) / (2 * ellipticK_theta)
+    phi_z = Lz * ellipticPi_zmktheta / ellipticK_theta
+    t_z = (En * zp * zp * (ellipticK_theta - ellipticE_theta)) / (
+        (1 - En2) * ellipticK_theta
+    )
+    return ups_theta, phi_z, t_z
+
+
+def radial_sector_circ(r1, r3, r4, En, Lz, aa, M=1, tau=False):
+    """
+    Radial contributions to the Mino frequencies of a spherical orbit
+    (ecc = 0, r1 = r2). With kr = 0 every elliptic integral reduces to pi / 2.
+
+    Parameters:
+        r1 (array): orbital radius
+        r3 (array): radial root
+        r4 (array): radial root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Keyword Args:
+        M (float): mass
+        tau (bool): also return <r^2> = r1^2
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        phi_r (array): radial part of ups_phi
+        t_r (array): radial part of gamma
+        r2_avg (array): Mino time average of r^2 (only if tau)
+    """
+    aa2 = aa * aa
+    M2 = M * M
+    rp = M + sqrt(M2 - aa2)
+    rm = M - sqrt(M2 - aa2)
+
+    ups_r = sqrt((1 - En * En) * (r1 - r3) * (r1 - r4))
+    phi_r = (
+        aa
+        * (
+            -(-(aa * Lz) + 2 * En * M * rm) / (r1 - rm)
+            + (-(aa * Lz) + 2 * En * M * rp) / (r1 - rp)
+        )
+        / (rp - rm)
+    )
+    t_r = (
+        4 * En * M2
+        + 2 * En * M * r1
+        + En * r1 * r1
+        + 2
+        * M
+        * (
+            -(-2 * aa2 * En * M + (-(aa * Lz) + 4 * En * M2) * rm) / (r1 - rm)
+            + (-2 * aa2 * En * M + (-(aa * Lz) + 4 * En * M2) * rp) / (r1 - rp)
+        )
+        / (rp - rm)
+    )
+    if tau:
+        return ups_r, phi_r, t_r, r1 * r1
+    return ups_r, phi_r, t_r
+
+
+def polar_sector_eq(zp, Lz):
+    """
+    Polar contributions to the Mino frequencies of an equatorial orbit
+    (x = +/- 1, k_theta = 0).
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        Lz (array): angular momentum
+
+    Returns:
+        ups_theta (array): polar Mino frequency
+        phi_z (array): polar part of ups_phi
+        t_z (array): polar part of gamma
+    """
+    return zp, Lz, 0 * zp
+
+
+def polar_sector_pol(zp, En, aa):
+    """
+    Polar contributions to the Mino frequencies of a polar orbit (x = 0,
+    Lz = 0). There is no Pi(zm^2, k_theta^2) term, which diverges at zm = 1.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        En (array): energy
+        aa (array): spin
+
+    Returns:
+        ups_theta (array): polar Mino frequency
+        phi_z (array): polar part of ups_phi
+        t_z (array): polar part of gamma
+    """
+    En2 = En * En
+    ktheta2 = (aa * aa * (1 - En2)) / (zp * zp)
+    ellipticK_theta = ellipk(ktheta2)
+    ellipticE_theta = ellipe(ktheta2)
+
+    ups_theta = (pi * zp) / (2 * ellipticK_theta)
+    t_z = (En * zp * zp * (ellipticK_theta - ellipticE_theta)) / (
+        (1 - En2) * ellipticK_theta
+    )
+    return ups_theta, 0 * zp, t_z
+
+
+def _fill(outs, mask, kernel, *args, **kwargs):
+    """
+    Evaluate kernel on the masked part of args and store the results in outs.
+    """
+    if mask.any():
+        res = kernel(*(a[mask] for a in args), **kwargs)
+        for out, r in zip(outs, res):
+            out[mask] = r
+
+
+def mino_freqs_kerr_batch(r1, r2, r3, r4, zp, zm, En, Lz, aa, M=1, tau=False):
+    """
+    Array version of mino_freqs_kerr (aa != 0).
+
+    The radial and polar sectors are evaluated separately. Spherical orbits
+    (r1 = r2) use a radial kernel without elliptic integrals, equatorial
+    orbits (zm = 0) use a polar kernel without elliptic integrals and polar
+    orbits (Lz = 0) skip Pi(zm^2, k_theta^2); circular equatorial orbits are
+    therefore fully elementary. The polar frequency is written in terms of
+    zp, so it is positive for both prograde and retrograde orbits, as in
+    mino_freqs_kerr.
+
+    With tau, the proper time frequency ups_tau = <r^2> + aa^2 <z^2> (the
+    Mino time average of dtau/dlambda = Sigma) is also returned. <r^2> is
+    the En r^2 term of t_r and aa^2 <z^2> = t_z / En, so this costs no
+    further elliptic integrals.
+
+    Parameters:
+        r1 (array): radial root
+        r2 (array): radial root
+        r3 (array): radial root
+        r4 (array): radial root
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Keyword Args:
+        M (float): mass
+        tau (bool): also return ups_tau
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+        ups_tau (array): proper time Mino frequency (only if tau)
+    """
+    r1, r2, r3, r4, zp, zm, En, Lz, aa = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (r1, r2, r3, r4, zp, zm, En, Lz, aa))
+    )
+    ups_r, phi_r, t_r = (full(aa.shape, nan) for _ in range(3))
+    ups_theta, phi_z, t_z = (full(aa.shape, nan) for _ in range(3))
+    r2_avg = full(aa.shape, nan)
+
+    circ = r1 == r2
+    eq = zm == 0
+    pol = ~eq & (Lz == 0)
+
+    radial = (ups_r, phi_r, t_r, r2_avg)
+    _fill(radial, circ, radial_sector_circ, r1, r3, r4, En, Lz, aa, M=M, tau=tau)
+    _fill(radial, ~circ, radial_sector, r1, r2, r3, r4, En, Lz, aa, M=M, tau=tau)
+
+    polar = (ups_theta, phi_z, t_z)
+    _fill(polar, eq, polar_sector_eq, zp, Lz)
+    _fill(polar, pol, polar_sector_pol, zp, En, aa)
+    _fill(polar, ~eq & ~pol, polar_sector, zp, zm, En, Lz, aa)
+
+    if tau:
+        return ups_r, ups_theta, phi_r + phi_z, t_r + t_z, r2_avg + t_z / En
+    return ups_r, ups_theta, phi_r + phi_z, t_r + t_z
+
+
+def mino_freqs_batch(aa, slr, ecc, x, tau=False):
+    """
+    Mino frequencies for arrays of orbits.
+
+    Each orbit is sent to the kernel suited to it: aa = 0 uses the
+    closed-form SC expressions and everything else uses the full Kerr
+    expressions, which stay accurate to ~1e-15 down to |aa| ~ 1e-12. With
+    tau, the proper time frequency is also returned; it reuses the elliptic
+    integrals of the Kerr kernel, and for the SC orbits it is computed from
+    radial_r2_average and polar_z2_average.
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        tau (bool): also return ups_tau
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+        ups_tau (array): proper time Mino frequency (only if tau)
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    ups_r = full(aa.shape, nan)
+    ups_theta = full(aa.shape, nan)
+    ups_phi = full(aa.shape, nan)
+    gamma = full(aa.shape, nan)
+    ups_tau = full(aa.shape, nan)
+
+    sc = aa == 0
+    kerr = ~sc
+
+    with errstate(invalid="ignore", divide="ignore"):
+        if sc.any():
+            ups_r[sc], ups_theta[sc], ups_phi[sc], gamma[sc] = mino_freqs_sc_batch(
+                slr[sc], ecc[sc], x[sc]
+            )
+        if tau and sc.any():
+            a, p, e, z = aa[sc], slr[sc], ecc[sc], x[sc]
+            En, Lz, Q = calc_constants_batch(a, p, e, z)
+            r1, r2, r3, r4 = radial_roots_batch(En, Q, a, p, e)
+            zp, zm = polar_roots_batch(En, Lz, Q, a, z)
+            ups_tau[sc] = radial_r2_average(r1, r2, r3, r4) + polar_z2_average(
+                zp, zm, En, a
+            )
+        if kerr.any():
+            a, p, e, z = aa[kerr], slr[kerr], ecc[kerr], x[kerr]
+            En, Lz, Q = calc_constants_batch(a, p, e, z)
+            r1, r2, r3, r4 = radial_roots_batch(En, Q, a, p, e)
+            zp, zm = polar_roots_batch(En, Lz, Q, a, z)
+            res = mino_freqs_kerr_batch(r1, r2, r3, r4, zp, zm, En, Lz, a, tau=tau)
+            for out, r in zip((ups_r, ups_theta, ups_phi, gamma, ups_tau), res):
+                out[kerr] = r
+    if tau:
+        return ups_r, ups_theta, ups_phi, gamma, ups_tau
+    return ups_r, ups_theta, ups_phi, gamma
+
+
+def boyer_freqs_batch(ups_r, ups_theta, ups_phi, gamma):
+    """
+    Boyer-Lindquist frequencies from arrays of Mino frequencies.
+
+    Parameters:
+        ups_r (array): radial frequency
+        ups_theta (array): theta frequency
+        ups_phi (array): phi frequency
+        gamma (array): time frequency
+
+    Returns:
+        omega_r (array): radial boyer lindquist frequency
+        omega_theta (array): theta boyer lindquist frequency
+        omega_phi (array): phi boyer lindquist frequency
+    """
+    return ups_r / gamma, ups_theta / gamma, ups_phi / gamma
+
+
+def proper_time_freqs_batch(ups_r, ups_theta, ups_phi, gamma, ups_tau):
+    """
+    Proper time frequencies and the redshift invariant from arrays of Mino
+    frequencies.
+
+    Parameters:
+        ups_r (array): radial frequency
+        ups_theta (array): theta frequency
+        ups_phi (array): phi frequency
+        gamma (array): time frequency
+        ups_tau (array): proper time frequency
+
+    Returns:
+        omega_r (array): radial proper time frequency
+        omega_theta (array): theta proper time frequency
+        omega_phi (array): phi proper time frequency
+        redshift (array): Detweiler redshift <dt/dtau>^-1 = ups_tau / gamma
+    """
+    return ups_r / ups_tau, ups_theta / ups_tau, ups_phi / ups_tau, ups_tau / gamma
+
+
+def mode_freqs_batch(omega_r, omega_theta, omega_phi, em, kay, en):
+    """
+    Frequencies omega_mkn = m omega_phi + k omega_theta + n omega_r of every
+    combination of the given modes.
+
+    Parameters:
+        omega_r (array): radial boyer lindquist frequency
+        omega_theta (array): theta boyer lindquist frequency
+        omega_phi (array): phi boyer lindquist frequency
+        em (array): phi modes
+        kay (array): theta modes
+        en (array): radial modes
+
+    Returns:
+        omega (array): shape S + (len(em), len(kay), len(en)), S the
+            broadcast shape of the frequencies
+    """
+    omega_r, omega_theta, omega_phi = (
+        asarray(v, dtype=float)[..., None, None, None]
+        for v in broadcast_arrays(omega_r, omega_theta, omega_phi)
+    )
+    em, kay, en = (asarray(v, dtype=float).ravel() for v in (em, kay, en))
+    return (
+        em[:, None, None] * omega_phi
+        + kay[None, :, None] * omega_theta
+        + en[None, None, :] * omega_r
+    )
+
+
+def select_modes(
+    omega, em, kay, en, omega_min=-inf, omega_max=inf, sort=True, unique=False, tol=1e-12
+):
+    """
+    Modes of a mode_freqs_batch table with omega_min <= omega <= omega_max.
+
+    Parameters:
+        omega (array): output of mode_freqs_batch, shape S + (M, K, N)
+        em (array): phi modes
+        kay (array): theta modes
+        en (array): radial modes
+
+    Keyword Args:
+        omega_min (float) [-inf]: lower end of the band
+        omega_max (float) [inf]: upper end of the band
+        sort (bool) [True]: sort by orbit, then by omega
+        unique (bool) [False]: keep one mode of every group with the same
+            orbit and omega; implies sort
+        tol (float) [1e-12]: relative tolerance for equal frequencies
+
+    Returns:
+        orbit (array): flat index of the orbit into S
+        em (array): phi mode
+        kay (array): theta mode
+        en (array): radial mode
+        omega (array): frequency
+    """
+    omega = asarray(omega, dtype=float)
+    em, kay, en = (asarray(v).ravel() for v in (em, kay, en))
+    flat = omega.reshape((-1,) + omega.shape[-3:])
+    orbit, i, j, k = np.nonzero((flat >= omega_min) & (flat <= omega_max))
+    omega = flat[orbit, i, j, k]
+    if sort or unique:
+        order = np.lexsort((omega, orbit))
+        orbit, i, j, k, omega = (v[order] for v in (orbit, i, j, k, omega))
+    if unique and omega.size:
+        scale = np.maximum(abs(omega), 1e-300)
+        same = (orbit[1:] == orbit[:-1]) & (
+            abs(omega[1:] - omega[:-1]) <= tol * scale[1:]
+        )
+        keep = np.concatenate([[True], ~same])
+        orbit, i, j, k, omega = (v[keep] for v in (orbit, i, j, k, omega))
+    return orbit, em[i], kay[j], en[k], omega
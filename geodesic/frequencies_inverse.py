@@ -0,0 +1,164 @@
+import numpy as np
+from numpy import asarray, broadcast_arrays, errstate, linspace, meshgrid
+from scipy.spatial import cKDTree
+
+try:
+    from geodesic.jacobians import boyer_freqs_jacobian_batch
+    from geodesic.frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+except:
+    from .jacobians import boyer_freqs_jacobian_batch
+    from .frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+
+# ------------------------------------------------------------------------------
+#  Inverse of the Boyer-Lindquist frequency map at fixed spin
+#
+#  Targets are matched to the nearest points of a coarse grid of precomputed
+#  frequencies, then refined by Newton's method with the analytic Jacobian.
+#  All orbits and starting points are iterated together; a step that leaves
+#  the generic region (0 < ecc < 1, 0 < |x| < 1, finite frequencies) or does
+#  not reduce the residual is halved until it does.
+# ------------------------------------------------------------------------------
+
+
+def boyer_freqs_grid(aa, slr=None, ecc=None, x=None):
+    """
+    Grid of Boyer-Lindquist frequencies used to warm start
+    invert_boyer_freqs_batch. Build it once per spin and reuse it.
+
+    Parameters:
+        aa (float): spin parameter (0, 1)
+
+    Keyword Args:
+        slr (array): semi-latus rectum values [linspace(6, 40, 35)]
+        ecc (array): eccentricity values [linspace(0.02, 0.8, 14)]
+        x (array): inclination values, without 0 and +/- 1
+            [+/- linspace(0.05, 0.98, 10)]
+
+    Returns:
+        params (array): (slr, ecc, x) of the valid grid points, shape (G, 3)
+        omegas (array): (omega_r, omega_theta, omega_phi), shape (G, 3)
+    """
+    if slr is None:
+        slr = linspace(6, 40, 35)
+    if ecc is None:
+        ecc = linspace(0.02, 0.8, 14)
+    if x is None:
+        x = linspace(0.05, 0.98, 10)
+        x = np.concatenate([-x[::-1], x])
+    slr, ecc, x = (v.ravel() for v in meshgrid(slr, ecc, x, indexing="ij"))
+    with errstate(invalid="ignore", divide="ignore"):
+        omegas = np.stack(boyer_freqs_batch(*mino_freqs_batch(aa, slr, ecc, x)), -1)
+    params = np.stack([slr, ecc, x], -1)
+    ok = np.isfinite(omegas).all(-1) & (omegas[:, :2] > 0).all(-1)
+    return params[ok], omegas[ok]
+
+
+def _valid(slr, ecc, x, x0):
+    return (ecc > 0) & (ecc < 1) & (x * x < 1) & (x * x0 > 0) & (slr > 0)
+
+
+def _features(omegas):
+    # omega_phi < 0 for retrograde orbits; |omega_phi| / omega_theta - 1 is
+    # the small nodal precession that carries the information on x
+    return np.stack(
+        [
+            np.log(omegas[:, 0]),
+            np.log(omegas[:, 1]),
+            np.log(abs(omegas[:, 2]) / omegas[:, 1]),
+            np.sign(omegas[:, 2]),
+        ],
+        -1,
+    )
+
+
+def invert_boyer_freqs_batch(
+    omega_r, omega_theta, omega_phi, aa, grid=None, starts=4, tol=1e-13, max_iter=20
+):
+    """
+    Generic orbits (slr, ecc, x) with the given Boyer-Lindquist frequencies
+    at fixed spin.
+
+    Parameters:
+        omega_r (array): radial boyer lindquist frequency
+        omega_theta (array): theta boyer lindquist frequency
+        omega_phi (array): phi boyer lindquist frequency
+        aa (float): spin parameter (0, 1)
+
+    Keyword Args:
+        grid (tuple) [None]: output of boyer_freqs_grid(aa); built if None
+        starts (int) [4]: number of nearest grid points to start from; the
+            best solution is kept
+        tol (float) [1e-13]: relative tolerance on the frequencies
+        max_iter (int) [20]: largest number of Newton steps
+
+    Returns:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+        converged (array): True where every frequency matches within tol
+    """
+    target = np.stack(
+        broadcast_arrays(
+            *(asarray(v, dtype=float) for v in (omega_r, omega_theta, omega_phi))
+        ),
+        -1,
+    )
+    shape = target.shape[:-1]
+    target = target.reshape(-1, 3)
+    if grid is None:
+        grid = boyer_freqs_grid(aa)
+    params, omegas = grid
+    features = _features(omegas)
+    scale = features.std(0)
+    scale[3] = 0.1  # never match across prograde / retrograde
+    with errstate(invalid="ignore", divide="ignore"):
+        __, nearest = cKDTree(features / scale).query(
+            np.nan_to_num(_features(target) / scale), k=starts
+        )
+    # one Newton iteration per (target, start) pair
+    n = len(target)
+    target = np.repeat(target, starts, axis=0)
+    p = params[nearest.reshape(-1)].copy()
+    x0 = p[:, 2].copy()
+
+    def residual(q, om):
+        # nan outside the generic region, where the Jacobian is not defined
+        ok = _valid(q[:, 0], q[:, 1], q[:, 2], q[:, 2])
+        res = np.full(q.shape, np.nan)
+        jac = np.full(q.shape + (3,), np.nan)
+        omega_r, omega_theta, omega_phi, jac_ok = boyer_freqs_jacobian_batch(
+            aa, q[ok, 0], q[ok, 1], q[ok, 2]
+        )
+        om = om[ok]
+        res[ok] = (np.stack([omega_r, omega_theta, omega_phi], -1) - om) / abs(om)
+        jac[ok] = jac_ok[..., 1:] / abs(om)[..., None]
+        return res, jac
+
+    with errstate(invalid="ignore", divide="ignore"):
+        res, jac = residual(p, target)
+        converged = abs(res).max(-1) <= tol
+        for __ in range(max_iter):
+            active = ~converged & np.isfinite(res).all(-1)
+            if not active.any():
+                break
+            idx = np.nonzero(active)[0]
+            step = -np.linalg.solve(jac[idx], res[idx][..., None])[..., 0]
+            t = np.ones(len(idx))
+            # halve steps that leave the generic region or do not reduce |res|
+            for __ in range(30):
+                q = p[idx] + t[:, None] * step
+                ok = _valid(q[:, 0], q[:, 1], q[:, 2], x0[idx])
+                res_q, jac_q = residual(q, target[idx])
+                norm = (res_q * res_q).sum(-1)
+                ok &= np.isfinite(norm) & (norm < (res[idx] * res[idx]).sum(-1))
+                done = ok | (t < 1e-8)
+                keep = idx[ok]
+                p[keep], res[keep], jac[keep] = q[ok], res_q[ok], jac_q[ok]
+                idx, step, t = idx[~done], step[~done], t[~done] / 2
+                if len(idx) == 0:
+                    break
+            converged = abs(res).max(-1) <= tol
+    norm = np.nan_to_num(abs(res).max(-1), nan=np.inf).reshape(n, starts)
+    best = np.argmin(norm, -1) + starts * np.arange(n)
+    slr, ecc, x = (p[best, i].reshape(shape) for i in range(3))
+    return slr, ecc, x, converged[best].reshape(shape)
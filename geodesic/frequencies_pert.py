@@ -0,0 +1,350 @@
+import numpy as np
+from numpy import sqrt, pi, errstate, where
+from numpy import asarray, broadcast_arrays
+from scipy.special import poch, factorial
+
+try:
+    from geodesic.series import (
+        series_const,
+        series_var,
+        series_mul,
+        series_div,
+        series_sqrt,
+        series_compose,
+        series_eval,
+    )
+except:
+    from .series import (
+        series_const,
+        series_var,
+        series_mul,
+        series_div,
+        series_sqrt,
+        series_compose,
+        series_eval,
+    )
+
+# ------------------------------------------------------------------------------
+#  Small-spin expansion about Schwarzschild (|aa| << 1)
+#
+#  The Taylor coefficients cost more per orbit than one evaluation of the
+#  Kerr kernels of frequencies_batch, so mino_freqs_batch does not use them;
+#  they pay off for many spins at the same (slr, ecc, x), where
+#  small_spin_series is computed once and summed with series_eval.
+# ------------------------------------------------------------------------------
+
+SMALL_SPIN_ORDER = 4  # truncation error ~ aa^(order + 1)
+
+
+def _ellip_series_m0(m, n, order):
+    """
+    K(m), E(m) and Pi(n, m) as series in aa when m is itself a series with
+    vanishing constant term, using the hypergeometric expansions about m = 0.
+
+    Parameters:
+        m (array): series for the parameter (m[0] = 0)
+        n (array): characteristic (independent of aa)
+        order (int): truncation order
+
+    Returns:
+        K (array): series coefficients
+        E (array): series coefficients
+        Pi (array): series coefficients
+    """
+    jmax = order // 2 + 1  # m = O(aa^2)
+    j = np.arange(jmax + 1)
+    K_j = pi / 2 * (poch(0.5, j) / factorial(j)) ** 2
+    E_j = pi / 2 * poch(-0.5, j) * poch(0.5, j) / factorial(j) ** 2
+
+    # Pi_j from 2 (n - m) dPi/dm = E / (m - 1) + Pi
+    n = asarray(n, dtype=float)
+    P_j = np.zeros((jmax + 1,) + n.shape)
+    with errstate(invalid="ignore", divide="ignore"):
+        P_j[0] = pi / (2 * sqrt(1 - n))
+        for i in range(jmax):
+            P_j[i + 1] = where(
+                n != 0,
+                (P_j[i] * (1 + 2 * i) - E_j[: i + 1].sum()) / (2 * n * (i + 1)),
+                K_j[i + 1],
+            )
+
+    shape = (jmax + 1,) + (1,) * n.ndim
+    K = series_compose(K_j.reshape(shape), m)
+    E = series_compose(E_j.reshape(shape), m)
+    Pi = series_compose(P_j, m)
+    return K, E, Pi
+
+
+def _ellip_series(m, ns):
+    """
+    K(m), E(m) and Pi(n_i, m) as series in aa for parameter and
+    characteristic series with constant terms in [0, 1).
+
+    The integrands are expanded in aa at the nodes of the midpoint rule on
+    [0, pi/2], which converges spectrally because they are even about both
+    end points. (The derivative formulas for Pi have removable singularities
+    at n = m, which is where Pi(hm, kr^2) sits for aa = 0, so the coefficients
+    are not generated from them.) The node count is set by the distance of
+    the arguments from the branch point at 1.
+
+    Parameters:
+        m (array): series for the parameter
+        ns (list): series for the characteristics
+
+    Returns:
+        K (array): series coefficients
+        E (array): series coefficients
+        Pis (list): series coefficients of each Pi(n_i, m)
+    """
+    order = m.shape[0] - 1
+    top = max([np.nanmax(m[0], initial=0)] + [np.nanmax(n[0], initial=0) for n in ns])
+    tau = np.arccosh(1 / sqrt(np.clip(top, 1e-16, 1 - 1e-12)))
+    nodes = int(np.clip(np.ceil(12 / tau), 8, 1024))
+    theta = (np.arange(nodes) + 0.5) * pi / (2 * nodes)
+    s2 = np.sin(theta) ** 2
+
+    one = series_const(np.ones(m.shape[1:] + (nodes,)), order)
+    w = series_sqrt(one - m[..., None] * s2)  # sqrt(1 - m sin^2)
+    w_inv = series_div(one, w)
+    K = w_inv.mean(axis=-1) * pi / 2
+    E = w.mean(axis=-1) * pi / 2
+    Pis = [
+        series_div(w_inv, one - n[..., None] * s2).mean(axis=-1) * pi / 2 for n in ns
+    ]
+    return K, E, Pis
+
+
+def _small_spin_constants(slr, ecc, x, order):
+    """
+    Taylor coefficients in aa of En, l = Lz / x and Q about the SC values.
+
+    The constants are the solution of R(r1) = 0, R[r1, r2] = 0 (the divided
+    difference of the radial potential, which stays regular for circular
+    orbits) and the polar condition Q = (1 - x^2) (aa^2 (1 - En^2) + l^2),
+    with Lz = x l. Each Newton step with the SC Jacobian fixes one more
+    order in aa.
+
+    Parameters:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        order (int): truncation order in aa
+
+    Returns:
+        En (array): series coefficients of the energy
+        ell (array): series coefficients of Lz / x
+        Q (array): series coefficients of the Carter constant
+    """
+    slr, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (slr, ecc, x)))
+    ecc2 = ecc * ecc
+    x2 = x * x
+    zm2 = 1 - x2
+
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+    h1 = r1 + r2
+    h2 = r1 * r1 + r1 * r2 + r2 * r2
+    h3 = r1 * h2 + r2 ** 3
+
+    # SC values
+    En0 = sqrt((-4 * ecc2 + (-2 + slr) ** 2) / (slr * (-3 - ecc2 + slr)))
+    l0 = slr / sqrt(-3 - ecc2 + slr)
+    Q0 = (slr * slr * zm2) / (-3 - ecc2 + slr)
+
+    # Jacobian of the residuals with respect to (En, l, Q) at aa = 0
+    jac = np.zeros(slr.shape + (3, 3))
+    jac[..., 0, 0] = 2 * En0 * r1 ** 4
+    jac[..., 0, 1] = -2 * x2 * l0 * r1 * (r1 - 2)
+    jac[..., 0, 2] = -r1 * (r1 - 2)
+    jac[..., 1, 0] = 2 * En0 * h3
+    jac[..., 1, 1] = -2 * x2 * l0 * (h1 - 2)
+    jac[..., 1, 2] = -(h1 - 2)
+    jac[..., 2, 1] = -2 * zm2 * l0
+    jac[..., 2, 2] = 1
+
+    one = series_const(np.ones(slr.shape), order)
+    aa = series_var(order, slr.shape)
+    aa2 = series_mul(aa, aa)
+    En = series_const(En0, order)
+    ell = series_const(l0, order)
+    Q = series_const(Q0, order)
+    for _ in range(order):
+        P = x * ell - series_mul(aa, En)
+        P2Q = series_mul(P, P) + Q
+        c4 = series_mul(En, En) - one
+        c2 = -(aa2 + 2 * series_mul(aa, series_mul(En, P)) + P2Q)
+        c1 = 2 * P2Q
+        c0 = -series_mul(aa2, Q)
+        res = np.stack(
+            [
+                c4 * r1 ** 4 + 2 * r1 ** 3 * one + c2 * r1 * r1 + c1 * r1 + c0,
+                c4 * h3 + 2 * h2 * one + c2 * h1 + c1,
+                Q - zm2 * (series_mul(aa2, one - series_mul(En, En)) + series_mul(ell, ell)),
+            ],
+            axis=-1,
+        )
+        delta = np.linalg.solve(jac, res[..., None])[..., 0]
+        En = En - delta[..., 0]
+        ell = ell - delta[..., 1]
+        Q = Q - delta[..., 2]
+    return En, ell, Q
+
+
+def small_spin_constants_series(slr, ecc, x, order=SMALL_SPIN_ORDER):
+    """
+    Taylor coefficients in aa of En, Lz and Q about the SC values.
+
+    Parameters:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        order (int): truncation order in aa
+
+    Returns:
+        En (array): series coefficients of the energy
+        Lz (array): series coefficients of the angular momentum
+        Q (array): series coefficients of the Carter constant
+    """
+    x = asarray(x, dtype=float)
+    En, ell, Q = _small_spin_constants(slr, ecc, x, order)
+    return En, x * ell, Q
+
+
+def small_spin_series(slr, ecc, x, order=SMALL_SPIN_ORDER):
+    """
+    Taylor coefficients in aa of the constants and Mino frequencies about the
+    SC values. Polar orbits (x = 0) are supported; ups_phi then only contains
+    frame dragging.
+
+    Parameters:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        order (int): truncation order in aa
+
+    Returns:
+        En, Lz, Q (array): series coefficients of the constants
+        ups_r, ups_theta, ups_phi, gamma (array): series coefficients of the
+            Mino frequencies
+    """
+    slr, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (slr, ecc, x)))
+    En, ell, Q = _small_spin_constants(slr, ecc, x, order)
+    Lz = x * ell
+    one = series_const(np.ones(slr.shape), order)
+    aa = series_var(order, slr.shape)
+    aa2 = series_mul(aa, aa)
+    beta = series_mul(aa2, one - series_mul(En, En))  # aa^2 (1 - En^2)
+    omE2 = one - series_mul(En, En)
+
+    # radial roots
+    r1 = series_const(slr / (1 - ecc), order)
+    r2 = series_const(slr / (1 + ecc), order)
+    AplusB = series_div(2 * one, omE2) - (r1 + r2)
+    AB = series_div(series_mul(aa2, Q), series_mul(omE2, series_mul(r1, r2)))
+    r3 = (AplusB + series_sqrt(series_mul(AplusB, AplusB) - 4 * AB)) / 2
+    r4 = series_div(AB, r3)
+
+    sq = series_sqrt(one - aa2)
+    rp = one + sq
+    rm = one - sq
+
+    # radial sector
+    r1_3 = r1 - r3
+    r2_4 = r2 - r4
+    kr2 = series_div(series_mul(r1 - r2, r3 - r4), series_mul(r1_3, r2_4))
+    hr = series_div(r1 - r2, r1_3)
+    hp = series_div(series_mul(r1 - r2, r3 - rp), series_mul(r1_3, r2 - rp))
+    hm = series_div(series_mul(r1 - r2, r3 - rm), series_mul(r1_3, r2 - rm))
+    K_r, E_r, (Pi_hm, Pi_hp, Pi_hr) = _ellip_series(kr2, [hm, hp, hr])
+
+    Im = series_div(K_r - series_div(series_mul(r2 - r3, Pi_hm), r2 - rm), r3 - rm)
+    Ip = series_div(K_r - series_div(series_mul(r2 - r3, Pi_hp), r2 - rp), r3 - rp)
+    aL = series_mul(aa, Lz)
+    ups_r = series_div(pi * series_sqrt(series_mul(omE2, series_mul(r1_3, r2_4))), 2 * K_r)
+    phi_r = series_div(
+        series_mul(
+            aa,
+            -series_mul(-aL + 2 * series_mul(En, rm), Im)
+            + series_mul(-aL + 2 * series_mul(En, rp), Ip),
+        ),
+        series_mul(K_r, rp - rm),
+    )
+    t_r = 4 * En + series_div(
+        2
+        * series_div(
+            -series_mul(-2 * series_mul(aa2, En) + series_mul(-aL + 4 * En, rm), Im)
+            + series_mul(-2 * series_mul(aa2, En) + series_mul(-aL + 4 * En, rp), Ip),
+            rp - rm,
+        )
+        + 2 * series_mul(En, series_mul(r3, K_r) + series_mul(r2 - r3, Pi_hr))
+        + series_mul(
+            En,
+            series_mul(series_mul(r1_3, r2_4), E_r)
+            + series_mul(-series_mul(r1, r2) + series_mul(r3, r1 + r2 + r3), K_r)
+            + series_mul(series_mul(r2 - r3, r1 + r2 + r3 + r4), Pi_hr),
+        )
+        / 2.0,
+        K_r,
+    )
+
+    # polar sector: k_theta^2 = O(aa^2), expanded about k_theta = 0
+    zm2 = 1 - x * x
+    zp2 = beta + series_mul(ell, ell)
+    zp = series_sqrt(zp2)
+    ktheta2 = series_div(beta * zm2, zp2)
+    with errstate(invalid="ignore"):
+        # Pi_t is infinite for polar orbits, which have no Lz term
+        K_t, E_t, Pi_t = _ellip_series_m0(ktheta2, zm2, order)
+        phi_z = where(x == 0, 0, series_div(series_mul(Lz, Pi_t), K_t))
+    ups_theta = series_div(pi * zp, 2 * K_t)
+    t_z = series_div(series_mul(series_mul(En, zp2), K_t - E_t), series_mul(omE2, K_t))
+
+    return En, Lz, Q, ups_r, ups_theta, phi_r + phi_z, t_r + t_z
+
+
+def constants_small_spin(aa, slr, ecc, x, order=SMALL_SPIN_ORDER):
+    """
+    Constants of motion from the small-spin expansion about SC.
+
+    Parameters:
+        aa (array): spin parameter, |aa| << 1
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        order (int): truncation order in aa
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    En, Lz, Q = small_spin_constants_series(slr, ecc, x, order)
+    return series_eval(En, aa), series_eval(Lz, aa), series_eval(Q, aa)
+
+
+def mino_freqs_small_spin(aa, slr, ecc, x, order=SMALL_SPIN_ORDER):
+    """
+    Mino frequencies from the small-spin expansion about SC.
+
+    The truncation error is O(aa^(order + 1)). For many spins at the same
+    (slr, ecc, x), call small_spin_series once and sum it with series_eval.
+
+    Parameters:
+        aa (array): spin parameter, |aa| << 1
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        order (int): truncation order in aa
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+    """
+    series = small_spin_series(slr, ecc, x, order)
+    return tuple(series_eval(s, aa) for s in series[3:])
@@ -0,0 +1,188 @@
+import numpy as np
+from numpy import sqrt, pi, cos, errstate, where
+from numpy import asarray, broadcast_arrays
+
+try:
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import polar_roots_batch
+    from geodesic.coordinates.coords_gen import calc_dwr_dpsi
+except:
+    from .constants.constants import calc_constants_batch
+    from .geo_roots import polar_roots_batch
+    from .coordinates.coords_gen import calc_dwr_dpsi
+
+# ------------------------------------------------------------------------------
+#  Quadrature frequency engine
+#
+#  An independent check of the elliptic closed forms. With r = slr / (1 + ecc
+#  cos psi) and z = zm cos chi, the Mino time derivatives dlambda/dpsi (from
+#  Schmidt's J) and dlambda/dchi are smooth and even in the angles, so the
+#  radial and polar periods and the Mino time averages that make up ups_phi
+#  and gamma are integrals over [0, pi] that the midpoint rule (Gauss-Chebyshev
+#  in cos psi) evaluates with spectral accuracy. The same node count is used
+#  for every orbit. The convergence rate drops for high eccentricity and for
+#  nearly polar orbits, where Lz / (1 - z^2) is sharply peaked near the pole.
+#
+#  dt/dlambda and dphi/dlambda split into radial and polar parts (M = 1)
+#      T_r = (r^2 + a^2) P / Delta - a^2 En + a Lz,   T_z = a^2 En z^2
+#      Phi_r = a P / Delta - a En,                     Phi_z = Lz / (1 - z^2)
+#  with P = En (r^2 + a^2) - a Lz, as in radial_sector and polar_sector.
+# ------------------------------------------------------------------------------
+
+QUAD_NODES = 64  # midpoint nodes on [0, pi]
+
+
+def _nodes(n):
+    return (np.arange(n) + 0.5) * pi / n
+
+
+def radial_quadrature(En, Lz, Q, aa, slr, ecc, n=QUAD_NODES):
+    """
+    Nodes and weights for Mino time integrals over the radial motion.
+
+    The orbit arrays gain a trailing axis of length n; the Mino time average
+    of f(r) is (dlam * f(r)).sum(-1) / dlam.sum(-1).
+
+    Parameters:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+        aa (array): spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        r (array): radius at the nodes, shape S + (n,)
+        dlam (array): dlambda/dpsi at the nodes, shape S + (n,)
+    """
+    En, Lz, Q, aa, slr, ecc = (
+        asarray(v, dtype=float)[..., None] for v in (En, Lz, Q, aa, slr, ecc)
+    )
+    psi = _nodes(n)
+    # dlambda/dpsi: dw_r/dpsi with ups_r = 1
+    dlam = calc_dwr_dpsi(psi, 1, En, Lz, Q, aa, slr, ecc)
+    r = slr / (1 + ecc * cos(psi))
+    return r, dlam
+
+
+def polar_quadrature(zp, zm, En, aa, n=QUAD_NODES):
+    """
+    Nodes and weights for Mino time integrals over the polar motion, with
+    z = zm cos chi.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        aa (array): spin
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        z (array): cos(theta) at the nodes, shape S + (n,)
+        dlam (array): dlambda/dchi at the nodes, shape S + (n,)
+    """
+    zp, zm, En, aa = (asarray(v, dtype=float)[..., None] for v in (zp, zm, En, aa))
+    z = zm * cos(_nodes(n))
+    # (dz/dlambda)^2 = zm^2 sin^2 chi (zp^2 - a^2 (1 - En^2) z^2)
+    dlam = 1 / sqrt(zp * zp - aa * aa * (1 - En * En) * z * z)
+    return z, dlam
+
+
+def radial_sector_quad(En, Lz, Q, aa, slr, ecc, n=QUAD_NODES):
+    """
+    Radial contributions to the Mino frequencies by quadrature in psi.
+
+    Parameters:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+        aa (array): spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        phi_r (array): radial part of ups_phi
+        t_r (array): radial part of gamma
+    """
+    r, dlam = radial_quadrature(En, Lz, Q, aa, slr, ecc, n)
+    En, Lz, aa = (v[..., None] for v in (En, Lz, aa))
+    aa2 = aa * aa
+    r2a2 = r * r + aa2
+    delta = r * r - 2 * r + aa2
+    P = En * r2a2 - aa * Lz
+    lam_r = dlam.sum(-1)
+    phi_r = (dlam * (aa * P / delta - aa * En)).sum(-1) / lam_r
+    t_r = (dlam * (r2a2 * P / delta - aa2 * En + aa * Lz)).sum(-1) / lam_r
+    return n / lam_r, phi_r, t_r
+
+
+def polar_sector_quad(zp, zm, En, Lz, aa, n=QUAD_NODES):
+    """
+    Polar contributions to the Mino frequencies by quadrature in chi.
+
+    Parameters:
+        zp (array): polar root (see polar_roots_batch)
+        zm (array): polar root
+        En (array): energy
+        Lz (array): angular momentum
+        aa (array): spin
+
+    Keyword Args:
+        n (int): number of quadrature nodes
+
+    Returns:
+        ups_theta (array): polar Mino frequency
+        phi_z (array): polar part of ups_phi
+        t_z (array): polar part of gamma
+    """
+    z, dlam = polar_quadrature(zp, zm, En, aa, n)
+    En, Lz, aa = (v[..., None] for v in (En, Lz, aa))
+    z2 = z * z
+    lam_theta = dlam.sum(-1)
+    with errstate(invalid="ignore", divide="ignore"):
+        # Lz / (1 - z^2) is 0 / 0 on polar orbits at the pole
+        phi_z = where(Lz[..., 0] == 0, 0, (dlam * Lz / (1 - z2)).sum(-1) / lam_theta)
+    t_z = (dlam * aa * aa * En * z2).sum(-1) / lam_theta
+    return n / lam_theta, phi_z, t_z
+
+
+def mino_freqs_quad_batch(aa, slr, ecc, x, n=QUAD_NODES):
+    """
+    Mino frequencies of arrays of orbits by quadrature.
+
+    Every orbit class (SC, polar, equatorial, spherical, generic) goes
+    through the same integrals, so this is a check of mino_freqs_batch that
+    shares nothing with it beyond the constants and polar roots.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        n (int): number of quadrature nodes for each of psi and chi
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    ups_r, phi_r, t_r = radial_sector_quad(En, Lz, Q, aa, slr, ecc, n)
+    ups_theta, phi_z, t_z = polar_sector_quad(zp, zm, En, Lz, aa, n)
+    return ups_r, ups_theta, phi_r + phi_z, t_r + t_z
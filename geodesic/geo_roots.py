@@ -1,4 +1,5 @@
-from numpy import sqrt
+import numpy as np
+from numpy import sqrt, where, errstate, asarray, broadcast_arrays, sign, maximum
 
 
 def radial_roots(En, Q, aa, slr, ecc, M=1):
@@ -62,3 +63,134 @@ def polar_roots(En, Lz, aa, slr, x):
     else:
         zp = sqrt(aa * aa * (1 - En * En) + L2 / (1 - zm * zm))
     return zp, zm
+
+
+def radial_roots_batch(En, Q, aa, slr, ecc, M=1):
+    """
+    Array version of radial_roots.
+
+    Parameters:
+        En (array): energy
+        Q (array): Carter constant
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum [6, inf)
+        ecc (array): eccentricity [0, 1)
+
+    Keyword Args:
+        M (float) [1]: mass of the large body
+
+    Returns:
+        r1 (array): apastron
+        r2 (array): periastron
+        r3 (array)
+        r4 (array)
+    """
+    En = asarray(En, dtype=float)
+    En2 = En * En
+
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+
+    AplusB = (2 * M) / (1 - En2) - (r1 + r2)
+    AB = (aa * aa * Q) / ((1 - En2) * r1 * r2)
+    r3 = (AplusB + sqrt((AplusB * AplusB - 4 * AB))) / 2
+    with errstate(invalid="ignore", divide="ignore"):
+        r4 = where(r3 != 0, AB / r3, 0)
+    return r1, r2, r3, r4
+
+
+def polar_roots_batch(En, Lz, Q, aa, x):
+    """
+    Array version of polar_roots.
+
+    Unlike polar_roots, zp is continuous at x = 0: for polar orbits it is
+    computed from the Carter constant (zp^2 = Q), which is the limit of
+    a^2 (1 - En^2) + Lz^2 / x^2.
+
+    Parameters:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+        aa (array): spin parameter (0, 1)
+        x (array): inclination value given by cos(theta_inc)
+                   negative x -> retrograde
+                   positive x -> prograde
+
+    Returns:
+        zp (array)
+        zm (array)
+    """
+    x = asarray(x, dtype=float)
+    zm = sqrt(1 - x * x)
+    with errstate(invalid="ignore", divide="ignore"):
+        zp2 = where(x == 0, Q, aa * aa * (1 - En * En) + Lz * Lz / (x * x))
+    return sqrt(zp2), zm
+
+
+def inverse_roots_batch(En, Lz, Q, aa, M=1):
+    """
+    Orbit parameters and roots from the constants of motion; the inverse of
+    calc_constants_batch followed by radial_roots_batch and polar_roots_batch.
+
+    The roots r3 >= r4 come from the eigenvalues of the companion matrix of
+    the radial quartic R(r). The remaining factor of R is a quadratic with
+    real roots r1 >= r2. For (nearly) circular orbits, r1 and r2 come out
+    with about half the digits of the constants, as the problem is
+    ill-conditioned there. Only bound orbits, r1 >= r2 >= r3 >= r4, are
+    recovered. zm^2 is the smaller root of the polar quadratic
+    aa^2 (1 - En^2) z^4 - (aa^2 (1 - En^2) + Lz^2 + Q) z^2 + Q = 0. Every
+    step is an array operation; no iteration is done per orbit.
+
+    Parameters:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+        aa (array): spin parameter [0, 1)
+
+    Keyword Args:
+        M (float) [1]: mass of the large body
+
+    Returns:
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+        r1 (array): apastron
+        r2 (array): periastron
+        r3 (array)
+        r4 (array)
+        zp (array)
+        zm (array)
+    """
+    En, Lz, Q, aa = broadcast_arrays(*(asarray(v, dtype=float) for v in (En, Lz, Q, aa)))
+    En2m1 = En * En - 1
+    aa2 = aa * aa
+    xx = Lz - aa * En
+
+    # R(r) / (En^2 - 1) = r^4 + c3 r^3 + c2 r^2 + c1 r + c0
+    c3 = 2 * M / En2m1
+    c2 = (aa2 * En2m1 - Lz * Lz - Q) / En2m1
+    c1 = 2 * M * (xx * xx + Q) / En2m1
+    c0 = -aa2 * Q / En2m1
+    comp = np.zeros(En.shape + (4, 4))
+    comp[..., 0, :] = np.stack([-c3, -c2, -c1, -c0], -1)
+    comp[..., 1, 0] = comp[..., 2, 1] = comp[..., 3, 2] = 1
+    roots = np.sort(np.linalg.eigvals(comp).real, axis=-1)
+    r4, r3 = roots[..., 0], roots[..., 1]
+
+    # r1 and r2 from the quadratic factor
+    s12 = -c3 - r3 - r4
+    p12 = c2 - r3 * r4 - s12 * (r3 + r4)
+    r1 = (s12 + sqrt(maximum(s12 * s12 - 4 * p12, 0))) / 2
+    r2 = p12 / r1
+    slr = 2 * r1 * r2 / (r1 + r2)
+    ecc = (r1 - r2) / (r1 + r2)
+
+    beta = -aa2 * En2m1
+    b = beta + Lz * Lz + Q
+    disc = sqrt(maximum(b * b - 4 * beta * Q, 0))
+    zm2 = 2 * Q / (b + disc)
+    zm = sqrt(zm2)
+    x = sign(Lz) * sqrt(maximum(1 - zm2, 0))
+    # polar_roots_batch normalization, zp^2 = aa^2 (1 - En^2) + Lz^2 / x^2
+    zp = sqrt((b + disc) / 2)
+    return slr, ecc, x, r1, r2, r3, r4, zp, zm
@@ -6,12 +6,28 @@ try:
     from geodesic.frequencies import mino_freqs, find_omega, mino_freqs, boyer_freqs
     from geodesic.coordinates.coords import calc_coords
     from geodesic.coordinates.coords_gen import calc_gen_coords_mino
+    from geodesic.frequencies_batch import (
+        mino_freqs_batch,
+        boyer_freqs_batch,
+        mode_freqs_batch,
+        proper_time_freqs_batch,
+    )
+    from geodesic.coordinates.coords_circ_eq import calc_circular_eq_coords_batch
+    from geodesic.orbit_cache import cached_orbit_state
 except:
     from .constants.constants import calc_constants
     from .geo_roots import radial_roots, polar_roots
     from .frequencies import mino_freqs, find_omega, mino_freqs, boyer_freqs
     from .coordinates.coords import calc_coords
     from .coordinates.coords_gen import calc_gen_coords_mino
+    from .frequencies_batch import (
+        mino_freqs_batch,
+        boyer_freqs_batch,
+        mode_freqs_batch,
+        proper_time_freqs_batch,
+    )
+    from .coordinates.coords_circ_eq import calc_circular_eq_coords_batch
+    from .orbit_cache import cached_orbit_state
 
 
 def calc_consts(aa, slr, ecc, x):
@@ -29,6 +45,9 @@ def calc_consts(aa, slr, ecc, x):
         Lz (float): angular momentum
         Q (float): Carter constant
     """
+    state = cached_orbit_state(aa, slr, ecc, x)
+    if state is not None:
+        return state["En"], state["Lz"], state["Q"]
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
     return En, Lz, Q
 
@@ -49,6 +68,9 @@ def calc_radial_roots(aa, slr, ecc, x):
         r3 (float): radial root 3
         r4 (float): radial root 4
     """
+    state = cached_orbit_state(aa, slr, ecc, x)
+    if state is not None:
+        return state["r1"], state["r2"], state["r3"], state["r4"]
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
     r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc)
     return r1, r2, r3, r4
@@ -68,6 +90,9 @@ def calc_polar_roots(aa, slr, ecc, x):
         zp (float): polar root
         zm (float): polar root
     """
+    state = cached_orbit_state(aa, slr, ecc, x)
+    if state is not None:
+        return state["zp"], state["zm"]
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
     zp, zm = polar_roots(En, Lz, aa, slr, x)
     return zp, zm
@@ -90,6 +115,10 @@ def calc_mino_freqs(aa, slr, ecc, x, M=1):
         ups_phi (float): azimuthal Mino frequency
         gamma (float): temporal Mino frequency
     """
+    # the cache holds M = 1 orbits
+    state = cached_orbit_state(aa, slr, ecc, x) if M == 1 else None
+    if state is not None:
+        return state["ups_r"], state["ups_theta"], state["ups_phi"], state["gamma"]
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
     r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc, M)
     ups_r, ups_theta, ups_phi, gamma = mino_freqs(
@@ -98,7 +127,7 @@ def calc_mino_freqs(aa, slr, ecc, x, M=1):
     return ups_r, ups_theta, ups_phi, gamma
 
 
-def calc_boyer_freqs(aa, slr, ecc, x):
+def calc_boyer_freqs(aa, slr, ecc, x, M=1):
     """
     Compute Boyer-Lindquist frequencies.
 
@@ -108,11 +137,18 @@ def calc_boyer_freqs(aa, slr, ecc, x):
         ecc (float): eccentricity
         x (float): cos of the inclination
 
+    Keyword Args:
+        M (float) [1]: SMBH mass
+
     Returns:
         Omega_r (float): radial Boyer-Lindquist frequency
         Omega_theta (float): polar Boyer-Lindquist frequency
         Omega_phi (float): azimuthal Boyer-Lindquist frequency
     """
+    # the cache holds M = 1 orbits
+    state = cached_orbit_state(aa, slr, ecc, x) if M == 1 else None
+    if state is not None:
+        return state["omega_r"], state["omega_theta"], state["omega_phi"]
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
     r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc, M)
     ups_r, ups_theta, ups_phi, gamma = mino_freqs(
@@ -124,10 +160,72 @@ def calc_boyer_freqs(aa, slr, ecc, x):
     return omega_r, omega_theta, omega_phi
 
 
-def find_omega(en, em, kay, aa, slr, ecc, x):
+def calc_mino_freqs_batch(aa, slr, ecc, x):
+    """
+    Compute Mino frequencies for arrays of orbits.
+
+    Parameters:
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): temporal Mino frequency
+    """
+    return mino_freqs_batch(aa, slr, ecc, x)
+
+
+def calc_boyer_freqs_batch(aa, slr, ecc, x):
+    """
+    Compute Boyer-Lindquist frequencies for arrays of orbits.
+
+    Parameters:
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Returns:
+        Omega_r (array): radial Boyer-Lindquist frequency
+        Omega_theta (array): polar Boyer-Lindquist frequency
+        Omega_phi (array): azimuthal Boyer-Lindquist frequency
+    """
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_batch(aa, slr, ecc, x)
+    return boyer_freqs_batch(ups_r, ups_theta, ups_phi, gamma)
+
+
+def calc_proper_time_freqs_batch(aa, slr, ecc, x):
+    """
+    Compute proper time frequencies and the Detweiler redshift for arrays
+    of orbits.
+
+    Parameters:
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Returns:
+        omega_r (array): radial proper time frequency
+        omega_theta (array): polar proper time frequency
+        omega_phi (array): azimuthal proper time frequency
+        redshift (array): <dt/dtau>^-1
+    """
+    freqs = mino_freqs_batch(aa, slr, ecc, x, tau=True)
+    return proper_time_freqs_batch(*freqs)
+
+
+def find_omega(en, em, kay, aa, slr, ecc, x, M=1):
     """
     Compute gravitational wave frequency omega.
 
+    For many modes of the same orbit use calc_mode_freqs_batch, which
+    computes the orbital frequencies once.
+
     Parameters:
         en (int): radial mode
         em (int): azimuthal mode
@@ -137,19 +235,71 @@ def find_omega(en, em, kay, aa, slr, ecc, x):
         ecc (float): eccentricity
         x (float): cos of the inclination
 
+    Keyword Args:
+        M (float) [1]: SMBH mass
+
     Returns:
         omega (float): gravitational wave frequency
     """
+    omega_r, omega_theta, omega_phi = calc_boyer_freqs(aa, slr, ecc, x, M)
+    omega = en * omega_r + em * omega_phi + kay * omega_theta
+    return omega
+
+
+def calc_mode_freqs_batch(en, em, kay, aa, slr, ecc, x):
+    """
+    Compute the gravitational wave frequencies omega_mkn of every
+    combination of the given modes for arrays of orbits, from one frequency
+    evaluation per orbit. The arguments are ordered as in find_omega.
+
+    Parameters:
+        en (array): radial modes
+        em (array): azimuthal modes
+        kay (array): polar modes
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Returns:
+        omega (array): shape S + (len(em), len(kay), len(en))
+    """
+    omega_r, omega_theta, omega_phi = calc_boyer_freqs_batch(aa, slr, ecc, x)
+    return mode_freqs_batch(omega_r, omega_theta, omega_phi, em, kay, en)
+
+
+def _coords_state(aa, slr, ecc, x, qr0=0, qz0=0):
+    """
+    Constants, roots and Mino frequencies for the coordinate routines: the
+    cached state when the orbit cache is on, else only these, with Ct and
+    Cz left to calc_t and calc_phi.
+    """
+    state = cached_orbit_state(aa, slr, ecc, x, qr0, qz0)
+    if state is not None:
+        return state
     En, Lz, Q = calc_constants(aa, slr, ecc, x)
-    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc, M)
+    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots(En, Lz, aa, slr, x)
     ups_r, ups_theta, ups_phi, gamma = mino_freqs(
         r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x
     )
-    omega_r, omega_theta, omega_phi = boyer_freqs(
-        ups_r, ups_theta, ups_phi, gamma, aa, slr, ecc, x, M
-    )
-    omega = en * omega_r + em * omega_phi + kay * omega_theta
-    return omega
+    return {
+        "En": En,
+        "Lz": Lz,
+        "Q": Q,
+        "r1": r1,
+        "r2": r2,
+        "r3": r3,
+        "r4": r4,
+        "zp": zp,
+        "zm": zm,
+        "ups_r": float(ups_r),
+        "ups_theta": float(ups_theta),
+        "ups_phi": float(ups_phi),
+        "gamma": float(gamma),
+        "Ct": None,
+        "Cz": None,
+    }
 
 
 def coordinates(psi, aa, slr, ecc, x):
@@ -170,30 +320,22 @@ def coordinates(psi, aa, slr, ecc, x):
         theta (float): theta coordinate
         phi (float): phi coordinate
     """
-    En, Lz, Q = calc_constants(aa, slr, ecc, x)
-    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc, M=1)
-    zp, zm = polar_roots(En, Lz, aa, slr, x)
-    ups_r, ups_theta, ups_phi, gamma = mino_freqs(
-        r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x
-    )
-    # print(psi)
-    # print(chi)
+    state = _coords_state(aa, slr, ecc, x)
     t, r, theta, phi = calc_coords(
         psi,
-        # chi,
-        ups_r,
-        ups_theta,
-        ups_phi,
-        gamma,
-        r1,
-        r2,
-        r3,
-        r4,
-        zp,
-        zm,
-        En,
-        Lz,
-        Q,
+        state["ups_r"],
+        state["ups_theta"],
+        state["ups_phi"],
+        state["gamma"],
+        state["r1"],
+        state["r2"],
+        state["r3"],
+        state["r4"],
+        state["zp"],
+        state["zm"],
+        state["En"],
+        state["Lz"],
+        state["Q"],
         aa,
         slr,
         ecc,
@@ -202,7 +344,7 @@ def coordinates(psi, aa, slr, ecc, x):
     return t, r, theta, phi
 
 
-def mino_coords(mino_t, aa, slr, ecc, x):
+def mino_coords(mino_t, aa, slr, ecc, x, qr0=0, qz0=0):
     """
     Compute coordinates of the orbit given two angles psi and chi.
 
@@ -213,33 +355,57 @@ def mino_coords(mino_t, aa, slr, ecc, x):
         ecc (float): eccentricity
         x (float): cos of the inclination
 
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+
     Returns:
         t (float): time coordinate
         r (float): radial coordinate
         theta (float): theta coordinate
         phi (float): phi coordinate
     """
-    En, Lz, Q = calc_constants(aa, slr, ecc, x)
-    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc, M=1)
-    zp, zm = polar_roots(En, Lz, aa, slr, x)
-    ups_r, ups_theta, ups_phi, gamma = mino_freqs(
-        r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x
-    )
+    state = _coords_state(aa, slr, ecc, x, qr0, qz0)
     t, r, theta, phi = calc_gen_coords_mino(
         mino_t,
-        ups_r,
-        ups_theta,
-        ups_phi,
-        gamma,
-        r1,
-        r2,
-        r3,
-        r4,
-        zp,
-        zm,
-        En,
-        Lz,
-        Q,
+        state["ups_r"],
+        state["ups_theta"],
+        state["ups_phi"],
+        state["gamma"],
+        state["r1"],
+        state["r2"],
+        state["r3"],
+        state["r4"],
+        state["zp"],
+        state["zm"],
+        state["En"],
+        state["Lz"],
         aa,
+        qr0=qr0,
+        qz0=qz0,
+        Ct=state["Ct"],
+        Cz=state["Cz"],
     )
     return t, r, theta, phi
+
+
+def circular_eq_coords_batch(psi, aa, slr, x, mino=False):
+    """
+    Compute coordinates of many circular equatorial orbits (ecc = 0).
+
+    Parameters:
+        psi (float or array): radial angle (Mino time if mino is True)
+        aa (float or array): SMBH spin
+        slr (float or array): orbital radius
+        x (float or array): +1 -> prograde, -1 -> retrograde
+
+    Keyword Args:
+        mino (bool) [False]: interpret psi as Mino time
+
+    Returns:
+        t (array): time coordinate
+        r (array): radial coordinate
+        theta (array): theta coordinate
+        phi (array): phi coordinate
+    """
+    return calc_circular_eq_coords_batch(psi, aa, slr, x, mino=mino)
@@ -0,0 +1,182 @@
+import os
+import json
+
+import numpy as np
+from numpy import asarray, broadcast_arrays, errstate, full, nan
+
+try:
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+    from geodesic.frequencies_batch import mino_freqs_batch
+except:
+    from .constants.constants import calc_constants_batch
+    from .geo_roots import radial_roots_batch, polar_roots_batch
+    from .frequencies_batch import mino_freqs_batch
+
+# ------------------------------------------------------------------------------
+#  Persistent grid store of constants, roots and Mino frequencies
+#
+#  A store is a directory holding header.json (format version, grid axes,
+#  quantity names) and one .npy file per quantity, each a C-contiguous float64
+#  array of shape (len(aa), len(slr), len(ecc), len(x)). The loader maps the
+#  .npy files read-only with np.load(mmap_mode="r"), so opening a store reads
+#  only the header, and processes that open the same store share the page
+#  cache. Orbits that are not bound and stable are stored as nan.
+# ------------------------------------------------------------------------------
+
+GRID_STORE_VERSION = 1
+GRID_STORE_QUANTITIES = (
+    "En",
+    "Lz",
+    "Q",
+    "r1",
+    "r2",
+    "r3",
+    "r4",
+    "zp",
+    "zm",
+    "ups_r",
+    "ups_theta",
+    "ups_phi",
+    "gamma",
+)
+GRID_STORE_AXES = ("aa", "slr", "ecc", "x")
+
+
+def _grid_quantities(aa, slr, ecc, x):
+    """
+    Every GRID_STORE_QUANTITIES array on the broadcast orbits.
+    """
+    with errstate(invalid="ignore", divide="ignore"):
+        En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+        r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+        zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+        freqs = mino_freqs_batch(aa, slr, ecc, x)
+    values = (En, Lz, Q, r1, r2, r3, r4, zp, zm) + tuple(freqs)
+    bound = (r2 > r3) & (En < 1)
+    return [np.where(bound, v, nan) for v in values]
+
+
+def build_grid_store(path, aa, slr, ecc, x):
+    """
+    Compute constants, roots and Mino frequencies on a rectilinear grid and
+    write them as a grid store. The grid is filled one spin at a time, so
+    memory use is one (slr, ecc, x) slab per quantity.
+
+    Parameters:
+        path (str): directory of the store, created if needed
+        aa (array): increasing spin values
+        slr (array): increasing semi-latus rectum values
+        ecc (array): increasing eccentricity values
+        x (array): increasing inclination values
+    """
+    axes = [np.atleast_1d(asarray(v, dtype=float)) for v in (aa, slr, ecc, x)]
+    for name, axis in zip(GRID_STORE_AXES, axes):
+        if axis.ndim != 1 or (np.diff(axis) <= 0).any():
+            raise ValueError("grid axis %s must be 1D and increasing" % name)
+    shape = tuple(len(v) for v in axes)
+    os.makedirs(path, exist_ok=True)
+    arrays = [
+        np.lib.format.open_memmap(
+            os.path.join(path, name + ".npy"), mode="w+", dtype=float, shape=shape
+        )
+        for name in GRID_STORE_QUANTITIES
+    ]
+    slr_g, ecc_g, x_g = np.meshgrid(*axes[1:], indexing="ij")
+    for i, a in enumerate(axes[0]):
+        for array, values in zip(arrays, _grid_quantities(a, slr_g, ecc_g, x_g)):
+            array[i] = values
+    for array in arrays:
+        array.flush()
+    del arrays
+    header = {
+        "version": GRID_STORE_VERSION,
+        "quantities": list(GRID_STORE_QUANTITIES),
+        "axes": {name: axis.tolist() for name, axis in zip(GRID_STORE_AXES, axes)},
+    }
+    # written last, so an interrupted build is never read as a valid store
+    with open(os.path.join(path, "header.json"), "w") as fh:
+        json.dump(header, fh)
+
+
+def load_grid_store(path):
+    """
+    Open a grid store without reading its arrays.
+
+    Parameters:
+        path (str): directory of the store
+
+    Returns:
+        store (dict): "axes" (tuple of the aa, slr, ecc and x grids) and one
+            read-only memory-mapped array per quantity
+    """
+    with open(os.path.join(path, "header.json")) as fh:
+        header = json.load(fh)
+    if header["version"] != GRID_STORE_VERSION:
+        raise ValueError("unsupported grid store version %s" % header["version"])
+    store = {
+        "axes": tuple(
+            np.array(header["axes"][name], dtype=float) for name in GRID_STORE_AXES
+        )
+    }
+    for name in header["quantities"]:
+        store[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+    return store
+
+
+def _bracket(axis, v):
+    """
+    Lower grid index and weight of the upper neighbour along one axis; nan
+    weight outside the axis.
+    """
+    if len(axis) == 1:
+        return np.zeros(v.shape, dtype=int), np.where(v == axis[0], 0.0, nan)
+    i = np.clip(np.searchsorted(axis, v, side="right") - 1, 0, len(axis) - 2)
+    with errstate(invalid="ignore"):
+        t = (v - axis[i]) / (axis[i + 1] - axis[i])
+    return i, np.where((v >= axis[0]) & (v <= axis[-1]), t, nan)
+
+
+def grid_store_lookup(store, names, aa, slr, ecc, x, method="linear"):
+    """
+    Values of stored quantities at arbitrary orbits.
+
+    Parameters:
+        store (dict): output of load_grid_store
+        names (list): quantity names, e.g. ["ups_r", "gamma"]
+        aa (array): spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        method (str) ["linear"]: "linear" for multilinear interpolation,
+            "nearest" for the nearest grid point
+
+    Returns:
+        values (tuple): one array per name; nan outside the grid and where a
+            neighbouring grid orbit is not bound
+    """
+    if method not in ("linear", "nearest"):
+        raise ValueError("method must be 'linear' or 'nearest'")
+    pts = broadcast_arrays(*(asarray(v, dtype=float) for v in (aa, slr, ecc, x)))
+    shape = pts[0].shape
+    idx, weight = zip(*(_bracket(ax, v.ravel()) for ax, v in zip(store["axes"], pts)))
+    outside = np.isnan(np.stack(weight)).any(0)
+
+    if method == "nearest":
+        corner = tuple(i + (w > 0.5) for i, w in zip(idx, weight))
+        out = [np.asarray(store[name][corner]) for name in names]
+        return tuple(np.where(outside, nan, v).reshape(shape) for v in out)
+
+    out = [full(outside.shape, 0.0) for __ in names]
+    # 16 corners of the enclosing cell, weighted by distance
+    for corner in np.ndindex(2, 2, 2, 2):
+        c = tuple(i + k for i, k in zip(idx, corner))
+        w = np.prod([wt if k else 1 - wt for wt, k in zip(weight, corner)], axis=0)
+        # only read the corners that contribute, never those of outside points
+        nonzero = (w != 0) & ~outside
+        c = tuple(ci[nonzero] for ci in c)
+        for v, name in zip(out, names):
+            v[nonzero] += w[nonzero] * store[name][c]
+    return tuple(np.where(outside, nan, v).reshape(shape) for v in out)
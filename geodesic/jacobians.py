@@ -0,0 +1,427 @@
+import numpy as np
+from numpy import sqrt, pi, errstate
+from numpy import asarray, broadcast_arrays, full, nan
+from scipy.special import ellipk, ellipe
+
+try:
+    from geodesic.elliptic import (
+        ellippi,
+        ellipk_dm,
+        ellipe_dm,
+        ellippi_dn,
+        ellippi_dm,
+    )
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+except:
+    from .elliptic import ellippi, ellipk_dm, ellipe_dm, ellippi_dn, ellippi_dm
+    from .constants.constants import calc_constants_batch
+    from .geo_roots import radial_roots_batch, polar_roots_batch
+
+# ------------------------------------------------------------------------------
+#  Analytic Jacobians with respect to the orbit parameters (aa, slr, ecc, x)
+#
+#  Derivatives are carried forward through the closed forms: every quantity q
+#  has a tangent dq of shape (4,) + q.shape holding dq/daa, dq/dslr, dq/decc
+#  and dq/dx. The constants are differentiated implicitly from the conditions
+#  that define them, and the elliptic integrals through ellipk_dm and friends,
+#  so no integral is evaluated more than once. The Jacobians are returned with
+#  shape S + (outputs, 4), columns in the order (aa, slr, ecc, x).
+# ------------------------------------------------------------------------------
+
+
+def _radial_potential(r, En, Lz, Q, aa):
+    """
+    Partial derivatives of R(r) = P^2 - Delta (r^2 + (Lz - aa En)^2 + Q),
+    with P = En (r^2 + aa^2) - aa Lz and Delta = r^2 - 2 r + aa^2 (M = 1).
+    """
+    aa2 = aa * aa
+    P = En * (r * r + aa2) - aa * Lz
+    delta = r * r - 2 * r + aa2
+    xx = Lz - aa * En
+    V = r * r + xx * xx + Q
+    dEn = 2 * P * (r * r + aa2) + 2 * aa * delta * xx
+    dLz = -2 * aa * P - 2 * delta * xx
+    dQ = -delta
+    dr = 4 * En * r * P - (2 * r - 2) * V - 2 * r * delta
+    daa = 2 * P * (2 * aa * En - Lz) - 2 * aa * V + 2 * En * delta * xx
+    return dEn, dLz, dQ, dr, daa
+
+
+def _divided_potential(r1, r2, En, Lz, Q, aa):
+    """
+    Partial derivatives of the divided difference
+    R[r1, r2] = (R(r1) - R(r2)) / (r1 - r2), a polynomial in r1 and r2 that
+    stays regular for r1 = r2.
+    """
+    aa2 = aa * aa
+    xx = Lz - aa * En
+    c4 = En * En - 1
+    c2 = 2 * En * En * aa2 - 2 * aa * Lz * En - xx * xx - Q - aa2
+    h1 = r1 + r2
+    h3 = r1 * (r1 * r1 + r1 * r2 + r2 * r2) + r2 ** 3
+    dEn = 2 * En * h3 + (4 * En * aa2 - 2 * aa * Lz + 2 * aa * xx) * h1 - 4 * aa * xx
+    dLz = -2 * (aa * En + xx) * h1 + 4 * xx
+    dQ = 2 - h1
+    dr1 = c4 * (3 * r1 * r1 + 2 * r1 * r2 + r2 * r2) + 2 * (2 * r1 + r2) + c2
+    dr2 = c4 * (3 * r2 * r2 + 2 * r1 * r2 + r1 * r1) + 2 * (2 * r2 + r1) + c2
+    daa = (4 * En * En * aa - 2 * Lz * En + 2 * xx * En - 2 * aa) * h1 - 4 * xx * En
+    return dEn, dLz, dQ, dr1, dr2, daa
+
+
+def _constants_tangents(aa, slr, ecc, x, En, Lz, Q):
+    """
+    Tangents of En, Lz and Q from R(r1) = R[r1, r2] = 0 and
+    Q = (1 - x^2) (aa^2 (1 - En^2) + l^2) with Lz = x l.
+
+    Solving for (En, l, Q) rather than (En, Lz, Q) with R(r2) = 0 keeps the
+    system regular for circular (r1 = r2), equatorial (x^2 = 1), polar
+    (x = 0) and SC orbits.
+    """
+    zero = 0 * aa
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+    x2 = x * x
+    zm2 = 1 - x2
+    om = 1 - En * En
+    with errstate(invalid="ignore", divide="ignore"):
+        # l = |Lz / x|, from the Carter constant for polar orbits
+        ell = np.where(x != 0, Lz / x, sqrt(abs(Q - aa * aa * om)))
+    R1 = _radial_potential(r1, En, ell * x, Q, aa)
+    R12 = _divided_potential(r1, r2, En, ell * x, Q, aa)
+
+    A = np.stack(
+        [
+            np.stack([R1[0], x * R1[1], R1[2]], -1),
+            np.stack([R12[0], x * R12[1], R12[2]], -1),
+            np.stack([2 * zm2 * aa * aa * En, -2 * zm2 * ell, 1 + zero], -1),
+        ],
+        -2,
+    )
+    # columns aa, slr, ecc, x
+    dslr = (R1[3] / (1 - ecc), R12[3] / (1 - ecc) + R12[4] / (1 + ecc))
+    decc = (R1[3] * r1 / (1 - ecc), R12[3] * r1 / (1 - ecc) - R12[4] * r2 / (1 + ecc))
+    B = np.stack(
+        [
+            np.stack([R1[4], dslr[0], decc[0], ell * R1[1]], -1),
+            np.stack([R12[5], dslr[1], decc[1], ell * R12[1]], -1),
+            np.stack(
+                [-2 * zm2 * aa * om, zero, zero, 2 * x * (aa * aa * om + ell * ell)], -1
+            ),
+        ],
+        -2,
+    )
+    jac = -np.linalg.solve(A, B)
+    dEn, dell, dQ = (np.moveaxis(jac[..., i, :], -1, 0) for i in range(3))
+    dLz = x * dell + np.eye(4)[3].reshape((4,) + (1,) * np.ndim(x)) * ell
+    return dEn, dLz, dQ
+
+
+def _roots_tangents(aa, slr, ecc, x, En, Lz, Q, r3, r4, zp, zm, dEn, dLz, dQ):
+    """
+    Tangents of the radial and polar roots.
+    """
+    one = np.eye(4).reshape((4, 4) + (1,) * np.ndim(aa))
+    daa, dslr, decc, dx = one
+
+    dr1 = dslr / (1 - ecc) + slr * decc / (1 - ecc) ** 2
+    dr2 = dslr / (1 + ecc) - slr * decc / (1 + ecc) ** 2
+    r1 = slr / (1 - ecc)
+    r2 = slr / (1 + ecc)
+
+    # r3 and r4 solve r^2 - S r + P = 0
+    om = 1 - En * En
+    dom = -2 * En * dEn
+    S = r3 + r4
+    P = (aa * aa * Q) / (om * r1 * r2)
+    dS = -2 * dom / (om * om) - dr1 - dr2
+    dP = P * (2 * daa / aa + dQ / Q - dom / om - dr1 / r1 - dr2 / r2)
+    dr3 = (r3 * dS - dP) / (2 * r3 - S)
+    dr4 = (r4 * dS - dP) / (2 * r4 - S)
+
+    dzm = -x * dx / zm
+    dzp2 = 2 * aa * om * daa + aa * aa * dom + 2 * Lz * dLz / (x * x)
+    dzp2 = dzp2 - 2 * Lz * Lz * dx / (x * x * x)
+    dzp = dzp2 / (2 * zp)
+    return dr1, dr2, dr3, dr4, dzp, dzm
+
+
+def _radial_sector_tangents(r1, r2, r3, r4, En, Lz, aa, dr1, dr2, dr3, dr4, dEn, dLz):
+    """
+    radial_sector (M = 1) together with the tangents of its outputs.
+    """
+    daa = np.eye(4)[0].reshape((4,) + (1,) * np.ndim(aa))
+    aa2 = aa * aa
+    r12, d12 = r1 - r2, dr1 - dr2
+    r13, d13 = r1 - r3, dr1 - dr3
+    r23, d23 = r2 - r3, dr2 - dr3
+    r24, d24 = r2 - r4, dr2 - dr4
+    r34, d34 = r3 - r4, dr3 - dr4
+
+    s = sqrt(1 - aa2)
+    ds = -aa * daa / s
+    rp, drp = 1 + s, ds
+    rm, drm = 1 - s, -ds
+    w, dw = rp - rm, drp - drm
+
+    kr2 = (r12 * r34) / (r13 * r24)
+    dkr2 = kr2 * (d12 / r12 + d34 / r34 - d13 / r13 - d24 / r24)
+    hr = r12 / r13
+    dhr = hr * (d12 / r12 - d13 / r13)
+
+    K = ellipk(kr2)
+    E = ellipe(kr2)
+    dK = ellipk_dm(kr2, K, E) * dkr2
+    dE = ellipe_dm(kr2, K, E) * dkr2
+
+    def pi_h(h, dh):
+        Pi = ellippi(h, kr2)
+        dPi = ellippi_dn(h, kr2, K, E, Pi) * dh + ellippi_dm(h, kr2, E, Pi) * dkr2
+        return Pi, dPi
+
+    def horizon(rh, drh):
+        # (K - (r2 - r3) Pi(h) / (r2 - rh)) / (r3 - rh) and its tangent
+        h = (r12 * (r3 - rh)) / (r13 * (r2 - rh))
+        dh = h * (
+            d12 / r12
+            + (dr3 - drh) / (r3 - rh)
+            - d13 / r13
+            - (dr2 - drh) / (r2 - rh)
+        )
+        Pi, dPi = pi_h(h, dh)
+        u = r23 / (r2 - rh)
+        du = u * (d23 / r23 - (dr2 - drh) / (r2 - rh))
+        I = (K - u * Pi) / (r3 - rh)
+        dI = (dK - du * Pi - u * dPi - I * (dr3 - drh)) / (r3 - rh)
+        return I, dI
+
+    Im, dIm = horizon(rm, drm)
+    Ip, dIp = horizon(rp, drp)
+    Pr, dPr = pi_h(hr, dhr)
+
+    om = 1 - En * En
+    dom = -2 * En * dEn
+    ups_r = (pi * sqrt(om * r13 * r24)) / (2 * K)
+    dups_r = ups_r * ((dom / om + d13 / r13 + d24 / r24) / 2 - dK / K)
+
+    daL = daa * Lz + aa * dLz
+    cm = -aa * Lz + 2 * En * rm
+    cp = -aa * Lz + 2 * En * rp
+    dcm = -daL + 2 * (dEn * rm + En * drm)
+    dcp = -daL + 2 * (dEn * rp + En * drp)
+    N = -cm * Im + cp * Ip
+    dN = -dcm * Im - cm * dIm + dcp * Ip + cp * dIp
+    phi_r = aa * N / (K * w)
+    dphi_r = (daa * N + aa * dN) / (K * w) - phi_r * (dK / K + dw / w)
+
+    gm = -2 * aa2 * En + (-aa * Lz + 4 * En) * rm
+    gp = -2 * aa2 * En + (-aa * Lz + 4 * En) * rp
+    dg0 = -2 * (2 * aa * daa * En + aa2 * dEn)
+    dg1 = -daL + 4 * dEn
+    dgm = dg0 + dg1 * rm + (-aa * Lz + 4 * En) * drm
+    dgp = dg0 + dg1 * rp + (-aa * Lz + 4 * En) * drp
+    G = -gm * Im + gp * Ip
+    dG = -dgm * Im - gm * dIm + dgp * Ip + gp * dIp
+
+    T1 = 2 * G / w
+    dT1 = (2 * dG - T1 * dw) / w
+    H = r3 * K + r23 * Pr
+    T2 = 2 * En * H
+    dT2 = 2 * (dEn * H + En * (dr3 * K + r3 * dK + d23 * Pr + r23 * dPr))
+    Y = -r1 * r2 + r3 * (r1 + r2 + r3)
+    dY = -(dr1 * r2 + r1 * dr2) + dr3 * (r1 + r2 + r3) + r3 * (dr1 + dr2 + dr3)
+    Z = r1 + r2 + r3 + r4
+    dZ = dr1 + dr2 + dr3 + dr4
+    X = r13 * r24 * E + Y * K + r23 * Z * Pr
+    dX = (
+        (d13 * r24 + r13 * d24) * E
+        + r13 * r24 * dE
+        + dY * K
+        + Y * dK
+        + (d23 * Z + r23 * dZ) * Pr
+        + r23 * Z * dPr
+    )
+    T3 = En * X / 2
+    dT3 = (dEn * X + En * dX) / 2
+
+    T = T1 + T2 + T3
+    t_r = 4 * En + T / K
+    dt_r = 4 * dEn + (dT1 + dT2 + dT3 - T * dK / K) / K
+    return (ups_r, phi_r, t_r), (dups_r, dphi_r, dt_r)
+
+
+def _polar_sector_tangents(zp, zm, En, Lz, aa, dzp, dzm, dEn, dLz):
+    """
+    polar_sector together with the tangents of its outputs.
+    """
+    daa = np.eye(4)[0].reshape((4,) + (1,) * np.ndim(aa))
+    om = 1 - En * En
+    dom = -2 * En * dEn
+    zm2 = zm * zm
+    kt = (aa * aa * om * zm2) / (zp * zp)
+    dkt = kt * (2 * daa / aa + dom / om + 2 * dzm / zm - 2 * dzp / zp)
+
+    K = ellipk(kt)
+    E = ellipe(kt)
+    Pi = ellippi(zm2, kt)
+    dK = ellipk_dm(kt, K, E) * dkt
+    dE = ellipe_dm(kt, K, E) * dkt
+    dPi = ellippi_dn(zm2, kt, K, E, Pi) * 2 * zm * dzm + ellippi_dm(zm2, kt, E, Pi) * dkt
+
+    ups_theta = (pi * zp) / (2 * K)
+    dups_theta = ups_theta * (dzp / zp - dK / K)
+    phi_z = Lz * Pi / K
+    dphi_z = (dLz * Pi + Lz * dPi - phi_z * dK) / K
+    c = En * zp * zp / om
+    dc = c * (dEn / En + 2 * dzp / zp - dom / om)
+    f = 1 - E / K
+    df = -(dE - E * dK / K) / K
+    t_z = c * f
+    dt_z = dc * f + c * df
+    return (ups_theta, phi_z, t_z), (dups_theta, dphi_z, dt_z)
+
+
+def _jacobian(values, tangents):
+    """
+    Stack tangents of shape (4,) + S into an array of shape S + (n, 4).
+    """
+    shape = np.shape(values[0])
+    return np.stack(
+        [np.moveaxis(np.broadcast_to(d, (4,) + shape), 0, -1) for d in tangents], -2
+    )
+
+
+def _generic(aa, slr, ecc, x):
+    """
+    Broadcast float arrays of generic orbits. Raises ValueError unless
+    every orbit is generic.
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    if not ((aa != 0) & (ecc > 0) & (x != 0) & (x * x < 1)).all():
+        raise ValueError(
+            "frequency Jacobians take generic orbits only (aa != 0, ecc > 0, "
+            "0 < x^2 < 1); constants_jacobian_batch takes every orbit"
+        )
+    return aa, slr, ecc, x
+
+
+def constants_jacobian_batch(aa, slr, ecc, x):
+    """
+    Constants of motion and their Jacobian with respect to (aa, slr, ecc, x).
+
+    The Jacobian follows from differentiating R(r1) = R[r1, r2] = 0 and the
+    polar condition for the Carter constant, so it costs one 3 x 3 solve per
+    orbit. It covers every orbit class; orbits that are not bound give nan.
+    At ecc = 0 and x^2 = 1 the columns of ecc and x are the derivatives of
+    the analytic continuation (zero for ecc, by symmetry).
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+        jac (array): d(En, Lz, Q)/d(aa, slr, ecc, x), shape S + (3, 4)
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    with errstate(invalid="ignore", divide="ignore"):
+        En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    ok = np.isfinite(En) & np.isfinite(Lz) & np.isfinite(Q)
+    jac = full(aa.shape + (3, 4), nan)
+    if ok.any():
+        with errstate(invalid="ignore", divide="ignore"):
+            a, p, e, z = aa[ok], slr[ok], ecc[ok], x[ok]
+            tangents = _constants_tangents(a, p, e, z, En[ok], Lz[ok], Q[ok])
+            jac[ok] = _jacobian((a,), tangents)
+    return En, Lz, Q, jac
+
+
+def _mino_freqs_tangents(aa, slr, ecc, x):
+    """
+    Mino frequencies of generic orbits and their tangents.
+    """
+    En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    dEn, dLz, dQ = _constants_tangents(aa, slr, ecc, x, En, Lz, Q)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    dr1, dr2, dr3, dr4, dzp, dzm = _roots_tangents(
+        aa, slr, ecc, x, En, Lz, Q, r3, r4, zp, zm, dEn, dLz, dQ
+    )
+    (ups_r, phi_r, t_r), (dups_r, dphi_r, dt_r) = _radial_sector_tangents(
+        r1, r2, r3, r4, En, Lz, aa, dr1, dr2, dr3, dr4, dEn, dLz
+    )
+    (ups_theta, phi_z, t_z), (dups_theta, dphi_z, dt_z) = _polar_sector_tangents(
+        zp, zm, En, Lz, aa, dzp, dzm, dEn, dLz
+    )
+    values = (ups_r, ups_theta, phi_r + phi_z, t_r + t_z)
+    tangents = (dups_r, dups_theta, dphi_r + dphi_z, dt_r + dt_z)
+    return values, tangents
+
+
+def mino_freqs_jacobian_batch(aa, slr, ecc, x):
+    """
+    Mino frequencies and their Jacobian with respect to (aa, slr, ecc, x).
+
+    Computed for generic orbits (aa != 0, ecc > 0, 0 < |x| < 1); other
+    orbits raise ValueError. Orbits that are not bound give nan.
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity (0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+        jac (array): d(ups_r, ups_theta, ups_phi, gamma)/d(aa, slr, ecc, x),
+            shape S + (4, 4)
+    """
+    aa, slr, ecc, x = _generic(aa, slr, ecc, x)
+    with errstate(invalid="ignore", divide="ignore"):
+        values, tangents = _mino_freqs_tangents(aa, slr, ecc, x)
+        jac = _jacobian(values, tangents)
+    # orbits that are not bound lose some of their outputs; drop them all
+    bad = ~np.isfinite(jac).all((-2, -1))
+    freqs = [np.where(bad, nan, v) for v in values]
+    jac[bad] = nan
+    return (*freqs, jac)
+
+
+def boyer_freqs_jacobian_batch(aa, slr, ecc, x):
+    """
+    Boyer-Lindquist frequencies and their Jacobian with respect to
+    (aa, slr, ecc, x).
+
+    Computed for generic orbits (aa != 0, ecc > 0, 0 < |x| < 1); other
+    orbits raise ValueError. Orbits that are not bound give nan.
+
+    Parameters:
+        aa (array): spin parameter (0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity (0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        omega_r (array): radial boyer lindquist frequency
+        omega_theta (array): theta boyer lindquist frequency
+        omega_phi (array): phi boyer lindquist frequency
+        jac (array): d(omega_r, omega_theta, omega_phi)/d(aa, slr, ecc, x),
+            shape S + (3, 4)
+    """
+    ups_r, ups_theta, ups_phi, gamma, jac = mino_freqs_jacobian_batch(aa, slr, ecc, x)
+    ups = np.stack([ups_r, ups_theta, ups_phi], -1)
+    omega = ups / gamma[..., None]
+    # d(ups / gamma) = (d ups - omega d gamma) / gamma
+    jac = (jac[..., :3, :] - omega[..., None] * jac[..., 3:, :]) / gamma[..., None, None]
+    return omega[..., 0], omega[..., 1], omega[..., 2], jac
@@ -0,0 +1,330 @@
+import sys
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+from numpy import sqrt, pi, nan
+from scipy.special import ellipk, ellipe
+
+try:
+    from geodesic.elliptic import ellippi
+    from geodesic.constants import calc_constants
+    from geodesic.geo_roots import radial_roots, polar_roots
+    from geodesic.frequencies import mino_freqs, boyer_freqs
+    from geodesic.coordinates.coords_gen import calc_Ct, calc_Cz
+except:
+    from .elliptic import ellippi
+    from .constants.constants import calc_constants
+    from .geo_roots import radial_roots, polar_roots
+    from .frequencies import mino_freqs, boyer_freqs
+    from .coordinates.coords_gen import calc_Ct, calc_Cz
+
+# ------------------------------------------------------------------------------
+#  Opt-in, thread-safe LRU cache of per-orbit state (M = 1)
+#
+#  The state of one orbit is everything the scalar routines in geodesic.py
+#  recompute on each call: constants, roots, Mino and Boyer-Lindquist
+#  frequencies, the complete elliptic integrals of the radial and polar
+#  motion and the phase constants Ct and Cz. Keys are canonicalized
+#  (aa, slr, ecc, x, qr0, qz0): python floats, -0.0 -> 0.0 and phases reduced
+#  to [0, 2 pi). Entries are evicted least recently used first, when either
+#  the number of entries or their estimated size in bytes exceeds its limit.
+#
+#  States are computed outside the lock, so a slow orbit never blocks
+#  lookups of other orbits; two threads that miss on the same key at once
+#  both compute it and the second result is dropped.
+# ------------------------------------------------------------------------------
+
+ORBIT_CACHE_SIZE = 1024  # default largest number of cached orbits
+
+
+def _canonical(v):
+    v = float(v)
+    return 0.0 if v == 0 else v
+
+
+def orbit_key(aa, slr, ecc, x, qr0=0, qz0=0):
+    """
+    Canonical cache key of an orbit and its initial phases.
+
+    Parameters:
+        aa (float): spin parameter
+        slr (float): semi-latus rectum
+        ecc (float): eccentricity
+        x (float): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+
+    Returns:
+        key (tuple): six python floats
+    """
+    qr0, qz0 = (float(q) % (2 * pi) for q in (qr0, qz0))
+    return tuple(_canonical(v) for v in (aa, slr, ecc, x, qr0, qz0))
+
+
+def compute_orbit_state(aa, slr, ecc, x, qr0=0, qz0=0):
+    """
+    Per-orbit state, computed without the cache.
+
+    Parameters:
+        aa (float): spin parameter
+        slr (float): semi-latus rectum
+        ecc (float): eccentricity
+        x (float): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+
+    Returns:
+        state (mapping): read-only mapping with En, Lz, Q, r1, r2, r3, r4,
+            zp, zm, ups_r, ups_theta, ups_phi, gamma, omega_r, omega_theta,
+            omega_phi, the complete integrals K_r, E_r, Pi_hr, Pi_hp, Pi_hm
+            (moduli of calc_t_r) and K_theta, E_theta, Pi_theta (moduli of
+            calc_t_z and calc_phi_z), and the phase constants Ct, Cz
+    """
+    En, Lz, Q = calc_constants(aa, slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots(En, Lz, aa, slr, x)
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs(
+        r1, r2, r3, r4, En, Lz, Q, aa, slr, ecc, x
+    )
+    omega_r, omega_theta, omega_phi = boyer_freqs(
+        ups_r, ups_theta, ups_phi, gamma, aa, slr, ecc, x
+    )
+    state = {
+        "En": En,
+        "Lz": Lz,
+        "Q": Q,
+        "r1": r1,
+        "r2": r2,
+        "r3": r3,
+        "r4": r4,
+        "zp": zp,
+        "zm": zm,
+        "ups_r": float(ups_r),
+        "ups_theta": float(ups_theta),
+        "ups_phi": float(ups_phi),
+        "gamma": float(gamma),
+        "omega_r": float(omega_r),
+        "omega_theta": float(omega_theta),
+        "omega_phi": float(omega_phi),
+    }
+
+    kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+    rp = 1 + sqrt(1 - aa * aa)
+    rm = 1 - sqrt(1 - aa * aa)
+    hr = (r1 - r2) / (r1 - r3)
+    hp = ((r1 - r2) * (r3 - rp)) / ((r1 - r3) * (r2 - rp))
+    hm = ((r1 - r2) * (r3 - rm)) / ((r1 - r3) * (r2 - rm))
+    state.update(
+        K_r=float(ellipk(kr)),
+        E_r=float(ellipe(kr)),
+        Pi_hr=float(ellippi(hr, kr)),
+        Pi_hp=float(ellippi(hp, kr)),
+        Pi_hm=float(ellippi(hm, kr)),
+    )
+    if zp == 0:
+        # polar orbits, where z reaches the pole
+        state.update(K_theta=nan, E_theta=nan, Pi_theta=nan)
+    else:
+        ktheta = (aa * aa * (1 - En * En) * zm * zm) / (zp * zp)
+        state.update(
+            K_theta=float(ellipk(ktheta)),
+            E_theta=float(ellipe(ktheta)),
+            Pi_theta=float(ellippi(zm * zm, ktheta)),
+        )
+
+    # as in calc_t and calc_phi
+    if qr0 == 0 and qz0 == 0:
+        Ct = Cz = 0
+    else:
+        Ct = calc_Ct(qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa)
+        Cz = calc_Cz(qr0, qz0, r1, r2, r3, r4, zp, zm, En, Lz, aa)
+    state.update(Ct=float(Ct), Cz=float(Cz))
+    return MappingProxyType(state)
+
+
+def _nbytes(key, state):
+    """
+    Estimated size of one entry: the key, the state dict and their floats.
+    """
+    items = list(key) + list(state.keys()) + list(state.values())
+    size = sys.getsizeof(key) + sys.getsizeof(dict(state))
+    return size + sum(map(sys.getsizeof, items))
+
+
+class OrbitCache:
+    """
+    Thread-safe LRU cache of compute_orbit_state results.
+
+    Keyword Args:
+        maxsize (int) [ORBIT_CACHE_SIZE]: largest number of entries
+        max_bytes (int) [None]: largest estimated size of the entries in
+            bytes; None for no limit
+    """
+
+    def __init__(self, maxsize=ORBIT_CACHE_SIZE, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, aa, slr, ecc, x, qr0=0, qz0=0):
+        """
+        State of an orbit, computed on a miss.
+
+        Parameters:
+            aa (float): spin parameter
+            slr (float): semi-latus rectum
+            ecc (float): eccentricity
+            x (float): inclination value given by cos(theta_inc)
+
+        Keyword Args:
+            qr0 (float) [0]: initial radial phase
+            qz0 (float) [0]: initial polar phase
+
+        Returns:
+            state (mapping): see compute_orbit_state
+        """
+        key = orbit_key(aa, slr, ecc, x, qr0, qz0)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        state = compute_orbit_state(*key)
+        with self._lock:
+            if key not in self._entries:
+                size = _nbytes(key, state)
+                self._entries[key] = (state, size)
+                self._nbytes += size
+                self._evict()
+        return state
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self._nbytes > self.max_bytes)
+        ):
+            __, (__, size) = self._entries.popitem(last=False)
+            self._nbytes -= size
+            self._evictions += 1
+
+    def clear(self):
+        """
+        Remove every entry and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self):
+        """
+        Cache statistics.
+
+        Returns:
+            info (dict): hits, misses, evictions, currsize, nbytes, maxsize
+                and max_bytes
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "currsize": len(self._entries),
+                "nbytes": self._nbytes,
+                "maxsize": self.maxsize,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_cache = None
+
+
+def enable_orbit_cache(maxsize=ORBIT_CACHE_SIZE, max_bytes=None):
+    """
+    Turn on the process-wide orbit cache used by geodesic.py; an existing
+    cache is replaced.
+
+    Keyword Args:
+        maxsize (int) [ORBIT_CACHE_SIZE]: largest number of entries
+        max_bytes (int) [None]: largest estimated size of the entries in
+            bytes; None for no limit
+
+    Returns:
+        cache (OrbitCache)
+    """
+    global _cache
+    _cache = OrbitCache(maxsize, max_bytes)
+    return _cache
+
+
+def disable_orbit_cache():
+    """
+    Turn off the process-wide orbit cache and drop its entries.
+    """
+    global _cache
+    _cache = None
+
+
+def orbit_cache_info():
+    """
+    Statistics of the process-wide orbit cache.
+
+    Returns:
+        info (dict): see OrbitCache.info; None when the cache is off
+    """
+    cache = _cache
+    return None if cache is None else cache.info()
+
+
+def cached_orbit_state(aa, slr, ecc, x, qr0=0, qz0=0):
+    """
+    State of an orbit from the process-wide cache.
+
+    Parameters:
+        aa (float): spin parameter
+        slr (float): semi-latus rectum
+        ecc (float): eccentricity
+        x (float): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+
+    Returns:
+        state (mapping): see compute_orbit_state; None when the cache is off
+    """
+    cache = _cache
+    return None if cache is None else cache.get(aa, slr, ecc, x, qr0, qz0)
+
+
+def orbit_state(aa, slr, ecc, x, qr0=0, qz0=0):
+    """
+    State of an orbit, from the process-wide cache when it is on.
+
+    Parameters:
+        aa (float): spin parameter
+        slr (float): semi-latus rectum
+        ecc (float): eccentricity
+        x (float): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+
+    Returns:
+        state (mapping): see compute_orbit_state
+    """
+    cache = _cache
+    if cache is None:
+        return compute_orbit_state(aa, slr, ecc, x, qr0, qz0)
+    return cache.get(aa, slr, ecc, x, qr0, qz0)
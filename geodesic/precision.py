@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+
+from mpmath import MPContext
+
+# ------------------------------------------------------------------------------
+#  Per-thread mpmath precision
+#
+#  The mpmath paths (ellippi in frequencies.py and coords_gen.py) evaluate in
+#  a private mpmath context of the calling thread instead of the global
+#  mpmath.mp. Every thread starts at DEFAULT_PREC bits, whatever mpmath.mp is
+#  set to, and set_precision() or the precision() context manager change only
+#  the calling thread. Threads never share a context, so evaluating orbits
+#  concurrently at different precisions neither races nor changes results.
+# ------------------------------------------------------------------------------
+
+DEFAULT_PREC = 53  # bits, as a float64
+
+_local = threading.local()
+
+
+def mp_context():
+    """
+    mpmath context of the calling thread, created on first use.
+
+    Returns:
+        ctx (mpmath.MPContext)
+    """
+    ctx = getattr(_local, "ctx", None)
+    if ctx is None:
+        ctx = _local.ctx = MPContext()
+        ctx.prec = DEFAULT_PREC
+    return ctx
+
+
+def _bits(prec, dps):
+    if (prec is None) == (dps is None):
+        raise ValueError("give exactly one of prec and dps")
+    if prec is None:
+        # as mpmath does for mp.dps
+        return max(1, int(round((int(dps) + 1) * 3.3219280948873626)))
+    return int(prec)
+
+
+def get_precision():
+    """
+    Working precision of the calling thread.
+
+    Returns:
+        prec (int): precision in bits
+    """
+    return mp_context().prec
+
+
+def set_precision(prec=None, dps=None):
+    """
+    Set the working precision of the calling thread.
+
+    Keyword Args:
+        prec (int) [None]: precision in bits
+        dps (int) [None]: precision in decimal digits, instead of prec
+    """
+    mp_context().prec = _bits(prec, dps)
+
+
+@contextmanager
+def precision(prec=None, dps=None):
+    """
+    Context manager for the working precision of the calling thread inside
+    a with block.
+
+    Keyword Args:
+        prec (int) [None]: precision in bits
+        dps (int) [None]: precision in decimal digits, instead of prec
+    """
+    ctx = mp_context()
+    old = ctx.prec
+    ctx.prec = _bits(prec, dps)
+    try:
+        yield ctx
+    finally:
+        ctx.prec = old
+
+
+def mp_ellippi(*args):
+    """
+    mpmath.ellippi in the context of the calling thread.
+
+    Parameters:
+        args: n, m for the complete integral or n, phi, m for the
+            incomplete integral
+
+    Returns:
+        Pi (mpf): elliptic integral of the third kind
+    """
+    return mp_context().ellippi(*args)
@@ -0,0 +1,221 @@
+import numpy as np
+from numpy import sqrt, errstate, asarray, broadcast_arrays, full, nan, where
+from scipy.special import ellipk
+
+try:
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+except:
+    from .constants.constants import calc_constants_batch
+    from .geo_roots import radial_roots_batch, polar_roots_batch
+
+# ------------------------------------------------------------------------------
+#  r-theta resonances, n Omega_r + k Omega_theta = 0
+#
+#  gamma cancels in Omega_r / Omega_theta = ups_r / ups_theta, and both Mino
+#  frequencies need only K(k_r) and K(k_theta), so no Pi terms are evaluated.
+#  The ratio grows monotonically from 0 at the separatrix to 1 as slr -> inf,
+#  so each resonance is a single bracketed root in slr.
+# ------------------------------------------------------------------------------
+
+SEP_SLR_MAX = 20.0  # every separatrix lies below this
+
+
+def mino_freq_ratio_batch(aa, slr, ecc, x):
+    """
+    ups_r / ups_theta = Omega_r / Omega_theta for arrays of orbits.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        ratio (array): nan for orbits that are not bound and stable
+    """
+    aa, slr, ecc, x = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x))
+    )
+    with errstate(invalid="ignore", divide="ignore"):
+        En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+        r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+        zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+        kr = ((r1 - r2) * (r3 - r4)) / ((r1 - r3) * (r2 - r4))
+        ktheta = (aa * aa * (1 - En * En) * zm * zm) / (zp * zp)
+        ratio = (
+            sqrt((1 - En * En) * (r1 - r3) * (r2 - r4))
+            * ellipk(ktheta)
+            / (zp * ellipk(kr))
+        )
+    return where((r2 > r3) & (En < 1), ratio, nan)
+
+
+def calc_separatrix_batch(aa, ecc, x, tol=1e-13):
+    """
+    Separatrix slr of bound orbits, found by bisection on the condition
+    r2 > r3 (the orbit is bound and stable).
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        tol (float) [1e-13]: relative tolerance
+
+    Returns:
+        slr_sep (array): separatrix
+    """
+    aa, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (aa, ecc, x)))
+
+    def bound(slr):
+        ratio = mino_freq_ratio_batch(aa[..., None], slr, ecc[..., None], x[..., None])
+        return np.isfinite(ratio)
+
+    # spurious solutions exist well inside the separatrix, so bracket it
+    # below the highest point of a coarse scan that is not bound
+    scan = np.linspace(1, SEP_SLR_MAX, 96)
+    ok = bound(np.broadcast_to(scan, aa.shape + scan.shape))
+    last_bad = scan.size - 1 - np.argmin(ok[..., ::-1], -1)
+    lo = scan[last_bad]
+    hi = scan[np.minimum(last_bad + 1, scan.size - 1)]
+    while (hi - lo > tol * hi).any():
+        mid = (lo + hi) / 2
+        ok = bound(mid[..., None])[..., 0]
+        lo = where(ok, lo, mid)
+        hi = where(ok, mid, hi)
+    return hi
+
+
+def _illinois(func, lo, hi, f_lo, f_hi, tol, max_iter):
+    """
+    Vectorized Illinois (modified regula falsi) root of func in [lo, hi],
+    with f_lo < 0 < f_hi.
+    """
+    side = np.zeros(lo.shape)
+    for __ in range(max_iter):
+        mid = (lo * f_hi - hi * f_lo) / (f_hi - f_lo)
+        f_mid = func(mid)
+        pos = f_mid > 0
+        # keep the bracket, halving the stale end point after two moves on one side
+        hi, lo = where(pos, mid, hi), where(pos, lo, mid)
+        f_lo = where(pos, where(side > 0, f_lo / 2, f_lo), f_mid)
+        f_hi = where(pos, f_mid, where(side < 0, f_hi / 2, f_hi))
+        side = where(pos, 1.0, -1.0)
+        if (hi - lo <= tol * hi).all() or (f_mid == 0).all():
+            break
+    return where(f_mid == 0, mid, (lo * f_hi - hi * f_lo) / (f_hi - f_lo))
+
+
+def resonance_slr_batch(aa, ecc, x, pairs, tol=1e-14, max_iter=100):
+    """
+    slr of the resonances n Omega_r + k Omega_theta = 0.
+
+    n and k have opposite signs; (n, k) = (3, -2) is the resonance with
+    Omega_r / Omega_theta = 2 / 3. Pairs without a bound resonance (ratio
+    outside (0, 1)) give nan.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        pairs (list): (n, k) integer pairs
+
+    Keyword Args:
+        tol (float) [1e-14]: relative tolerance on slr
+        max_iter (int) [100]: largest number of iterations
+
+    Returns:
+        slr (array): shape S + (len(pairs),)
+    """
+    aa, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (aa, ecc, x)))
+    pairs = asarray(pairs, dtype=float).reshape(-1, 2)
+    target = -pairs[:, 1] / pairs[:, 0]
+    slr_sep = calc_separatrix_batch(aa, ecc, x)
+    return _resonance_slr(aa, ecc, x, target, slr_sep, tol, max_iter)
+
+
+def _resonance_slr(aa, ecc, x, target, lo, tol, max_iter, hi=None):
+    """
+    Bracketed root of ratio(slr) = target for every orbit and target.
+    """
+    aa, ecc, x = (v[..., None] for v in (aa, ecc, x))
+    shape = aa.shape[:-1] + target.shape
+    target = np.broadcast_to(target, shape)
+    valid = (target > 0) & (target < 1)
+    rho = where(valid, target, 0.5)
+
+    def func(slr):
+        return mino_freq_ratio_batch(aa, slr, ecc, x) - rho
+
+    # just outside the separatrix the ratio is ~0, so func < 0
+    lo = np.broadcast_to(lo[..., None], shape) * (1 + 1e-9)
+    f_lo = func(lo)
+    if hi is None:
+        # Omega_r / Omega_theta ~ sqrt(1 - 6 / slr) far away
+        hi = np.maximum(2 * lo, 12 / (1 - rho * rho))
+    hi = np.broadcast_to(hi, shape)
+    f_hi = func(hi)
+    for __ in range(60):
+        grow = ~(f_hi > 0)
+        if not grow.any():
+            break
+        lo, f_lo = where(grow, hi, lo), where(grow, f_hi, f_lo)
+        hi = where(grow, 2 * hi, hi)
+        f_hi = where(grow, func(hi), f_hi)
+    valid &= (f_lo < 0) & (f_hi > 0)
+    slr = _illinois(func, lo, hi, f_lo, f_hi, tol, max_iter)
+    return where(valid, slr, nan)
+
+
+def trace_resonance(aa, ecc, x, n, k, axis=-1, tol=1e-14, max_iter=100):
+    """
+    Resonance curve slr(ecc) or slr(x) by continuation along one axis.
+
+    The first point along axis is bracketed from the separatrix. Each later
+    point starts from a bracket of +/- 5 % around the previous solution;
+    only the points where that bracket misses the root, or where the
+    previous point has no solution, are bracketed from the separatrix again.
+
+    Parameters:
+        aa (array): spin parameter [0, 1)
+        ecc (array): eccentricity [0, 1)
+        x (array): inclination value given by cos(theta_inc)
+        n (int): radial harmonic
+        k (int): polar harmonic, of opposite sign to n
+
+    Keyword Args:
+        axis (int) [-1]: axis of the broadcast inputs to continue along
+        tol (float) [1e-14]: relative tolerance on slr
+        max_iter (int) [100]: largest number of iterations per point
+
+    Returns:
+        slr (array): resonant semi-latus rectum, the broadcast shape of
+            (aa, ecc, x)
+    """
+    aa, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (aa, ecc, x)))
+    aa, ecc, x = (np.moveaxis(v, axis, -1) for v in (aa, ecc, x))
+    target = np.array([-k / n])
+    slr = full(aa.shape, nan)
+    prev = None
+    for i in range(aa.shape[-1]):
+        a, e, z = aa[..., i], ecc[..., i], x[..., i]
+        if prev is None:
+            lo = calc_separatrix_batch(a, e, z)
+            res = _resonance_slr(a, e, z, target, lo, tol, max_iter)[..., 0]
+        else:
+            lo = prev * 0.95
+            hi = prev[..., None] * 1.05
+            res = _resonance_slr(a, e, z, target, lo, tol, max_iter, hi=hi)[..., 0]
+            # the bracket missed the root, fell below the separatrix, or the
+            # previous point had no solution to continue from
+            redo = ~np.isfinite(res)
+            if redo.any():
+                lo = calc_separatrix_batch(a[redo], e[redo], z[redo])
+                res[redo] = _resonance_slr(
+                    a[redo], e[redo], z[redo], target, lo, tol, max_iter
+                )[..., 0]
+        slr[..., i] = res
+        prev = res
+    return np.moveaxis(slr, -1, axis)
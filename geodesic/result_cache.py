@@ -0,0 +1,234 @@
+import sqlite3
+import struct
+
+import numpy as np
+from numpy import asarray, broadcast_arrays, full, nan
+
+try:
+    from geodesic.geodesic import calc_consts, calc_mino_freqs, calc_boyer_freqs
+    from geodesic.precision import get_precision
+except:
+    from .geodesic import calc_consts, calc_mino_freqs, calc_boyer_freqs
+    from .precision import get_precision
+
+# ------------------------------------------------------------------------------
+#  Persistent result cache in a local SQLite file
+#
+#  One table holds the results of calc_consts, calc_mino_freqs and
+#  calc_boyer_freqs, keyed by the function name, a version tag and the bit
+#  patterns (as 64 bit integers) of aa, slr, ecc, x and M, so a key matches
+#  only the exact same floats. Results are stored as packed doubles.
+#
+#  The version tag names the code and the working precision that produced a
+#  result; results of any other tag are never returned, and purge() deletes
+#  them. Bump RESULT_CACHE_VERSION whenever a change alters results.
+#
+#  The database is opened in WAL mode, so any number of processes can read
+#  while one writes; writers wait up to timeout seconds for each other.
+#  Lookups and inserts go through a temporary table and one transaction per
+#  batch. Two workers that miss on the same orbit at once both compute it;
+#  the second insert is ignored.
+# ------------------------------------------------------------------------------
+
+RESULT_CACHE_VERSION = 2
+
+_FUNCTIONS = {
+    "constants": (calc_consts, 3),
+    "mino_freqs": (calc_mino_freqs, 4),
+    "boyer_freqs": (calc_boyer_freqs, 3),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    func TEXT NOT NULL,
+    version TEXT NOT NULL,
+    aa INTEGER NOT NULL,
+    slr INTEGER NOT NULL,
+    ecc INTEGER NOT NULL,
+    x INTEGER NOT NULL,
+    M INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (func, version, aa, slr, ecc, x, M)
+) WITHOUT ROWID
+"""
+
+
+def default_version():
+    """
+    Version tag of results computed by this code at the working precision
+    of the calling thread.
+
+    Returns:
+        version (str)
+    """
+    return "%d:mp%d" % (RESULT_CACHE_VERSION, get_precision())
+
+
+def _bits(v):
+    # float64 bit patterns as python ints, which sqlite stores exactly
+    return asarray(v, dtype=np.float64).view(np.int64).tolist()
+
+
+def open_result_cache(path, timeout=30.0):
+    """
+    Open (or create) a result cache.
+
+    Parameters:
+        path (str): SQLite file name
+
+    Keyword Args:
+        timeout (float) [30.0]: seconds to wait for another writer
+
+    Returns:
+        conn (sqlite3.Connection): use with cached_constants,
+            cached_mino_freqs and cached_boyer_freqs; one per process or
+            thread
+    """
+    conn = sqlite3.connect(path, timeout=timeout)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(_SCHEMA)
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS query "
+        "(i INTEGER, aa INTEGER, slr INTEGER, ecc INTEGER, x INTEGER, M INTEGER)"
+    )
+    conn.commit()
+    return conn
+
+
+def purge(conn, version=None):
+    """
+    Delete results of every version tag but one.
+
+    Parameters:
+        conn (sqlite3.Connection): output of open_result_cache
+
+    Keyword Args:
+        version (str) [default_version()]: tag to keep
+
+    Returns:
+        deleted (int): number of results deleted
+    """
+    version = default_version() if version is None else version
+    with conn:
+        cur = conn.execute("DELETE FROM results WHERE version != ?", (version,))
+    return cur.rowcount
+
+
+def _lookup(conn, func, version, keys):
+    """
+    Stored values of the keys, as {index: bytes}.
+    """
+    with conn:
+        conn.execute("DELETE FROM query")
+        conn.executemany("INSERT INTO query VALUES (?, ?, ?, ?, ?, ?)", keys)
+        rows = conn.execute(
+            "SELECT query.i, results.value FROM query JOIN results "
+            "ON results.func = ? AND results.version = ? "
+            "AND results.aa = query.aa AND results.slr = query.slr "
+            "AND results.ecc = query.ecc AND results.x = query.x "
+            "AND results.M = query.M",
+            (func, version),
+        ).fetchall()
+        conn.execute("DELETE FROM query")
+    return dict(rows)
+
+
+def _cached(conn, name, aa, slr, ecc, x, M, version):
+    func, n_out = _FUNCTIONS[name]
+    version = default_version() if version is None else version
+    aa, slr, ecc, x, M = broadcast_arrays(
+        *(asarray(v, dtype=np.float64) for v in (aa, slr, ecc, x, M))
+    )
+    shape = aa.shape
+    params = [v.ravel() for v in (aa, slr, ecc, x, M)]
+    keys = list(zip(range(len(params[0])), *(_bits(v) for v in params)))
+    out = full((len(keys), n_out), nan)
+    found = _lookup(conn, name, version, keys)
+    for i, value in found.items():
+        out[i] = struct.unpack("<%dd" % n_out, value)
+
+    missing = [i for i in range(len(keys)) if i not in found]
+    rows = []
+    for i in missing:
+        a, p, e, z, m = (float(v[i]) for v in params)
+        # M is only an argument of the frequencies
+        values = func(a, p, e, z) if name == "constants" else func(a, p, e, z, M=m)
+        out[i] = [float(v) for v in values]
+        value = struct.pack("<%dd" % n_out, *out[i])
+        rows.append((name, version) + keys[i][1:] + (value,))
+    if rows:
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+    return tuple(out[:, k].reshape(shape) for k in range(n_out))
+
+
+def cached_constants(conn, aa, slr, ecc, x, version=None):
+    """
+    calc_consts through the result cache.
+
+    Parameters:
+        conn (sqlite3.Connection): output of open_result_cache
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Keyword Args:
+        version (str) [default_version()]: version tag
+
+    Returns:
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    return _cached(conn, "constants", aa, slr, ecc, x, 1.0, version)
+
+
+def cached_mino_freqs(conn, aa, slr, ecc, x, M=1, version=None):
+    """
+    calc_mino_freqs through the result cache.
+
+    Parameters:
+        conn (sqlite3.Connection): output of open_result_cache
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Keyword Args:
+        M (array) [1]: SMBH mass
+        version (str) [default_version()]: version tag
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): temporal Mino frequency
+    """
+    return _cached(conn, "mino_freqs", aa, slr, ecc, x, M, version)
+
+
+def cached_boyer_freqs(conn, aa, slr, ecc, x, M=1, version=None):
+    """
+    calc_boyer_freqs through the result cache.
+
+    Parameters:
+        conn (sqlite3.Connection): output of open_result_cache
+        aa (array): SMBH spin
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): cos of the inclination
+
+    Keyword Args:
+        M (array) [1]: SMBH mass
+        version (str) [default_version()]: version tag
+
+    Returns:
+        omega_r (array): radial Boyer-Lindquist frequency
+        omega_theta (array): polar Boyer-Lindquist frequency
+        omega_phi (array): azimuthal Boyer-Lindquist frequency
+    """
+    return _cached(conn, "boyer_freqs", aa, slr, ecc, x, M, version)
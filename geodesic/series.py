@@ -0,0 +1,159 @@
+import numpy as np
+from numpy import sqrt
+
+# ------------------------------------------------------------------------------
+#  Truncated power series in one small parameter
+#
+#  A series is stored as an array whose first axis holds the coefficients
+#  u[0] + u[1] eps + ... + u[N] eps^N; the remaining axes broadcast over orbits.
+# ------------------------------------------------------------------------------
+
+
+def series_const(c, order):
+    """
+    Constant series c + 0 eps + ... + 0 eps^N.
+
+    Parameters:
+        c (float or array): constant term
+        order (int): truncation order N
+
+    Returns:
+        u (array): series coefficients
+    """
+    c = np.asarray(c, dtype=float)
+    u = np.zeros((order + 1,) + c.shape)
+    u[0] = c
+    return u
+
+
+def series_var(order, shape=()):
+    """
+    The expansion parameter itself, 0 + eps.
+
+    Parameters:
+        order (int): truncation order N
+        shape (tuple): batch shape
+
+    Returns:
+        u (array): series coefficients
+    """
+    u = np.zeros((order + 1,) + tuple(shape))
+    if order > 0:
+        u[1] = 1
+    return u
+
+
+def series_mul(u, v):
+    """
+    Product of two truncated series (Cauchy product).
+
+    Parameters:
+        u (array): series coefficients
+        v (array): series coefficients
+
+    Returns:
+        w (array): series coefficients of u * v
+    """
+    order = u.shape[0] - 1
+    w = np.zeros(np.broadcast_shapes(u.shape, v.shape))
+    for k in range(order + 1):
+        for j in range(k + 1):
+            w[k] += u[j] * v[k - j]
+    return w
+
+
+def series_div(u, v):
+    """
+    Quotient of two truncated series. The constant term of v must not vanish.
+
+    Parameters:
+        u (array): series coefficients
+        v (array): series coefficients
+
+    Returns:
+        w (array): series coefficients of u / v
+    """
+    order = u.shape[0] - 1
+    w = np.zeros(np.broadcast_shapes(u.shape, v.shape))
+    for k in range(order + 1):
+        acc = u[k]
+        for j in range(1, k + 1):
+            acc = acc - v[j] * w[k - j]
+        w[k] = acc / v[0]
+    return w
+
+
+def series_sqrt(u):
+    """
+    Square root of a truncated series. The constant term must be positive.
+
+    Parameters:
+        u (array): series coefficients
+
+    Returns:
+        w (array): series coefficients of sqrt(u)
+    """
+    order = u.shape[0] - 1
+    w = np.zeros(u.shape)
+    w[0] = sqrt(u[0])
+    for k in range(1, order + 1):
+        acc = u[k]
+        for j in range(1, k):
+            acc = acc - w[j] * w[k - j]
+        w[k] = acc / (2 * w[0])
+    return w
+
+
+def series_compose(coeffs, u):
+    """
+    Evaluate the power series sum_j coeffs[j] u^j for a series u with zero
+    constant term, by Horner's rule.
+
+    Parameters:
+        coeffs (array): Taylor coefficients of the outer function, first axis
+                        is the power of u
+        u (array): inner series coefficients (u[0] = 0)
+
+    Returns:
+        w (array): series coefficients of the composition
+    """
+    order = u.shape[0] - 1
+    w = series_const(coeffs[-1], order)
+    for c in coeffs[-2::-1]:
+        w = series_mul(w, u)
+        w[0] = w[0] + c
+    return w
+
+
+def series_deriv(u):
+    """
+    Derivative with respect to the expansion parameter (the highest
+    coefficient of the result is zero).
+
+    Parameters:
+        u (array): series coefficients
+
+    Returns:
+        w (array): series coefficients of du / deps
+    """
+    w = np.zeros(u.shape)
+    k = np.arange(1, u.shape[0]).reshape((-1,) + (1,) * (u.ndim - 1))
+    w[:-1] = k * u[1:]
+    return w
+
+
+def series_eval(u, eps):
+    """
+    Sum a truncated series at eps (Horner's rule).
+
+    Parameters:
+        u (array): series coefficients
+        eps (float or array): value of the expansion parameter
+
+    Returns:
+        value (float or array)
+    """
+    value = u[-1]
+    for c in u[-2::-1]:
+        value = value * eps + c
+    return value
@@ -0,0 +1,427 @@
+import numpy as np
+from numpy import pi, cos, log, exp, errstate, asarray, broadcast_arrays, full, nan
+from numpy import where
+
+try:
+    from geodesic.constants.constants import calc_constants_batch
+    from geodesic.frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+    from geodesic.resonances import calc_separatrix_batch
+except:
+    from .constants.constants import calc_constants_batch
+    from .frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+    from .resonances import calc_separatrix_batch
+
+# ------------------------------------------------------------------------------
+#  Chebyshev surrogates of the Mino frequencies and constants at fixed spin
+#
+#  The frequencies are smooth in (ecc, x) but go like 1 / log(slr - slr_sep)
+#  at the separatrix, so the expansions are in
+#      s = log(slr - slr_sep(ecc, x)),  ecc,  x
+#  where slr_sep is itself a 2D Chebyshev fit. The training orbits are placed
+#  with the fitted slr_sep, so its own error only shifts the coordinates and
+#  does not enter the surrogate error.
+#
+#  The domain is split in half along the worst resolved direction until every
+#  cell meets the tolerance. A cell is accepted when its largest error on a
+#  check grid (2 n points per direction, offset from the fit nodes) is below
+#  tol times the largest |value| of that quantity on the domain, so tol is an
+#  absolute error in units of that value: quantities that are small in part
+#  of the domain (Lz, Q, ups_phi) have larger relative errors there. Cells
+#  that still miss tol at max_depth are kept and marked in "converged". The
+#  check errors are stored with the surrogate; they are an a posteriori
+#  estimate, not a rigorous bound.
+#
+#  Coefficients too small to matter at tol are zeroed and skipped by the
+#  evaluator. It maps all points to their cells and Chebyshev bases at once,
+#  sorts them by cell, and sums each cell's expansion over (ecc, x) with one
+#  matrix product per block of its points.
+#
+#  A surrogate is a dict of arrays, saved with save_surrogate as one .npz.
+# ------------------------------------------------------------------------------
+
+SURROGATE_QUANTITIES = ("ups_r", "ups_theta", "ups_phi", "gamma", "En", "Lz", "Q")
+SURROGATE_DEGREE = 10  # Chebyshev nodes per direction in each cell
+SEPARATRIX_DEGREE = 16  # Chebyshev nodes per direction of slr_sep(ecc, x)
+EVAL_BLOCK = 2048  # points per basis block in eval_surrogate
+
+
+def _cheb_nodes(n):
+    return cos(pi * (np.arange(n) + 0.5) / n)[::-1]
+
+
+def _cheb_matrix(n):
+    """
+    Values on _cheb_nodes(n) -> Chebyshev coefficients.
+    """
+    k = np.arange(n)[:, None]
+    j = np.arange(n)[::-1][None, :]
+    mat = 2 / n * cos(pi * k * (j + 0.5) / n)
+    mat[0] /= 2
+    return mat
+
+
+def _cheb_basis(t, n, last=True):
+    """
+    T_0(t) ... T_{n-1}(t), shape t.shape + (n,), or (n,) + t.shape if not
+    last.
+    """
+    # filled along a leading axis, so each recurrence step is contiguous
+    basis = np.empty((n,) + np.shape(t))
+    basis[0] = 1
+    if n > 1:
+        basis[1] = t
+    t2 = 2 * asarray(t)
+    for k in range(2, n):
+        np.multiply(t2, basis[k - 1], out=basis[k])
+        basis[k] -= basis[k - 2]
+    return np.moveaxis(basis, 0, -1) if last else basis
+
+
+def _to_unit(v, lo, hi):
+    return (2 * v - (lo + hi)) / (hi - lo)
+
+
+def _from_unit(t, lo, hi):
+    return ((hi - lo) * t + (lo + hi)) / 2
+
+
+def _fit(values, n, axes):
+    """
+    Chebyshev coefficients of values sampled on the tensor grid of
+    _cheb_nodes(n) along the given axes.
+    """
+    mat = _cheb_matrix(n)
+    for ax in axes:
+        values = np.moveaxis(np.tensordot(mat, values, axes=(1, ax)), 0, ax)
+    return values
+
+
+def _separatrix_fit(aa, ecc, x, n):
+    t = _cheb_nodes(n)
+    e, z = np.meshgrid(_from_unit(t, *ecc), _from_unit(t, *x), indexing="ij")
+    return _fit(calc_separatrix_batch(aa, e, z), n, (0, 1))
+
+
+def _separatrix_eval(sur, ecc, x):
+    n = sur["sep_coeffs"].shape[0]
+    (e_lo, e_hi), (x_lo, x_hi) = sur["domain"][1:]
+    te = _cheb_basis(_to_unit(ecc, e_lo, e_hi), n)
+    tx = _cheb_basis(_to_unit(x, x_lo, x_hi), n)
+    return ((te @ sur["sep_coeffs"]) * tx).sum(-1)
+
+
+def _quantities(aa, slr, ecc, x):
+    with errstate(invalid="ignore", divide="ignore"):
+        En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+        freqs = mino_freqs_batch(aa, slr, ecc, x)
+    return np.stack(freqs + (En, Lz, Q), -1)
+
+
+def _points(sur, s, ecc, x):
+    return sur["aa"], _separatrix_eval(sur, ecc, x) + exp(s), ecc, x
+
+
+def _cell_grid(lo, hi, t):
+    return np.meshgrid(*(_from_unit(t, lo[d], hi[d]) for d in range(3)), indexing="ij")
+
+
+def _truncate(coeffs, scale, budget):
+    """
+    Zero the smallest coefficients, keeping the sum of the dropped |c| / scale
+    of every quantity below budget (|T_k| <= 1 bounds their contribution).
+    """
+    mag = abs(coeffs).reshape(-1, coeffs.shape[-1]) / scale
+    order = np.argsort(mag, 0)
+    dropped = np.cumsum(np.take_along_axis(mag, order, 0), 0) <= budget
+    keep = np.ones(mag.shape, dtype=bool)
+    np.put_along_axis(keep, order, ~dropped, 0)
+    return np.where(keep.any(-1).reshape(coeffs.shape[:-1])[..., None], coeffs, 0)
+
+
+def _cell_matrix(coeffs):
+    """
+    One cell's coefficients as a matrix for _eval_cell: rows are the
+    (ecc, x) basis pairs and columns the (s, quantity) pairs, keeping only
+    the rows and s orders that survived _truncate.
+    """
+    n, q = coeffs.shape[0], coeffs.shape[-1]
+    mat = coeffs.transpose(1, 2, 0, 3).reshape(n * n, n * q)
+    rows = np.nonzero((mat != 0).any(-1))[0]
+    ns = int(np.nonzero((coeffs != 0).any((1, 2, 3)))[0].max(initial=0)) + 1
+    return rows, mat[rows].reshape(len(rows), n, q)[:, :ns].reshape(len(rows), -1)
+
+
+def _contract(rows, mat, ts, te, tx):
+    """
+    One cell's expansion from the bases of its points, each of shape (n, m)
+    (leading axis the order); returns the values, shape (Q, m).
+    """
+    n, m = te.shape
+    ns = ts.shape[0]
+    # sum over (ecc, x) with one matmul, then over the few s orders left
+    tex = (te[:, None, :] * tx[None, :, :]).reshape(n * n, m)[rows]
+    values = (mat.T @ tex).reshape(ns, -1, m)
+    return np.einsum("im,iqm->qm", ts, values)
+
+
+def _eval_cell(coeffs, lo, hi, s, ecc, x, mat=None):
+    """
+    Values of one cell's expansion at points inside it, shape (m, Q).
+    """
+    n, q = coeffs.shape[0], coeffs.shape[-1]
+    rows, mat = _cell_matrix(coeffs) if mat is None else mat
+    ns = mat.shape[1] // q
+    ts = _cheb_basis(_to_unit(s, lo[0], hi[0]), ns, last=False)
+    te, tx = (
+        _cheb_basis(_to_unit(v, lo[d], hi[d]), n, last=False)
+        for d, v in ((1, ecc), (2, x))
+    )
+    return _contract(rows, mat, ts, te, tx).T
+
+
+def build_surrogate(
+    aa,
+    dslr,
+    ecc,
+    x,
+    tol=1e-10,
+    n=SURROGATE_DEGREE,
+    n_sep=SEPARATRIX_DEGREE,
+    max_depth=12,
+):
+    """
+    Adaptive Chebyshev surrogate of the Mino frequencies and constants of
+    bound orbits at fixed spin.
+
+    Parameters:
+        aa (float): spin parameter [0, 1)
+        dslr (tuple): (lo, hi) range of slr - slr_sep, lo > 0
+        ecc (tuple): (lo, hi) range of eccentricity [0, 1)
+        x (tuple): (lo, hi) range of inclination x = cos(theta_inc)
+
+    Keyword Args:
+        tol (float) [1e-10]: absolute error target of each quantity, in
+            units of its largest |value| on the domain
+        n (int) [SURROGATE_DEGREE]: nodes per direction in each cell
+        n_sep (int) [SEPARATRIX_DEGREE]: nodes per direction of the
+            separatrix fit
+        max_depth (int) [12]: largest number of splits of a cell
+
+    Returns:
+        sur (dict): surrogate for eval_surrogate and save_surrogate; its
+            "converged" array is False for the cells accepted at max_depth
+            with a check error above tol
+    """
+    if dslr[0] <= 0:
+        raise ValueError("dslr must be positive: the separatrix is singular")
+    sur = {
+        "aa": float(aa),
+        "domain": np.array([log(dslr), ecc, x], dtype=float),
+        "tol": float(tol),
+    }
+    sur["sep_coeffs"] = _separatrix_fit(aa, sur["domain"][1], sur["domain"][2], n_sep)
+
+    t = _cheb_nodes(n)
+    t_check = np.linspace(-1, 1, 2 * n)
+    root_lo, root_hi = sur["domain"][:, 0], sur["domain"][:, 1]
+
+    # scale of each quantity, from a check grid over the whole domain
+    values = _quantities(*_points(sur, *_cell_grid(root_lo, root_hi, t_check)))
+    if not np.isfinite(values).all():
+        raise ValueError("domain contains orbits that are not bound and stable")
+    scale = abs(values).reshape(-1, len(SURROGATE_QUANTITIES)).max(0)
+
+    # binary tree; leaves hold cell indices, internal nodes split dimensions
+    split_dim, split_val, left, right, leaf = [], [], [], [], []
+    cell_lo, cell_hi, cell_coeffs, cell_error, converged = [], [], [], [], []
+    stack = [(root_lo, root_hi, 0, None)]
+    while stack:
+        lo, hi, depth, parent = stack.pop()
+        node = len(leaf)
+        split_dim.append(-1)
+        split_val.append(nan)
+        left.append(-1)
+        right.append(-1)
+        leaf.append(-1)
+        if parent is not None:
+            (left if parent[1] == 0 else right)[parent[0]] = node
+
+        values = _quantities(*_points(sur, *_cell_grid(lo, hi, t)))
+        coeffs = _truncate(_fit(values, n, (0, 1, 2)), scale, tol / 4)
+        grid = [v.ravel() for v in _cell_grid(lo, hi, t_check)]
+        check = _quantities(*_points(sur, *grid))
+        error = abs(_eval_cell(coeffs, lo, hi, *grid) - check).max(0) / scale
+        if not (error.max() > tol) or depth == max_depth:
+            leaf[node] = len(cell_coeffs)
+            cell_lo.append(lo)
+            cell_hi.append(hi)
+            cell_coeffs.append(coeffs)
+            cell_error.append(error)
+            converged.append(not (error.max() > tol))
+            continue
+
+        # split where the highest coefficients along a direction are largest
+        tail = [
+            (abs(np.moveaxis(coeffs, d, 0)[-2:]).sum((0, 1, 2)) / scale).max()
+            for d in range(3)
+        ]
+        dim = int(np.argmax(tail))
+        mid = (lo[dim] + hi[dim]) / 2
+        split_dim[node], split_val[node] = dim, mid
+        hi_left, lo_right = hi.copy(), lo.copy()
+        hi_left[dim], lo_right[dim] = mid, mid
+        stack.append((lo_right, hi, depth + 1, (node, 1)))
+        stack.append((lo, hi_left, depth + 1, (node, 0)))
+
+    sur.update(
+        split_dim=np.array(split_dim),
+        split_val=np.array(split_val),
+        left=np.array(left),
+        right=np.array(right),
+        leaf=np.array(leaf),
+        cell_lo=np.array(cell_lo),
+        cell_hi=np.array(cell_hi),
+        coeffs=np.array(cell_coeffs),
+        error=np.array(cell_error),
+        converged=np.array(converged),
+    )
+    return sur
+
+
+def save_surrogate(path, sur):
+    """
+    Write a surrogate to a .npz file.
+
+    Parameters:
+        path (str): file name
+        sur (dict): output of build_surrogate
+    """
+    np.savez(path, **sur)
+
+
+def load_surrogate(path):
+    """
+    Read a surrogate written by save_surrogate.
+
+    Parameters:
+        path (str): file name
+
+    Returns:
+        sur (dict): surrogate for eval_surrogate
+    """
+    with np.load(path) as data:
+        sur = {k: data[k] for k in data.files}
+    for k in ("aa", "tol"):
+        sur[k] = float(sur[k])
+    return sur
+
+
+def surrogate_error(sur):
+    """
+    Largest check-grid error of each quantity over all cells, as an
+    absolute error in units of its largest |value| on the domain. It is
+    above sur["tol"] only if some cells did not converge (sur["converged"]).
+
+    Parameters:
+        sur (dict): output of build_surrogate
+
+    Returns:
+        error (dict): {quantity: error} for SURROGATE_QUANTITIES
+    """
+    return dict(zip(SURROGATE_QUANTITIES, sur["error"].max(0)))
+
+
+def _eval_surrogate(sur, slr, ecc, x, cols):
+    """
+    Columns cols of SURROGATE_QUANTITIES at the given orbits.
+    """
+    slr, ecc, x = broadcast_arrays(*(asarray(v, dtype=float) for v in (slr, ecc, x)))
+    shape = slr.shape
+    ecc, x = ecc.ravel(), x.ravel()
+    with errstate(invalid="ignore"):
+        s = log(slr.ravel() - _separatrix_eval(sur, ecc, x))
+    pts = np.stack([s, ecc, x], -1)
+    domain = sur["domain"]
+    inside = ((pts >= domain[:, 0]) & (pts <= domain[:, 1])).all(-1)
+
+    # descend the tree, all points at once, dropping those that reach a leaf
+    node = np.zeros(len(s), dtype=int)
+    todo = np.nonzero(inside)[0]
+    while len(todo):
+        dim = sur["split_dim"][node[todo]]
+        todo, dim = todo[dim >= 0], dim[dim >= 0]
+        nd = node[todo]
+        go_right = pts[todo, dim] >= sur["split_val"][nd]
+        node[todo] = where(go_right, sur["right"][nd], sur["left"][nd])
+    cell = sur["leaf"][node]
+
+    # points sorted by cell, so that each cell's points are one slice (a
+    # stable sort of small unsigned ints is a radix sort)
+    n_cells = len(sur["coeffs"])
+    idx = np.nonzero(inside)[0]
+    key = cell[idx].astype(np.min_scalar_type(n_cells))
+    idx = idx[np.argsort(key, kind="stable")]
+    counts = np.bincount(key, minlength=n_cells)
+    starts = np.cumsum(counts) - counts
+    lo, hi = sur["cell_lo"][cell[idx]], sur["cell_hi"][cell[idx]]
+    t = ((2 * pts[idx] - (lo + hi)) / (hi - lo)).T
+    n = sur["coeffs"].shape[1]
+    ts, te, tx = (_cheb_basis(t[d], n, last=False) for d in range(3))
+
+    cols = list(cols)
+    values = np.empty((len(cols), len(idx)))
+    for c in np.nonzero(counts)[0]:
+        start, count = starts[c], counts[c]
+        rows, mat = _cell_matrix(sur["coeffs"][c][..., cols])
+        ns = mat.shape[1] // len(cols)
+        # blocks small enough for the (ecc, x) basis products to stay in cache
+        for i in range(start, start + count, EVAL_BLOCK):
+            j = min(i + EVAL_BLOCK, start + count)
+            values[:, i:j] = _contract(rows, mat, ts[:ns, i:j], te[:, i:j], tx[:, i:j])
+    out = full((len(cols), len(s)), nan)
+    out[:, idx] = values
+    return tuple(v.reshape(shape) for v in out)
+
+
+def eval_surrogate(sur, slr, ecc, x):
+    """
+    Mino frequencies and constants from a surrogate. Orbits outside the
+    domain give nan.
+
+    Parameters:
+        sur (dict): output of build_surrogate or load_surrogate
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        ups_r (array): radial Mino frequency
+        ups_theta (array): polar Mino frequency
+        ups_phi (array): azimuthal Mino frequency
+        gamma (array): time Mino frequency
+        En (array): energy
+        Lz (array): angular momentum
+        Q (array): Carter constant
+    """
+    return _eval_surrogate(sur, slr, ecc, x, range(len(SURROGATE_QUANTITIES)))
+
+
+def eval_surrogate_boyer(sur, slr, ecc, x):
+    """
+    Boyer-Lindquist frequencies from a surrogate. Being ratios of Mino
+    frequencies, their relative error is about that of the ups and gamma
+    values involved, which exceeds tol where those are small compared with
+    their largest values on the domain.
+
+    Parameters:
+        sur (dict): output of build_surrogate or load_surrogate
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        omega_r (array): radial boyer lindquist frequency
+        omega_theta (array): theta boyer lindquist frequency
+        omega_phi (array): phi boyer lindquist frequency
+    """
+    return boyer_freqs_batch(*_eval_surrogate(sur, slr, ecc, x, range(4)))
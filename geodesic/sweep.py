@@ -0,0 +1,583 @@
+import traceback
+from os import cpu_count
+from functools import partial
+from multiprocessing import Pool
+from multiprocessing.pool import ThreadPool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from numpy import asarray, broadcast_arrays, full, nan
+
+try:
+    from geodesic.orbit_cache import orbit_state
+    from geodesic.backend import calc_orbit, calc_orbit_coords
+    from geodesic.precision import get_precision, set_precision, precision
+    from geodesic.coordinates.coords_gen import calc_gen_coords_mino
+    from geodesic.geodesic import (
+        calc_consts,
+        calc_radial_roots,
+        calc_polar_roots,
+        calc_mino_freqs,
+        calc_boyer_freqs,
+        coordinates,
+        mino_coords,
+    )
+except:
+    from .orbit_cache import orbit_state
+    from .backend import calc_orbit, calc_orbit_coords
+    from .precision import get_precision, set_precision, precision
+    from .coordinates.coords_gen import calc_gen_coords_mino
+    from .geodesic import (
+        calc_consts,
+        calc_radial_roots,
+        calc_polar_roots,
+        calc_mino_freqs,
+        calc_boyer_freqs,
+        coordinates,
+        mino_coords,
+    )
+
+# ------------------------------------------------------------------------------
+#  Parameter sweeps of the scalar routines over a process pool
+#
+#  Points are grouped by orbit class (the branch calc_constants and
+#  mino_freqs take), and each class is cut into chunks of about equal
+#  estimated cost, so a chunk never mixes cheap and expensive orbits. Chunks
+#  are handed out most expensive first and the results are put back in input
+#  order.
+#
+#  A chunk that raises (or calls exit(), as calc_constants does for slr < 6
+#  at aa = 0) is rerun point by point; points that fail give nan and an entry
+#  in the error list instead of ending the sweep.
+#
+#  Results are written by the workers straight into a shared memory array
+#  allocated by the parent (SharedArray); a task carries only its indices
+#  and orbit parameters, and a worker returns only its errors, so nothing
+#  of size proportional to the output is pickled.
+#
+#  trajectory() splits the Mino times of one orbit instead: every sample
+#  depends only on its own time and the orbit state, which each worker
+#  receives once, through the pool initializer. Each range is evaluated
+#  as one array by the float64 kernels of backend.py, or sample by sample
+#  with the mpmath calc_gen_coords_mino on request.
+#
+#  Workers compute at the mpmath working precision of the calling thread
+#  (geodesic.precision).
+# ------------------------------------------------------------------------------
+
+# name: (function, output names, takes a time argument)
+SWEEP_OUTPUTS = {
+    "constants": (calc_consts, ("En", "Lz", "Q"), False),
+    "radial_roots": (calc_radial_roots, ("r1", "r2", "r3", "r4"), False),
+    "polar_roots": (calc_polar_roots, ("zp", "zm"), False),
+    "mino_freqs": (
+        calc_mino_freqs,
+        ("ups_r", "ups_theta", "ups_phi", "gamma"),
+        False,
+    ),
+    "boyer_freqs": (calc_boyer_freqs, ("omega_r", "omega_theta", "omega_phi"), False),
+    "coordinates": (coordinates, ("t", "r", "theta", "phi"), True),
+    "mino_coords": (mino_coords, ("t", "r", "theta", "phi"), True),
+}
+
+# relative cost of calc_mino_freqs by orbit class
+ORBIT_CLASS_COST = {
+    "sc": 8.0,
+    "polar": 1.0,
+    "equatorial": 8.0,
+    "spherical": 3.0,
+    "generic": 12.0,
+}
+ORBIT_CLASSES = tuple(ORBIT_CLASS_COST)
+CHUNKS_PER_PROCESS = 4  # chunks per worker, to even out the load
+
+
+def orbit_class(aa, slr, ecc, x):
+    """
+    Orbit class of each point, in the order of the branches of
+    calc_constants.
+
+    Parameters:
+        aa (array): spin parameter
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Returns:
+        cls (array): index into ORBIT_CLASSES
+    """
+    aa, slr, ecc, x = broadcast_arrays(*(asarray(v) for v in (aa, slr, ecc, x)))
+    return np.select(
+        [aa == 0, x == 0, x * x == 1, ecc == 0],
+        [0, 1, 2, 3],
+        default=4,
+    )
+
+
+def _chunks(cls, n_chunks):
+    """
+    Index arrays of chunks of one class each, of about equal total cost.
+    """
+    cost = np.array([ORBIT_CLASS_COST[c] for c in ORBIT_CLASSES])[cls]
+    target = max(cost.sum() / n_chunks, cost.max())
+    chunks = []
+    for c in range(len(ORBIT_CLASSES)):
+        idx = np.nonzero(cls == c)[0]
+        if len(idx) == 0:
+            continue
+        size = max(1, int(target // ORBIT_CLASS_COST[ORBIT_CLASSES[c]]))
+        chunks.extend(
+            (ORBIT_CLASS_COST[ORBIT_CLASSES[c]] * len(part), part)
+            for part in np.array_split(idx, -(-len(idx) // size))
+        )
+    # most expensive first, so the last chunks to finish are short
+    chunks.sort(key=lambda chunk: -chunk[0])
+    return [part for __, part in chunks]
+
+
+def _point(outputs, args):
+    values = []
+    for name in outputs:
+        func, __, timed = SWEEP_OUTPUTS[name]
+        returns = func(*(args if timed else args[1:]))
+        values.extend(float(np.real(v)) for v in returns)
+    return values
+
+
+class SharedArray:
+    """
+    float64 array in shared memory, for the output of sweep and
+    trajectories. Use as a context manager, or call close() when done.
+    close() removes the block at once; views of array taken before it stay
+    valid, and the memory is unmapped when the last of them is collected.
+
+    Parameters:
+        shape (tuple): array shape
+
+    Attributes:
+        array (ndarray): the shared array, filled with nan
+        name (str): shared memory block name
+    """
+
+    def __init__(self, shape):
+        self.shape = tuple(shape)
+        size = int(np.prod(self.shape)) * 8
+        self._shm = SharedMemory(create=True, size=max(size, 1))
+        self.name = self._shm.name
+        # frombuffer holds the buffer export, so the block cannot be unmapped
+        # under a live view (np.ndarray(buffer=...) does not)
+        count = int(np.prod(self.shape))
+        self.array = np.frombuffer(self._shm.buf, np.float64, count).reshape(self.shape)
+        self.array[...] = nan
+        self._unlinked = False
+
+    def close(self):
+        """
+        Remove the shared memory block and release this process's mapping.
+        """
+        self.array = None
+        if not self._unlinked:
+            self._shm.unlink()
+            self._unlinked = True
+        try:
+            self._shm.close()
+        except BufferError:
+            # views of array still export the mapping: leave it to them, it
+            # is unmapped when the last one is collected
+            self._shm._buf = self._shm._mmap = None
+            self._shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _with_target(target, write):
+    """
+    Call write(array) on an ndarray, or on the SharedArray named by a
+    (name, shape) pair.
+    """
+    if isinstance(target, np.ndarray):
+        return write(target)
+    name, shape = target
+    shm = SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        result = write(array)
+        del array
+    finally:
+        shm.close()
+    return result
+
+
+def _format_error(err):
+    return "".join(
+        traceback.format_exception(type(err), err, err.__traceback__, chain=False)
+    )
+
+
+def _run_chunk(task):
+    """
+    Evaluate one chunk into the output rows idx; returns the errors.
+    """
+    outputs, idx, params, target = task
+    n_out = sum(len(SWEEP_OUTPUTS[name][1]) for name in outputs)
+    values = full((len(idx), n_out), nan)
+    errors = []
+    try:
+        for j, args in enumerate(zip(*params)):
+            values[j] = _point(outputs, args)
+    except (Exception, SystemExit):
+        # find the points that fail
+        for j, args in enumerate(zip(*params)):
+            try:
+                values[j] = _point(outputs, args)
+            except (Exception, SystemExit) as err:
+                values[j] = nan
+                errors.append((int(idx[j]), _format_error(err)))
+
+    def write(array):
+        array[idx] = values
+
+    _with_target(target, write)
+    return errors
+
+
+def _run_tasks(func, tasks, processes):
+    errors = []
+    if processes == 1:
+        for task_errors in map(func, tasks):
+            errors.extend(task_errors)
+    else:
+        with Pool(processes, set_precision, (get_precision(),)) as pool:
+            for task_errors in pool.imap_unordered(func, tasks):
+                errors.extend(task_errors)
+    return sorted(errors)
+
+
+def sweep(
+    aa,
+    slr,
+    ecc,
+    x,
+    outputs=("mino_freqs",),
+    t=None,
+    processes=None,
+    chunks_per_process=CHUNKS_PER_PROCESS,
+):
+    """
+    Evaluate scalar routines over arrays of orbits with a process pool.
+
+    Parameters:
+        aa (array): spin parameter
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        outputs (list) [("mino_freqs",)]: keys of SWEEP_OUTPUTS
+        t (array) [None]: psi for "coordinates", Mino time for
+            "mino_coords"; broadcast with the orbit parameters
+        processes (int) [None]: pool size (os.cpu_count() if None); 1 runs
+            in this process
+        chunks_per_process (int) [CHUNKS_PER_PROCESS]: chunks per worker
+
+    Returns:
+        results (dict): {output: tuple of arrays}, the returns of each
+            routine (e.g. ups_r, ups_theta, ups_phi, gamma for
+            "mino_freqs") in input order
+        errors (list): (flat index, traceback) of the points that failed
+    """
+    outputs = tuple(outputs)
+    if any(SWEEP_OUTPUTS[name][2] for name in outputs) and t is None:
+        raise ValueError("coordinates and mino_coords need t")
+    params = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (0 if t is None else t, aa, slr, ecc, x))
+    )
+    shape = params[0].shape
+    params = [v.ravel() for v in params]
+    if processes is None:
+        processes = cpu_count()
+    cls = orbit_class(*params[1:])
+    chunks = _chunks(cls, max(1, processes * chunks_per_process))
+    n_out = sum(len(SWEEP_OUTPUTS[name][1]) for name in outputs)
+    shape_out = (len(params[0]), n_out)
+
+    if processes == 1:
+        values = full(shape_out, nan)
+        tasks = ((outputs, idx, [v[idx] for v in params], values) for idx in chunks)
+        errors = _run_tasks(_run_chunk, tasks, processes)
+    else:
+        with SharedArray(shape_out) as shared:
+            target = (shared.name, shape_out)
+            tasks = (
+                (outputs, idx, [v[idx] for v in params], target) for idx in chunks
+            )
+            errors = _run_tasks(_run_chunk, tasks, processes)
+            values = shared.array.copy()
+    results, k = {}, 0
+    for name in outputs:
+        n = len(SWEEP_OUTPUTS[name][1])
+        results[name] = tuple(values[:, k + i].reshape(shape) for i in range(n))
+        k += n
+    return results, errors
+
+
+def _run_orbits(task):
+    """
+    mino_coords of the orbits start:stop of a trajectories call into the
+    output; returns the errors.
+    """
+    start, stop, mino_t, params, target = task
+    errors = []
+
+    def write(array):
+        for i, (aa, slr, ecc, x, qr0, qz0) in zip(range(start, stop), zip(*params)):
+            try:
+                state = orbit_state(aa, slr, ecc, x, qr0, qz0)
+                array[i] = [
+                    _orbit_coords(lam, state, aa, qr0, qz0) for lam in mino_t
+                ]
+            except (Exception, SystemExit) as err:
+                array[i] = nan
+                errors.append((i, _format_error(err)))
+
+    _with_target(target, write)
+    return errors
+
+
+def _orbit_coords(mino_t, state, aa, qr0, qz0):
+    """
+    t, r, theta, phi at one Mino time from a per-orbit state.
+    """
+    t, r, theta, phi = calc_gen_coords_mino(
+        mino_t,
+        state["ups_r"],
+        state["ups_theta"],
+        state["ups_phi"],
+        state["gamma"],
+        state["r1"],
+        state["r2"],
+        state["r3"],
+        state["r4"],
+        state["zp"],
+        state["zm"],
+        state["En"],
+        state["Lz"],
+        aa,
+        qr0=qr0,
+        qz0=qz0,
+        Ct=state["Ct"],
+        Cz=state["Cz"],
+    )
+    return [float(np.real(v)) for v in (t, r, theta, phi)]
+
+
+def trajectories(
+    mino_t,
+    aa,
+    slr,
+    ecc,
+    x,
+    qr0=0,
+    qz0=0,
+    processes=None,
+    chunks_per_process=CHUNKS_PER_PROCESS,
+    out=None,
+):
+    """
+    mino_coords of many orbits at the same Mino times, over a process pool.
+
+    Workers write into one shared (N, T, 4) array; each task is a range of
+    orbits. Orbits that fail are nan and listed in the errors.
+
+    Parameters:
+        mino_t (array): Mino times, shape (T,)
+        aa (array): spin parameter
+        slr (array): semi-latus rectum
+        ecc (array): eccentricity
+        x (array): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (array) [0]: initial radial phase
+        qz0 (array) [0]: initial polar phase
+        processes (int) [None]: pool size (os.cpu_count() if None); 1 runs
+            in this process
+        chunks_per_process (int) [CHUNKS_PER_PROCESS]: tasks per worker
+        out (SharedArray) [None]: output of shape (N, T, 4), filled in
+            place; if None the result is copied out of a temporary one
+
+    Returns:
+        coords (ndarray): t, r, theta, phi along the last axis, shape
+            (N, T, 4) with N the size of the broadcast orbit parameters
+        errors (list): (orbit index, traceback) of the orbits that failed
+    """
+    mino_t = np.atleast_1d(asarray(mino_t, dtype=float))
+    params = broadcast_arrays(
+        *(asarray(v, dtype=float) for v in (aa, slr, ecc, x, qr0, qz0))
+    )
+    params = [v.ravel() for v in params]
+    n = len(params[0])
+    shape_out = (n, len(mino_t), 4)
+    if processes is None:
+        processes = cpu_count()
+    bounds = np.linspace(0, n, min(n, processes * chunks_per_process) + 1)
+    bounds = np.unique(bounds.astype(int))
+
+    def tasks(target):
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            yield start, stop, mino_t, [v[start:stop] for v in params], target
+
+    if out is not None:
+        if out.shape != shape_out:
+            raise ValueError("out must have shape %s" % (shape_out,))
+        target = out.array if processes == 1 else (out.name, shape_out)
+        return out.array, _run_tasks(_run_orbits, tasks(target), processes)
+    if processes == 1:
+        coords = full(shape_out, nan)
+        return coords, _run_tasks(_run_orbits, tasks(coords), processes)
+    with SharedArray(shape_out) as shared:
+        errors = _run_tasks(_run_orbits, tasks((shared.name, shape_out)), processes)
+        coords = shared.array.copy()
+    return coords, errors
+
+
+_context = None  # backend, orbit, qr0, qz0 (and aa, prec) of a trajectory worker
+
+
+def _set_context(context):
+    global _context
+    _context = context
+
+
+def _run_samples(task, context=None):
+    """
+    mino_coords of the samples start:stop of a trajectory call into the
+    output; context defaults to the one set by the pool initializer.
+    """
+    start, stop, times, target = task
+    context = _context if context is None else context
+    lam = _with_target(times, lambda array: np.array(array[start:stop]))
+    if context[0] == "float64":
+        __, orbit, qr0, qz0 = context
+        values = calc_orbit_coords(orbit, lam, qr0, qz0)
+    else:
+        __, state, aa, qr0, qz0, prec = context
+        with precision(prec=prec):
+            values = np.array([_orbit_coords(m, state, aa, qr0, qz0) for m in lam])
+        values = values.reshape(len(lam), 4).T
+
+    def write(array):
+        for i, v in enumerate(values):
+            array[start:stop, i] = v
+
+    _with_target(target, write)
+
+
+def trajectory(
+    mino_t,
+    aa,
+    slr,
+    ecc,
+    x,
+    qr0=0,
+    qz0=0,
+    processes=None,
+    chunks_per_process=CHUNKS_PER_PROCESS,
+    threads=False,
+    out=None,
+    backend="float64",
+):
+    """
+    mino_coords of one generic orbit at many Mino times, with the times
+    split into contiguous ranges over a pool.
+
+    The orbit state is computed once and sent to each worker once; the
+    times and the output are shared memory arrays, so tasks carry only
+    their ranges. The float64 backend evaluates a whole range at once with
+    calc_orbit_coords and agrees with mino_coords to about 1e-13; the
+    mpmath backend calls calc_gen_coords_mino per sample at the working
+    precision and is several orders of magnitude slower. A thread pool
+    shares the state and the arrays without copies, but the mpmath
+    integrals hold the GIL, so with that backend threads only pay off on a
+    free-threaded build of python.
+
+    Parameters:
+        mino_t (array): Mino times, shape (T,)
+        aa (float): spin parameter
+        slr (float): semi-latus rectum
+        ecc (float): eccentricity
+        x (float): inclination value given by cos(theta_inc)
+
+    Keyword Args:
+        qr0 (float) [0]: initial radial phase
+        qz0 (float) [0]: initial polar phase
+        processes (int) [None]: pool size (os.cpu_count() if None); 1 runs
+            in this process
+        chunks_per_process (int) [CHUNKS_PER_PROCESS]: tasks per worker
+        threads (bool) [False]: use a pool of threads instead of processes
+        out (SharedArray) [None]: output of shape (T, 4), filled in place;
+            if None the result is copied out of a temporary one
+        backend (str) ["float64"]: "float64" for the array kernels of
+            backend.py, "mpmath" for calc_gen_coords_mino per sample
+
+    Returns:
+        coords (ndarray): t, r, theta, phi along the last axis, shape (T, 4)
+    """
+    if backend not in ("float64", "mpmath"):
+        raise ValueError("backend must be 'float64' or 'mpmath'")
+    mino_t = np.atleast_1d(asarray(mino_t, dtype=float)).ravel()
+    n = len(mino_t)
+    shape_out = (n, 4)
+    if out is not None and out.shape != shape_out:
+        raise ValueError("out must have shape %s" % (shape_out,))
+    if backend == "float64":
+        orbit = calc_orbit(aa, slr, ecc, x)
+        if not orbit["generic"]:
+            raise ValueError(
+                "trajectory takes generic orbits only (aa != 0, 0 < x^2 < 1, "
+                "ecc > 0)"
+            )
+        context = (backend, orbit, float(qr0), float(qz0))
+    else:
+        state = dict(orbit_state(aa, slr, ecc, x, qr0, qz0))
+        context = (backend, state, float(aa), float(qr0), float(qz0), get_precision())
+    if processes is None:
+        processes = cpu_count()
+    bounds = np.linspace(0, n, min(n, processes * chunks_per_process) + 1)
+    bounds = np.unique(bounds.astype(int))
+
+    def run(times, target):
+        tasks = (
+            (start, stop, times, target)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+        )
+        if processes == 1:
+            for task in tasks:
+                _run_samples(task, context)
+            return
+        if threads:
+            func = partial(_run_samples, context=context)
+            with ThreadPool(processes) as pool:
+                for __ in pool.imap_unordered(func, tasks):
+                    pass
+            return
+        with Pool(processes, _set_context, (context,)) as pool:
+            for __ in pool.imap_unordered(_run_samples, tasks):
+                pass
+
+    if processes == 1 or threads:
+        coords = full(shape_out, nan) if out is None else out.array
+        run(mino_t, coords)
+        return coords
+    with SharedArray((n,)) as times:
+        times.array[:] = mino_t
+        if out is not None:
+            run((times.name, (n,)), (out.name, shape_out))
+            return out.array
+        with SharedArray(shape_out) as shared:
+            run((times.name, (n,)), (shared.name, shape_out))
+            coords = shared.array.copy()
+    return coords
@@ -0,0 +1,159 @@
+"""
+Generate geodesic/constants/constants_fused.py.
+
+The hand-written constant functions in geodesic/constants are evaluated on
+sympy symbols (their module-level sqrt is swapped for sympy.sqrt), so the
+generated kernels are exactly the expressions in those files. For each orbit
+class the expressions for En, Lz and Q are passed through common subexpression
+elimination together and printed as one numpy function that returns all three
+constants.
+
+Requires sympy (only for code generation, not at run time). Run from the
+repository root:
+
+    python scripts/generate_constants.py
+"""
+import os
+import sys
+
+import sympy
+from sympy import symbols, cse, numbered_symbols, count_ops
+from sympy.core.parameters import global_parameters
+from sympy.printing.numpy import NumPyPrinter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from geodesic.constants import (  # noqa: E402
+    constants_eq,
+    constants_gen,
+    constants_pol,
+    constants_sc,
+    constants_sph,
+)
+
+OUTPUT = os.path.join(ROOT, "geodesic", "constants", "constants_fused.py")
+
+HEADER = '''\
+# ------------------------------------------------------------------------------
+#  Fused, CSE-optimized constant kernels
+#
+#  GENERATED by scripts/generate_constants.py from the expressions in
+#  constants_sc.py, constants_pol.py, constants_eq.py, constants_sph.py and
+#  constants_gen.py. Do not edit by hand; edit those files and rerun the script.
+# ------------------------------------------------------------------------------
+from numpy import sqrt, abs
+'''
+
+PARAMS = {
+    "aa": "aa (array): spin parameter (0, 1)",
+    "slr": "slr (array): semi-latus rectum",
+    "ecc": "ecc (array): eccentricity [0, 1)",
+    "x": "x (array): inclination value given by cos(theta_inc)",
+}
+
+
+class _Printer(NumPyPrinter):
+    """
+    numpy printer that uses the names imported in HEADER.
+    """
+
+    def _print_Pow(self, expr, rational=False):
+        if expr.exp == sympy.S.Half:
+            return "sqrt(%s)" % self._print(expr.base)
+        if expr.exp == -sympy.S.Half:
+            return "1 / sqrt(%s)" % self._print(expr.base)
+        if expr.exp == -1:
+            return "1 / (%s)" % self._print(expr.base)
+        if expr.exp.is_Integer and expr.exp < 0:
+            return "1 / (%s)" % self._print(sympy.Pow(expr.base, -expr.exp, evaluate=False))
+        if expr.exp.is_Integer and 1 < expr.exp <= 6:
+            # numpy evaluates small integer powers faster as products
+            base = self.parenthesize(expr.base, sympy.printing.precedence.PRECEDENCE["Mul"])
+            return "(%s)" % "*".join([base] * int(expr.exp))
+        return super()._print_Pow(expr, rational=rational)
+
+    def _print_Abs(self, expr):
+        return "abs(%s)" % self._print(expr.args[0])
+
+
+def _use_sympy():
+    for module in (constants_eq, constants_gen, constants_pol, constants_sc, constants_sph):
+        module.sqrt = sympy.sqrt
+
+
+def _expressions():
+    aa, slr, ecc, x = symbols("aa slr ecc x", real=True)
+
+    En, Lz, Q = constants_sc.calc_sc_constants(slr, ecc, x)
+    yield "sc_constants", "SC orbits (aa = 0)", (slr, ecc, x), (En, Lz, Q)
+
+    En, Lz, Q = constants_pol.calc_pol_constants(aa, slr, ecc)
+    yield "pol_constants", "Kerr polar orbits (x = 0)", (aa, slr, ecc), (En, Lz, Q)
+
+    En, Lz, Q = constants_eq.calc_eq_constants(aa, slr, ecc, x)
+    yield "eq_constants", "Kerr equatorial orbits (x = +/- 1)", (aa, slr, ecc, x), (
+        En,
+        Lz,
+        Q,
+    )
+
+    En, Lz, Q = constants_sph.calc_sph_constants(aa, slr, x)
+    yield "sph_constants", "Kerr spherical orbits (ecc = 0)", (aa, slr, x), (En, Lz, Q)
+
+    En, Lz, Q = constants_gen.calc_gen_constants(aa, slr, ecc, x)
+    yield "gen_constants", "generic Kerr orbits", (aa, slr, ecc, x), (En, Lz, Q)
+
+
+def _kernel(name, label, args, exprs, printer):
+    exprs = [sympy.sympify(e) for e in exprs]
+    replacements, reduced = cse(exprs, symbols=numbered_symbols("x_"), optimizations="basic")
+    ops_before = sum(count_ops(e) for e in exprs)
+    ops_after = sum(count_ops(e) for __, e in replacements) + sum(
+        count_ops(e) for e in reduced
+    )
+
+    arg_names = [str(a) for a in args]
+    lines = ["", "", "def %s(%s):" % (name, ", ".join(arg_names))]
+    lines.append('    """')
+    lines.append("    En, Lz and Q for %s." % label)
+    lines.append("")
+    lines.append("    Parameters:")
+    lines.extend("        " + PARAMS[a] for a in arg_names)
+    lines.append("")
+    lines.append("    Returns:")
+    lines.append("        En (array): energy")
+    lines.append("        Lz (array): angular momentum")
+    lines.append("        Q (array): Carter constant")
+    lines.append('    """')
+    for sym, e in replacements:
+        lines.append("    %s = %s" % (sym, printer.doprint(e)))
+    out = []
+    for e in reduced:
+        code = printer.doprint(e)
+        if e.is_number:
+            # keep the shape of the inputs
+            code = "%s + 0 * %s" % (code, arg_names[-1])
+        out.append(code)
+    lines.append("    return (")
+    lines.extend("        %s," % c for c in out)
+    lines.append("    )")
+    return "\n".join(lines) + "\n", ops_before, ops_after
+
+
+def main():
+    _use_sympy()
+    # keep 2 * (a + b) as written, so that CSE sees the original factorization
+    global_parameters.distribute = False
+    printer = _Printer({"fully_qualified_modules": False, "inline": True})
+    source = [HEADER]
+    for name, label, args, exprs in _expressions():
+        code, ops_before, ops_after = _kernel(name, label, args, exprs, printer)
+        source.append(code)
+        print("%-14s %6d ops -> %6d ops" % (name, ops_before, ops_after))
+    with open(OUTPUT, "w") as fh:
+        fh.write("".join(source))
+
+
+if __name__ == "__main__":
+    main()
@@ -15,7 +15,7 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     install_requires=[
         'numpy>=1.19.0',
-        'scipy>=1.6.0',
+        'scipy>=1.8.0',
         'mpmath>=1.1.0',
     ],
     classifiers=[
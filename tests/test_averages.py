@@ -0,0 +1,52 @@
+"""
+Test the Mino time averages against quadrature and circular orbits.
+"""
+import pytest
+import numpy as np
+from geodesic.averages import (
+    orbit_averages_batch,
+    r_moments_batch,
+    radial_average_batch,
+    polar_average_batch,
+)
+from geodesic.constants.constants_gen import calc_h
+
+# generic, SC, spherical, equatorial, retrograde, polar
+aa = np.array([0.9, 0.0, 0.5, 0.7, 0.3, 0.9])
+slr = np.array([8.0, 10.0, 12.0, 9.0, 12.0, 10.0])
+ecc = np.array([0.5, 0.3, 0.0, 0.2, 0.6, 0.4])
+x = np.array([0.7, 0.5, 0.4, 1.0, -0.6, 0.0])
+
+
+def test_closed_forms_match_quadrature():
+    r_avg, r2_avg, z2_avg, delta_avg, sigma_avg, f_avg, h_avg, d_avg = (
+        orbit_averages_batch(aa, slr, ecc, x)
+    )
+    n = 256
+    assert np.allclose(
+        radial_average_batch(lambda r: r, aa, slr, ecc, x, n), r_avg, rtol=1e-13
+    )
+    assert np.allclose(
+        radial_average_batch(lambda r: r * r, aa, slr, ecc, x, n), r2_avg, rtol=1e-13
+    )
+    assert np.allclose(
+        polar_average_batch(lambda z: z * z, aa, slr, ecc, x, n), z2_avg, rtol=1e-13
+    )
+    assert np.allclose(sigma_avg - delta_avg, 2 * r_avg + aa * aa * (z2_avg - 1))
+    zm = np.sqrt(1 - x * x)[:-1, None]
+    h_quad = radial_average_batch(
+        lambda r: calc_h(r, zm, aa[:-1, None]), aa[:-1], slr[:-1], ecc[:-1], x[:-1], n
+    )
+    assert np.allclose(h_quad, h_avg[:-1], rtol=1e-13)
+    assert np.isinf(h_avg[-1])
+
+
+def test_schwarzschild_z2():
+    z2_avg = orbit_averages_batch(0.0, 10.0, 0.3, x)[2]
+    assert np.allclose(z2_avg, (1 - x * x) / 2, rtol=1e-14)
+
+
+def test_circular_moments():
+    powers = [-3, -2, -1, 1, 2]
+    moments = r_moments_batch(aa, 10.0, 0.0, x, powers, n=8)
+    assert np.allclose(moments, 10.0 ** np.array(powers), rtol=1e-14)
@@ -0,0 +1,79 @@
+"""
+Test the float64 and mpmath backends of the generic orbit pipeline.
+"""
+import pytest
+import numpy as np
+from geodesic.geodesic import calc_consts, calc_mino_freqs, mino_coords
+from geodesic.backend import calc_orbit, calc_orbit_coords, ORBIT_KEYS
+
+# generic prograde and retrograde, then two plunging orbits, which are nan
+aa = np.array([0.9, 0.5, 0.9, 0.5])
+slr = np.array([10.0, 12.0, 3.0, 3.0])
+ecc = np.array([0.3, 0.2, 0.3, 0.3])
+x = np.array([0.5, -0.7, 0.5, -0.5])
+freqs = ("ups_r", "ups_theta", "ups_phi", "gamma")
+GENERIC = (0.9, 10.0, 0.3, 0.5)
+
+
+def test_float64():
+    orbit = calc_orbit(aa, slr, ecc, x)
+    assert list(orbit["valid"]) == [True, True, False, False]
+    for i in (0, 1):
+        args = aa[i], slr[i], ecc[i], x[i]
+        ref = [float(v) for v in calc_consts(*args) + calc_mino_freqs(*args)]
+        values = [orbit[k][i] for k in ("En", "Lz", "Q") + freqs]
+        assert np.allclose(values, ref, rtol=1e-13)
+    assert np.isnan(orbit["gamma"][2:]).all()
+
+
+def test_mpmath():
+    f64 = calc_orbit(aa, slr, ecc, x)
+    low = calc_orbit(aa, slr, ecc, x, backend="mpmath", dps=30)
+    high = calc_orbit(aa, slr, ecc, x, backend="mpmath", dps=50)
+    assert low["prec"] == 103
+    for k in freqs:
+        assert np.allclose(low[k][:2].astype(float), f64[k][:2], rtol=1e-13)
+        assert all(abs(a - b) < 1e-26 * abs(b) for a, b in zip(low[k][:2], high[k][:2]))
+    assert np.isnan(low["gamma"][2:].astype(float)).all()
+
+
+@pytest.mark.parametrize("backend", ["float64", "mpmath"])
+def test_coords(backend):
+    lam = np.linspace(0, 20, 4)
+    orbit = calc_orbit(aa[:2], slr[:2], ecc[:2], x[:2], backend=backend, dps=20)
+    coords = calc_orbit_coords(orbit, lam[:, None], qr0=0.4, qz0=0.2)
+    coords = np.stack(coords, -1).astype(float)
+    for i in (0, 1):
+        args = aa[i], slr[i], ecc[i], x[i]
+        ref = [mino_coords(m, *args, qr0=0.4, qz0=0.2) for m in lam]
+        assert np.allclose(coords[:, i], ref, rtol=1e-12, atol=1e-12)
+
+
+def test_backend_name():
+    with pytest.raises(ValueError):
+        calc_orbit(0.9, 10.0, 0.3, 0.5, backend="float128")
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        (0.0, 10.0, 0.3, 0.5),  # SC
+        (0.9, 10.0, 0.3, -1.0),  # equatorial
+        (0.9, 10.0, 0.0, 0.5),  # spherical
+        (0.9, 10.0, 0.3, 0.0),  # polar
+    ],
+)
+@pytest.mark.parametrize("backend", ["float64", "mpmath"])
+def test_not_generic(args, backend):
+    # masked per entry: the generic orbit of a mixed batch is unaffected
+    params = (np.array([v_gen, v]) for v_gen, v in zip(GENERIC, args))
+    orbit = calc_orbit(*params, backend=backend)
+    assert list(orbit["generic"]) == [True, False]
+    assert list(orbit["valid"]) == [True, False]
+    single = calc_orbit(*GENERIC, backend=backend)
+    for k in ORBIT_KEYS:
+        assert orbit[k][0] == single[k]
+        assert np.isnan(float(orbit[k][1]))
+    coords = calc_orbit_coords(orbit, 1.0)
+    assert np.isfinite([float(c[0]) for c in coords]).all()
+    assert np.isnan([float(c[1]) for c in coords]).all()
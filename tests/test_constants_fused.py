@@ -0,0 +1,41 @@
+"""
+Test the generated constant kernels against the hand-written ones.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants_eq import calc_eq_constants
+from geodesic.constants.constants_gen import calc_gen_constants
+from geodesic.constants.constants_pol import calc_pol_constants
+from geodesic.constants.constants_sc import calc_sc_constants
+from geodesic.constants.constants_sph import calc_sph_constants
+from geodesic.constants.constants_fused import (
+    eq_constants,
+    gen_constants,
+    pol_constants,
+    sc_constants,
+    sph_constants,
+)
+
+rng = np.random.default_rng(3)
+B = 200
+aa = rng.uniform(0.05, 0.95, B)
+slr = rng.uniform(9.0, 20.0, B)
+ecc = rng.uniform(0.05, 0.6, B)
+x = rng.uniform(0.1, 0.9, B) * rng.choice([-1, 1], B)
+sgn = rng.choice([-1.0, 1.0], B)
+
+
+@pytest.mark.parametrize(
+    "fused, hand, args",
+    [
+        (sc_constants, calc_sc_constants, (slr, ecc, x)),
+        (pol_constants, calc_pol_constants, (aa, slr, ecc)),
+        (eq_constants, calc_eq_constants, (aa, slr, ecc, sgn)),
+        (sph_constants, calc_sph_constants, (aa, slr, x)),
+        (gen_constants, calc_gen_constants, (aa, slr, ecc, x)),
+    ],
+)
+def test_fused_matches_hand(fused, hand, args):
+    for c, c_hand in zip(fused(*args), hand(*args)):
+        assert np.allclose(c, c_hand, rtol=1e-11, atol=1e-12)
+        assert np.shape(c) == (B,)
@@ -0,0 +1,240 @@
+"""
+Test the array (batch) coordinate engines.
+
+Closed-form coordinates are compared with the Mino frequencies of the
+general array routines.
+"""
+import pytest
+import numpy as np
+from scipy.integrate import cumulative_trapezoid
+from geodesic.geodesic import calc_consts, calc_mino_freqs, coordinates
+from geodesic.geo_roots import radial_roots, polar_roots
+from geodesic.frequencies_batch import mino_freqs_batch
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.coordinates.coords_circ_eq import (
+    circ_eq_constants,
+    calc_circular_eq_coords,
+    calc_circular_eq_coords_batch,
+)
+from geodesic.coordinates.coords_sph import calc_sph_coords, calc_sph_coords_mino
+from geodesic.coordinates.coords_pol import (
+    calc_radial_batch,
+    calc_pol_coords,
+    calc_pol_coords_mino,
+    calc_lambda_psi_batch,
+)
+from geodesic.coordinates.coords_gen import (
+    calc_gen_coords_mino,
+    calc_rq,
+    calc_t_r,
+    calc_phi_r,
+)
+from geodesic.coordinates.coords_sc import (
+    calc_sc_coords,
+    calc_sc_coords_mino,
+    calc_plane_angle,
+)
+from geodesic.constants.constants_pol import calc_pol_constants
+from geodesic.constants.constants_sc import calc_sc_constants
+from geodesic.coordinates.coords import calc_coords
+from geodesic.precision import precision
+
+
+def test_circ_eq_constants():
+    aa = np.array([0.9, 0.9, 0.0, 0.5, 0.99])
+    slr = np.array([8.0, 10.0, 10.0, 12.0, 3.0])
+    x = np.array([1.0, -1.0, 1.0, -1.0, 1.0])
+    En, Lz = circ_eq_constants(aa, slr, x)
+    En_ch, Lz_ch, __ = calc_constants_batch(aa, slr, 0, x)
+    assert np.allclose(En, En_ch, rtol=1e-14, atol=0)
+    assert np.allclose(Lz, Lz_ch, rtol=1e-14, atol=0)
+
+
+def test_circ_eq_coords_batch():
+    aa = np.array([0.9, 0.5, 0.0])
+    slr = np.array([10.0, 12.0, 7.0])
+    x = np.array([-1.0, 1.0, 1.0])
+    lam = np.linspace(0, 10, 7)
+    t, r, theta, phi = calc_circular_eq_coords_batch(lam, aa, slr, x, mino=True)
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_batch(aa, slr, 0, x)
+    assert t.shape == (3, 7)
+    assert np.allclose(t, gamma[:, None] * lam, rtol=1e-13, atol=0)
+    assert np.allclose(phi, ups_phi[:, None] * lam, rtol=1e-13, atol=0)
+    assert np.all(r == slr[:, None])
+    assert np.all(theta == np.pi / 2)
+
+    # psi = ups_r * lambda
+    for i in range(3):
+        t_psi, __, __, phi_psi = calc_circular_eq_coords_batch(
+            ups_r[i] * lam, aa[i], slr[i], x[i]
+        )
+        assert np.allclose(t_psi, t[i], rtol=1e-13, atol=0)
+        assert np.allclose(phi_psi, phi[i], rtol=1e-13, atol=0)
+
+
+def test_circ_eq_coords_scalar():
+    En, Lz = circ_eq_constants(0.9, 10.0, 1.0)
+    t, r, theta, phi = calc_circular_eq_coords(1.3, En, Lz, 0.9, 10.0)
+    assert np.ndim(t) == 0
+    assert r == 10.0
+    assert theta == np.pi / 2
+
+
+def test_sph_coords_matches_general():
+    aa, slr, x = 0.9, 8.0, 0.5
+    lam = np.linspace(0, 3, 5)
+    En, Lz, Q = calc_consts(aa, slr, 0, x)
+    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, 0)
+    zp, zm = polar_roots(En, Lz, aa, slr, x)
+    freqs = calc_mino_freqs(aa, slr, 0, x)
+    coords = calc_sph_coords_mino(lam, aa, slr, x)
+    for i, l in enumerate(lam):
+        coords_ch = calc_gen_coords_mino(l, *freqs, r1, r2, r3, r4, zp, zm, En, Lz, aa)
+        for c, c_ch in zip(coords, coords_ch):
+            assert np.isclose(c[i], float(c_ch), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("aa, x", [(0.9, -0.5), (0.9, 0.0), (0.0, 0.5)])
+def test_sph_coords_geodesic_eqs(aa, x):
+    slr = 10.0
+    En, Lz, Q = calc_constants_batch(aa, slr, 0, x)
+    lam = np.linspace(0, 1.5, 3001)
+    t, r, theta, phi = calc_sph_coords_mino(lam, aa, slr, x)
+    z2 = np.cos(theta) ** 2
+    delta = slr * slr - 2 * slr + aa * aa
+    P = En * (slr * slr + aa * aa) - aa * Lz
+    dt = (slr * slr + aa * aa) * P / delta - aa * aa * En * (1 - z2) + aa * Lz
+    dphi = aa * P / delta - aa * En + 0 * z2
+    if Lz != 0:
+        dphi = dphi + Lz / (1 - z2)
+    assert np.allclose(t, cumulative_trapezoid(dt, lam, initial=0), rtol=1e-6, atol=1e-6)
+    assert np.allclose(phi, cumulative_trapezoid(dphi, lam, initial=0), rtol=1e-6, atol=1e-6)
+
+
+def test_sph_coords_selected():
+    psi = 1.0
+    coords = coordinates(psi, 0.9, 8.0, 1e-12, 0.5)
+    coords_sph = calc_sph_coords(psi, 0.9, 8.0, 0.5)
+    for c, c_sph in zip(coords, coords_sph):
+        assert c == c_sph
+
+
+def test_radial_batch_matches_scalar():
+    aa, slr, ecc, x = 0.9, 8.0, 0.4, 0.6
+    En, Lz, Q = calc_consts(aa, slr, ecc, x)
+    roots = radial_roots(En, Q, aa, slr, ecc)
+    qr = np.array([0.3, 2.5, 7.0, -1.2])
+    r, t_r, phi_r = calc_radial_batch(qr, *roots, En, Lz, aa)
+    for i, q in enumerate(qr):
+        assert np.isclose(r[i], calc_rq(q, *roots), rtol=1e-13)
+        assert np.isclose(t_r[i], calc_t_r(q, *roots, En, Lz, aa), rtol=1e-11)
+        assert np.isclose(phi_r[i], calc_phi_r(q, *roots, En, Lz, aa), rtol=1e-11)
+
+
+@pytest.mark.parametrize("aa, ecc", [(0.9, 0.4), (0.0, 0.3), (0.5, 0.0)])
+def test_pol_coords_geodesic_eqs(aa, ecc):
+    slr = 9.0
+    En, Lz, Q = calc_pol_constants(aa, slr, ecc)
+    lam = np.linspace(0, 2, 20001)
+    t, r, theta, phi = calc_pol_coords_mino(lam, aa, slr, ecc)
+    z2 = np.cos(theta) ** 2
+    delta = r * r - 2 * r + aa * aa
+    P = En * (r * r + aa * aa)
+    dt = (r * r + aa * aa) * P / delta - aa * aa * En * (1 - z2)
+    dphi = aa * P / delta - aa * En
+    assert np.allclose(t, cumulative_trapezoid(dt, lam, initial=0), rtol=1e-7, atol=1e-6)
+    assert np.allclose(phi, cumulative_trapezoid(dphi, lam, initial=0), atol=1e-8)
+
+    # radial angle parameterization
+    psi = np.array([0, 1.0, 3.0, 4.0, 7.0])
+    t_psi, r_psi, __, __ = calc_pol_coords(psi, aa, slr, ecc)
+    assert np.allclose(r_psi, slr / (1 + ecc * np.cos(psi)), rtol=1e-12)
+    assert np.all(np.diff(t_psi) > 0)
+
+
+def test_pol_freqs_scalar():
+    freqs = calc_mino_freqs(0.9, 8.0, 0.4, 0.0)
+    freqs_batch = mino_freqs_batch(0.9, 8.0, 0.4, 0.0)
+    for f, f_batch in zip(freqs, freqs_batch):
+        assert np.isclose(f, f_batch, rtol=1e-13)
+    with precision(dps=40):
+        freqs_mp = calc_mino_freqs(0.9, 8.0, 0.4, 0.0)
+    # the radial Pi terms follow the working precision
+    assert freqs_mp[3] != freqs[3]
+    assert np.isclose(float(freqs_mp[3]), freqs_batch[3], rtol=1e-13)
+
+
+@pytest.mark.parametrize("qr0, qz0", [(0, 0), (0.4, 1.1)])
+def test_sc_coords_match_kerr_engines(qr0, qz0):
+    lam = np.linspace(0, 3, 7)
+    sc = calc_sc_coords_mino(lam, 10.0, 0.0, 0.5, qz0=qz0)
+    sph = calc_sph_coords_mino(lam, 0.0, 10.0, 0.5, qz0=qz0)
+    for c, c_ch in zip(sc, sph):
+        assert np.allclose(c, c_ch, rtol=1e-13, atol=1e-13)
+    sc = calc_sc_coords_mino(lam, 10.0, 0.3, 0.0, qr0=qr0, qz0=qz0)
+    pol = calc_pol_coords_mino(lam, 0.0, 10.0, 0.3, qr0=qr0, qz0=qz0)
+    for c, c_ch in zip(sc, pol):
+        assert np.allclose(c, c_ch, rtol=1e-13, atol=1e-13)
+
+
+@pytest.mark.parametrize(
+    "slr, ecc, x, qr0, qz0",
+    [(10.0, 0.3, 0.5, 0, 0), (9.0, 0.5, -0.7, 0, 0), (9.0, 0.5, -0.7, 2.0, 0.8)],
+)
+def test_sc_coords_geodesic_eqs(slr, ecc, x, qr0, qz0):
+    En, Lz, Q = calc_sc_constants(slr, ecc, x)
+    lam = np.linspace(0, 2, 20001)
+    t, r, theta, phi = calc_sc_coords_mino(lam, slr, ecc, x, qr0=qr0, qz0=qz0)
+    assert np.isclose(np.cos(theta[0]), np.sqrt(1 - x * x) * np.cos(qz0))
+    z2 = np.cos(theta) ** 2
+    dt = En * r ** 4 / (r * r - 2 * r)
+    dphi = Lz / (1 - z2)
+    assert np.allclose(t, cumulative_trapezoid(dt, lam, initial=0), rtol=1e-7, atol=1e-6)
+    assert np.allclose(phi, cumulative_trapezoid(dphi, lam, initial=0), atol=1e-7)
+
+    psi = np.linspace(0, 8, 9)
+    t_psi, r_psi, __, __ = calc_sc_coords(psi, slr, ecc, x)
+    assert np.allclose(r_psi, slr / (1 + ecc * np.cos(psi)), rtol=1e-13)
+    assert np.all(np.diff(t_psi) > 0)
+
+
+def test_psi_coords_radial_phase():
+    # psi fixes r, and qr0 shifts the Mino time: lambda(psi) - qr0 / ups_r
+    aa, slr, ecc, qr0, qz0 = 0.9, 9.0, 0.4, 0.7, 0.3
+    psi = np.linspace(0, 8, 9)
+    r_psi = slr / (1 + ecc * np.cos(psi))
+
+    pol = calc_pol_coords(psi, aa, slr, ecc, qr0=qr0, qz0=qz0)
+    En, Lz, Q = calc_pol_constants(aa, slr, ecc)
+    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc)
+    ups_r = mino_freqs_batch(aa, slr, ecc, 0.0)[0]
+    __, lam = calc_lambda_psi_batch(psi, ups_r, r1, r2, r3, r4, En, slr, ecc)
+    pol_mino = calc_pol_coords_mino(lam - qr0 / ups_r, aa, slr, ecc, qr0=qr0, qz0=qz0)
+    assert np.allclose(pol[1], r_psi, rtol=1e-12)
+    for c, c_mino in zip(pol, pol_mino):
+        assert np.allclose(c, c_mino, rtol=1e-12, atol=1e-12)
+
+    x = 0.5
+    sc = calc_sc_coords(psi, slr, ecc, x, qr0=qr0, qz0=qz0)
+    ups_r, ups_theta = mino_freqs_batch(0.0, slr, ecc, x)[:2]
+    lam = calc_plane_angle(psi, slr, ecc) / ups_theta
+    sc_mino = calc_sc_coords_mino(lam - qr0 / ups_r, slr, ecc, x, qr0=qr0, qz0=qz0)
+    assert np.allclose(sc[1], r_psi, rtol=1e-12)
+    for c, c_mino in zip(sc, sc_mino):
+        assert np.allclose(c, c_mino, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("ecc", [0.0, 1e-12])
+def test_calc_coords_circ_eq_phases(ecc):
+    # (nearly) circular equatorial orbits keep the initial t and phi phases
+    aa, slr, x = 0.9, 10.0, -1.0
+    En, Lz, Q = calc_consts(aa, slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots(En, Lz, Q, aa, x)
+    freqs = calc_mino_freqs(aa, slr, ecc, x)
+    orbit = (*freqs, r1, r2, r3, r4, zp, zm, En, Lz, Q, aa, slr, ecc, x)
+    psi = np.linspace(0, 3, 4)
+    coords = calc_coords(psi, *orbit, qt0=2.0, qr0=1.0, qphi0=0.5)
+    t, r, theta, phi = calc_circular_eq_coords(psi, En, Lz, aa, slr)
+    for c, c_ch in zip(coords, (t + 2.0, r, theta, phi + 0.5)):
+        assert np.allclose(c, c_ch, rtol=1e-14)
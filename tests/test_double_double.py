@@ -0,0 +1,47 @@
+"""
+Test the double-double arithmetic and its backend.
+"""
+import pytest
+import numpy as np
+import mpmath
+from geodesic.double_double import DD, dd_sqrt, dd_ellipk, dd_ellipe, dd_ellippi
+from geodesic.backend import calc_orbit, calc_orbit_coords
+
+ctx = mpmath.MPContext()
+ctx.dps = 45
+
+
+def rel_err(dd, ref):
+    return max(
+        abs((ctx.mpf(float(h)) + ctx.mpf(float(l)) - r) / r)
+        for h, l, r in zip(dd.hi.ravel(), dd.lo.ravel(), ref)
+    )
+
+
+def test_arithmetic():
+    a = DD(np.array([2.0, 3.0, 0.7]))
+    b = DD(0.1) * a / 3 + 1 - dd_sqrt(a)
+    ref = [ctx.mpf(0.1) * v / 3 + 1 - ctx.sqrt(v) for v in (2, 3, ctx.mpf(0.7))]
+    assert rel_err(b, ref) < 1e-30
+
+
+def test_elliptic():
+    m = np.array([0.0, 0.1, 0.5, 0.9, 0.999999])
+    n = np.array([-2.0, 0.3, 0.9, -0.5, 0.5])
+    m_mp = [ctx.mpf(v) for v in m]
+    assert rel_err(dd_ellipk(DD(m)), [ctx.ellipk(v) for v in m_mp]) < 1e-30
+    assert rel_err(dd_ellipe(DD(m)), [ctx.ellipe(v) for v in m_mp]) < 1e-30
+    ref = [ctx.ellippi(ctx.mpf(a), v) for a, v in zip(n, m_mp)]
+    assert rel_err(dd_ellippi(DD(n), DD(m)), ref) < 1e-30
+
+
+def test_backend():
+    args = ([0.9, 0.5, 0.998, 0.9], [10.0, 12.0, 4.0, 3.0], 0.3, [0.5, 0.7, 0.9, 0.5])
+    dd = calc_orbit(*args, backend="dd")
+    ref = calc_orbit(*args, backend="mpmath", dps=45)
+    assert list(dd["valid"]) == [True, True, True, False]
+    for k in ("En", "Lz", "Q", "ups_r", "ups_theta", "ups_phi", "gamma"):
+        assert rel_err(dd[k][:3], ref[k][:3]) < 1e-28
+    assert np.isnan(dd["gamma"].hi[3])
+    with pytest.raises(ValueError):
+        calc_orbit_coords(dd, 1.0)
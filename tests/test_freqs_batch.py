@@ -0,0 +1,168 @@
+"""
+Test the array (batch) Mino frequency kernels.
+
+The closed-form kernels for spherical, equatorial and polar orbits are
+compared with the general radial and polar sectors.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.geodesic import (
+    calc_consts,
+    calc_mino_freqs,
+    calc_boyer_freqs,
+    find_omega,
+    calc_mode_freqs_batch,
+    mino_coords,
+)
+from geodesic.geo_roots import radial_roots_batch, polar_roots_batch
+from geodesic.frequencies_batch import (
+    mino_freqs_batch,
+    mino_freqs_kerr_batch,
+    boyer_freqs_batch,
+    mode_freqs_batch,
+    select_modes,
+    proper_time_freqs_batch,
+    radial_sector,
+    polar_sector,
+)
+
+
+def kerr_inputs(aa, slr, ecc, x):
+    En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    return r1, r2, r3, r4, zp, zm, En, Lz
+
+
+def test_fast_kernels_match_general():
+    aa = np.array([0.9, 0.5, 0.9, 0.3])
+    slr = np.array([10.0, 8.0, 10.0, 12.0])
+    ecc = np.array([0.0, 0.0, 0.3, 0.0])
+    x = np.array([1.0, -1.0, 1.0, 0.4])
+    r1, r2, r3, r4, zp, zm, En, Lz = kerr_inputs(aa, slr, ecc, x)
+    freqs = mino_freqs_kerr_batch(r1, r2, r3, r4, zp, zm, En, Lz, aa)
+
+    ups_r, phi_r, t_r = radial_sector(r1, r2, r3, r4, En, Lz, aa)
+    ups_theta, phi_z, t_z = polar_sector(zp, zm, En, Lz, aa)
+    for f, f_ch in zip(freqs, (ups_r, ups_theta, phi_r + phi_z, t_r + t_z)):
+        assert np.allclose(f, f_ch, rtol=1e-14, atol=0)
+
+
+def test_polar_orbit_limit():
+    ups_r, ups_theta, ups_phi, gamma = mino_freqs_batch(0.7, 9, 0.4, 0.0)
+    near = mino_freqs_batch(0.7, 9, 0.4, 1e-4)
+    assert np.isfinite(ups_phi)
+    assert np.allclose(ups_r, near[0], rtol=1e-4)
+    assert np.allclose(ups_theta, near[1], rtol=1e-4)
+    assert np.allclose(gamma, near[3], rtol=1e-4)
+
+
+def test_mode_freqs():
+    aa = np.array([0.9, 0.5])
+    slr = np.array([10.0, 12.0])
+    omega_r, omega_theta, omega_phi = boyer_freqs_batch(
+        *mino_freqs_batch(aa, slr, 0.3, 0.5)
+    )
+    em, kay, en = np.arange(-2, 3), np.arange(-1, 2), np.arange(-3, 4)
+    omega = mode_freqs_batch(omega_r, omega_theta, omega_phi, em, kay, en)
+    assert omega.shape == (2, 5, 3, 7)
+    assert np.isclose(
+        omega[1, 4, 0, 5], 2 * omega_phi[1] - omega_theta[1] + 2 * omega_r[1], rtol=1e-15
+    )
+
+    orbit, m, k, n, w = select_modes(omega, em, kay, en, 0.0, 0.05)
+    assert ((w >= 0) & (w <= 0.05)).all()
+    assert (np.diff(orbit) >= 0).all()
+    assert np.allclose(
+        w, m * omega_phi[orbit] + k * omega_theta[orbit] + n * omega_r[orbit], rtol=1e-14
+    )
+    assert len(w) == ((omega >= 0) & (omega <= 0.05)).sum()
+
+
+def test_select_modes_unique():
+    # equatorial-like degeneracy: omega_theta = omega_phi
+    omega = mode_freqs_batch(0.01, 0.03, 0.03, [0, 1], [0, 1], [0])
+    orbit, m, k, n, w = select_modes(omega, [0, 1], [0, 1], [0], unique=True)
+    assert np.allclose(w, [0.0, 0.03, 0.06])
+
+
+def test_redshift_circular_equatorial():
+    aa = np.array([0.0, 0.9, 0.9])
+    slr = np.array([10.0, 10.0, 12.0])
+    x = np.array([1.0, 1.0, -1.0])
+    freqs = mino_freqs_batch(aa, slr, 0.0, x, tau=True)
+    redshift = proper_time_freqs_batch(*freqs)[3]
+    # sqrt(1 - 3 v^2 + 2 a v^3) / (1 + a v^3), v = 1 / sqrt(r), a < 0 retrograde
+    v = 1 / np.sqrt(slr)
+    sa = aa * x
+    redshift_ch = np.sqrt(1 - 3 * v ** 2 + 2 * sa * v ** 3) / (1 + sa * v ** 3)
+    assert np.allclose(redshift, redshift_ch, rtol=1e-14)
+
+
+def test_tau_does_not_change_freqs():
+    aa = np.array([0.0, 1e-4, 0.9, 0.9])
+    slr = np.array([10.0, 9.0, 8.0, 10.0])
+    ecc = np.array([0.4, 0.5, 0.4, 0.3])
+    x = np.array([0.3, 0.6, 0.0, 0.5])
+    freqs = mino_freqs_batch(aa, slr, ecc, x)
+    freqs_tau = mino_freqs_batch(aa, slr, ecc, x, tau=True)
+    assert len(freqs_tau) == 5
+    for f, f_ch in zip(freqs_tau, freqs):
+        assert np.array_equal(f, f_ch)
+
+
+@pytest.mark.parametrize(
+    "aa, slr, ecc, x",
+    [
+        (0.9, 10.0, 0.3, -0.5),  # generic retrograde
+        (0.5, 12.0, 0.6, -0.7),
+        (0.9, 12.0, 0.2, -1.0),  # equatorial retrograde
+        (0.0, 10.0, 0.3, -0.5),  # SC retrograde
+    ],
+)
+def test_retrograde_matches_scalar(aa, slr, ecc, x):
+    freqs = mino_freqs_batch(aa, slr, ecc, x)
+    freqs_ch = [float(v) for v in calc_mino_freqs(aa, slr, ecc, x)]
+    assert freqs[1] > 0
+    assert np.allclose(freqs, freqs_ch, rtol=1e-13)
+    omega_ch = [float(v) for v in calc_boyer_freqs(aa, slr, ecc, x)]
+    assert np.allclose(boyer_freqs_batch(*freqs), omega_ch, rtol=1e-13)
+
+
+def test_mode_freqs_match_find_omega():
+    aa, slr, ecc, x = 0.9, 10.0, 0.3, -0.5  # retrograde
+    en, em, kay = np.arange(-2, 3), np.arange(-2, 3), np.array([-2, 1, 3])
+    omega = calc_mode_freqs_batch(en, em, kay, aa, slr, ecc, x)
+    for i, m in enumerate(em):
+        for j, k in enumerate(kay):
+            for l, n in enumerate(en):
+                omega_ch = float(find_omega(n, m, k, aa, slr, ecc, x))
+                assert np.isclose(omega[i, j, l], omega_ch, rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize("x", [0.5, -0.5])
+def test_mino_coords_geodesic_eqs(x):
+    # the positive ups_theta of retrograde orbits is the one for which the
+    # scalar coordinates solve the geodesic equations in Mino time
+    aa, slr, ecc = 0.9, 10.0, 0.3
+    En, Lz, Q = (float(v) for v in calc_consts(aa, slr, ecc, x))
+    assert calc_mino_freqs(aa, slr, ecc, x)[1] > 0
+    h = 1e-4
+    for lam in (0.3, 1.7):
+        coords = [
+            [float(v) for v in mino_coords(m, aa, slr, ecc, x, qr0=0.4, qz0=0.2)]
+            for m in (lam - h, lam, lam + h)
+        ]
+        (t0, r0, th0, ph0), (t, r, th, ph), (t1, r1, th1, ph1) = coords
+        delta = r * r - 2 * r + aa * aa
+        P = En * (r * r + aa * aa) - aa * Lz
+        s2 = np.sin(th) ** 2
+        R = P * P - delta * (r * r + (Lz - aa * En) ** 2 + Q)
+        Theta = Q - np.cos(th) ** 2 * (aa * aa * (1 - En * En) + Lz * Lz / s2)
+        dt = (r * r + aa * aa) * P / delta - aa * (aa * En * s2 - Lz)
+        dphi = aa * P / delta - aa * En + Lz / s2
+        assert np.isclose((t1 - t0) / (2 * h), dt, rtol=1e-6)
+        assert np.isclose((ph1 - ph0) / (2 * h), dphi, rtol=1e-6)
+        assert np.isclose(((r1 - r0) / (2 * h)) ** 2, R, rtol=1e-5, atol=1e-6)
+        assert np.isclose(((th1 - th0) / (2 * h)) ** 2, Theta, rtol=1e-5, atol=1e-6)
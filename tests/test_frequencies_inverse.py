@@ -0,0 +1,34 @@
+"""
+Test the inverse Boyer-Lindquist frequency map.
+"""
+import pytest
+import numpy as np
+from geodesic.frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+from geodesic.frequencies_inverse import boyer_freqs_grid, invert_boyer_freqs_batch
+
+
+def test_invert_boyer_freqs():
+    aa = 0.7
+    rng = np.random.default_rng(2)
+    slr = rng.uniform(8.0, 30.0, 200)
+    ecc = rng.uniform(0.05, 0.7, 200)
+    x = rng.uniform(0.1, 0.95, 200) * rng.choice([-1, 1], 200)
+    omegas = boyer_freqs_batch(*mino_freqs_batch(aa, slr, ecc, x))
+    ok = np.isfinite(omegas[0])
+
+    grid = boyer_freqs_grid(aa)
+    slr_ch, ecc_ch, x_ch, converged = invert_boyer_freqs_batch(*omegas, aa, grid=grid)
+    assert converged[ok].all()
+    assert np.allclose(slr_ch[ok], slr[ok], rtol=1e-9)
+    assert np.allclose(ecc_ch[ok], ecc[ok], atol=1e-9)
+    assert np.allclose(x_ch[ok], x[ok], atol=1e-9)
+
+
+def test_invert_boyer_freqs_shape():
+    aa = 0.9
+    slr = np.array([[9.0, 12.0], [15.0, 20.0]])
+    omegas = boyer_freqs_batch(*mino_freqs_batch(aa, slr, 0.3, -0.4))
+    res = invert_boyer_freqs_batch(*omegas, aa)
+    assert all(v.shape == (2, 2) for v in res)
+    assert res[3].all()
+    assert np.allclose(res[0], slr, rtol=1e-9)
@@ -0,0 +1,28 @@
+"""
+Test the quadrature frequency engine against the elliptic closed forms.
+"""
+import pytest
+import numpy as np
+from geodesic.frequencies_batch import mino_freqs_batch
+from geodesic.frequencies_quad import mino_freqs_quad_batch
+
+# generic, SC, polar, equatorial, spherical, circular equatorial, high ecc
+aa = np.array([0.9, 0.0, 0.9, 0.9, 0.7, 0.9, 0.99, 0.3])
+slr = np.array([10.0, 10.0, 8.0, 10.0, 12.0, 10.0, 6.0, 20.0])
+ecc = np.array([0.3, 0.4, 0.4, 0.3, 0.0, 0.0, 0.8, 0.9])
+x = np.array([0.5, 0.3, 0.0, 1.0, 0.4, 1.0, 0.6, -0.9])
+
+
+def test_quad_matches_closed_form():
+    freqs = np.array(mino_freqs_batch(aa, slr, ecc, x))
+    freqs_quad = np.array(mino_freqs_quad_batch(aa, slr, ecc, x, n=128))
+    assert np.allclose(freqs_quad, freqs, rtol=1e-12, atol=0)
+
+
+def test_quad_converges():
+    freqs = np.array(mino_freqs_batch(aa, slr, ecc, x))
+    errors = [
+        abs(np.array(mino_freqs_quad_batch(aa, slr, ecc, x, n=n)) / freqs - 1).max()
+        for n in (8, 16, 32)
+    ]
+    assert errors[0] > errors[1] > errors[2]
@@ -0,0 +1,53 @@
+"""
+Test the memory-mapped grid store.
+"""
+import pytest
+import numpy as np
+from geodesic.frequencies_batch import mino_freqs_batch
+from geodesic.grid_store import build_grid_store, load_grid_store, grid_store_lookup
+
+aa = np.array([0.5, 0.9])
+slr = np.linspace(10, 14, 9)
+ecc = np.linspace(0.1, 0.3, 5)
+x = np.linspace(0.2, 0.8, 7)
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("grid"))
+    build_grid_store(path, aa, slr, ecc, x)
+    return load_grid_store(path)
+
+
+def test_store_is_mapped(store):
+    assert isinstance(store["ups_r"], np.memmap)
+    assert store["ups_r"].shape == (2, 9, 5, 7)
+    for axis, ref in zip(store["axes"], (aa, slr, ecc, x)):
+        assert np.array_equal(axis, ref)
+
+
+def test_store_lookup(store):
+    # grid points are returned exactly
+    freqs = mino_freqs_batch(aa[1], slr[3], ecc[2], x[4])
+    for method in ("linear", "nearest"):
+        values = grid_store_lookup(
+            store, ["ups_r", "gamma"], aa[1], slr[3], ecc[2], x[4], method=method
+        )
+        assert np.allclose(values, [freqs[0], freqs[3]], rtol=1e-15)
+    # interpolation between grid points
+    value = grid_store_lookup(store, ["ups_theta"], 0.7, 11.3, 0.17, 0.5)[0]
+    assert np.isclose(value, mino_freqs_batch(0.7, 11.3, 0.17, 0.5)[1], rtol=1e-3)
+    # outside the grid
+    assert np.isnan(grid_store_lookup(store, ["En"], 0.7, 15.0, 0.2, 0.5)[0])
+
+
+def test_store_lookup_single_point_axis(tmp_path):
+    # a length-1 axis only matches its own value
+    path = str(tmp_path)
+    build_grid_store(path, [0.9], slr[::4], ecc[::2], x[::3])
+    store = load_grid_store(path)
+    for method in ("linear", "nearest"):
+        value = grid_store_lookup(
+            store, ["En"], [0.5, 0.9], 11.0, 0.2, 0.5, method=method
+        )[0]
+        assert np.isnan(value[0]) and np.isfinite(value[1])
@@ -0,0 +1,43 @@
+"""
+Test the inverse map from the constants of motion to the orbit parameters.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.geo_roots import radial_roots_batch, polar_roots_batch, inverse_roots_batch
+
+
+@pytest.mark.parametrize(
+    "aa, slr, ecc, x",
+    [
+        (0.9, 10.0, 0.3, 0.5),  # generic
+        (0.5, 12.0, 0.6, -0.7),  # generic retrograde
+        (0.0, 10.0, 0.2, 0.4),  # SC
+        (0.9, 8.0, 0.4, 0.0),  # polar
+        (0.9, 8.0, 0.4, 1.0),  # equatorial
+        (0.7, 12.0, 0.5, -1.0),  # equatorial retrograde
+    ],
+)
+def test_inverse_roots(aa, slr, ecc, x):
+    En, Lz, Q = calc_constants_batch(aa, slr, ecc, x)
+    r1, r2, r3, r4 = radial_roots_batch(En, Q, aa, slr, ecc)
+    zp, zm = polar_roots_batch(En, Lz, Q, aa, x)
+    res = inverse_roots_batch(En, Lz, Q, aa)
+    ref = (slr, ecc, x, r1, r2, r3, r4, zp, zm)
+    assert np.allclose(res, ref, rtol=1e-10, atol=1e-10)
+
+
+def test_inverse_roots_circular():
+    # r1 = r2 is a double root, so only about half the digits survive
+    En, Lz, Q = calc_constants_batch(0.9, 10.0, 0.0, 0.5)
+    slr, ecc, x = inverse_roots_batch(En, Lz, Q, 0.9)[:3]
+    assert np.allclose((slr, ecc, x), (10.0, 0.0, 0.5), atol=1e-6)
+
+
+def test_inverse_roots_shape():
+    aa = np.full((2, 3), 0.6)
+    slr = np.linspace(8.0, 14.0, 6).reshape(2, 3)
+    En, Lz, Q = calc_constants_batch(aa, slr, 0.3, 0.4)
+    res = inverse_roots_batch(En, Lz, Q, aa)
+    assert all(v.shape == (2, 3) for v in res)
+    assert np.allclose(res[0], slr, rtol=1e-10)
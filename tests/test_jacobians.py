@@ -0,0 +1,91 @@
+"""
+Test the analytic Jacobians against finite differences.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+from geodesic.jacobians import (
+    constants_jacobian_batch,
+    mino_freqs_jacobian_batch,
+    boyer_freqs_jacobian_batch,
+)
+
+aa = np.array([0.9, 0.3, 0.6, 0.5])
+slr = np.array([8.0, 12.0, 15.0, 10.0])
+ecc = np.array([0.3, 0.6, 0.1, 0.2])
+x = np.array([0.5, -0.7, 0.95, 0.1])
+
+
+def boyer(*args):
+    return boyer_freqs_batch(*mino_freqs_batch(*args))
+
+
+def finite_difference(func, k, h=2e-3):
+    # fourth order central difference in parameter k
+    def f(step):
+        args = [aa, slr, ecc, x]
+        args[k] = args[k] + step
+        return np.array(func(*args)).T
+
+    return (-f(2 * h) + 8 * f(h) - 8 * f(-h) + f(-2 * h)) / (12 * h)
+
+
+@pytest.mark.parametrize(
+    "jac_func, func, n",
+    [
+        (constants_jacobian_batch, calc_constants_batch, 3),
+        (mino_freqs_jacobian_batch, mino_freqs_batch, 4),
+        (boyer_freqs_jacobian_batch, boyer, 3),
+    ],
+)
+def test_jacobian_matches_finite_difference(jac_func, func, n):
+    *values, jac = jac_func(aa, slr, ecc, x)
+    assert jac.shape == (4, n, 4)
+    assert np.allclose(np.array(values).T, np.array(func(aa, slr, ecc, x)).T, rtol=1e-13)
+    for k in range(4):
+        fd = finite_difference(func, k)
+        assert np.allclose(jac[..., k], fd, rtol=1e-7, atol=1e-7 * abs(fd).max())
+
+
+def test_constants_jacobian_all_classes():
+    # SC, circular, equatorial (both senses) and polar orbits, against one
+    # sided differences at the boundaries ecc = 0, x^2 = 1 and aa = 0
+    orbits = np.array(
+        [
+            [0.0, 10.0, 0.3, 0.5],
+            [0.9, 10.0, 0.0, 0.5],
+            [0.9, 10.0, 0.3, 1.0],
+            [0.9, 10.0, 0.3, -1.0],
+            [0.9, 10.0, 0.3, 0.0],
+            [0.5, 9.0, 0.0, 0.0],
+        ]
+    )
+    *__, jac = constants_jacobian_batch(*orbits.T)
+    assert np.isfinite(jac).all()
+    assert np.allclose(jac[orbits[:, 2] == 0, :, 2], 0, atol=1e-12)
+    h = 1e-4
+    for orbit, jac_orbit in zip(orbits, jac):
+        for k in range(4):
+            def f(step):
+                return np.array(calc_constants_batch(*(orbit + step * np.eye(4)[k])))
+
+            if k in (0, 2) and orbit[k] == 0 or k == 3 and orbit[k] ** 2 == 1:
+                # second order one-sided difference, into the domain
+                step = -np.sign(orbit[k]) * h if k == 3 else h
+                fd = (-3 * f(0) + 4 * f(step) - f(2 * step)) / (2 * step)
+            else:
+                fd = (f(h) - f(-h)) / (2 * h)
+            assert np.allclose(jac_orbit[:, k], fd, rtol=1e-6, atol=1e-6)
+
+
+def test_non_generic_frequency_jacobians_raise():
+    for args in [(0.0, 10.0, 0.2, 0.5), (0.9, 10.0, 0.0, 0.5), (0.9, 10.0, 0.2, 1.0)]:
+        with pytest.raises(ValueError):
+            mino_freqs_jacobian_batch(*args)
+        with pytest.raises(ValueError):
+            boyer_freqs_jacobian_batch(*args)
+    # unbound generic orbits are nan throughout
+    *values, jac = mino_freqs_jacobian_batch(0.9, [10.0, 3.0], 0.3, 0.5)
+    assert np.isnan(jac[1]).all() and np.isnan(np.array(values)[:, 1]).all()
+    assert np.isfinite(jac[0]).all()
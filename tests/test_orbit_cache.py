@@ -0,0 +1,96 @@
+"""
+Test the per-orbit state cache.
+"""
+import threading
+
+import pytest
+import numpy as np
+import geodesic.orbit_cache
+from geodesic.geodesic import calc_boyer_freqs, calc_consts, mino_coords
+from geodesic.orbit_cache import (
+    OrbitCache,
+    compute_orbit_state,
+    orbit_key,
+    enable_orbit_cache,
+    disable_orbit_cache,
+    orbit_cache_info,
+)
+
+
+@pytest.fixture
+def cache():
+    yield enable_orbit_cache(maxsize=8)
+    disable_orbit_cache()
+
+
+def test_orbit_key():
+    key = orbit_key(np.float64(0.9), 10, 0.3, -0.0, qr0=2 * np.pi, qz0=-0.0)
+    assert key == (0.9, 10.0, 0.3, 0.0, 0.0, 0.0)
+    assert all(type(v) is float for v in key)
+
+
+def test_cached_results(cache):
+    args = (0.9, 10.0, 0.3, 0.5)
+    omegas = calc_boyer_freqs(*args)
+    assert calc_boyer_freqs(*args) == omegas
+    assert calc_consts(*args) == calc_consts(np.float64(0.9), 10, 0.3, 0.5)
+    assert orbit_cache_info()["hits"] == 3
+    assert orbit_cache_info()["misses"] == 1
+    disable_orbit_cache()
+    assert calc_boyer_freqs(*args) == pytest.approx(omegas, rel=1e-14)
+    assert orbit_cache_info() is None
+
+
+def test_cached_phases(cache):
+    coords = mino_coords(1.0, 0.9, 10.0, 0.3, 0.5, qr0=0.5, qz0=0.3)
+    assert mino_coords(1.0, 0.9, 10.0, 0.3, 0.5, qr0=0.5, qz0=0.3) == coords
+    state = compute_orbit_state(0.9, 10.0, 0.3, 0.5, qr0=0.5, qz0=0.3)
+    assert state["Ct"] != 0 and state["Cz"] != 0
+
+
+def test_uncached_coords(monkeypatch):
+    args = (0.9, 10.0, 0.3, 0.5)
+    with_cache = enable_orbit_cache()
+    coords = mino_coords(1.0, *args, qr0=0.5, qz0=0.3)
+    disable_orbit_cache()
+
+    # with the cache off, the full state (complete integrals, Ct, Cz) is skipped
+    def fail(*args, **kwargs):
+        raise AssertionError("compute_orbit_state called")
+
+    monkeypatch.setattr(geodesic.orbit_cache, "compute_orbit_state", fail)
+    coords_ch = mino_coords(1.0, *args, qr0=0.5, qz0=0.3)
+    assert coords_ch == pytest.approx(coords, rel=1e-14)
+    assert with_cache.info()["misses"] == 1
+
+
+def test_eviction():
+    cache = OrbitCache(maxsize=2)
+    for slr in (10.0, 11.0, 12.0, 10.0):
+        cache.get(0.5, slr, 0.2, 0.7)
+    info = cache.info()
+    assert (info["misses"], info["evictions"], info["currsize"]) == (4, 2, 2)
+    one = info["nbytes"] // 2
+    cache = OrbitCache(max_bytes=int(1.5 * one))
+    cache.get(0.5, 10.0, 0.2, 0.7)
+    cache.get(0.5, 11.0, 0.2, 0.7)
+    assert cache.info()["currsize"] == 1
+
+
+def test_threads():
+    cache = OrbitCache()
+    results = []
+
+    def work():
+        for slr in (10.0, 11.0, 12.0) * 5:
+            results.append(cache.get(0.5, slr, 0.2, 0.7)["ups_r"])
+
+    threads = [threading.Thread(target=work) for __ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    info = cache.info()
+    assert info["hits"] + info["misses"] == 60
+    assert info["currsize"] == 3
+    assert len(set(results)) == 3
@@ -0,0 +1,64 @@
+"""
+Test the per-thread mpmath precision contexts.
+"""
+import threading
+
+import pytest
+import mpmath
+from geodesic.orbit_cache import compute_orbit_state
+from geodesic.frequencies import mino_freqs
+from geodesic.precision import (
+    DEFAULT_PREC,
+    get_precision,
+    set_precision,
+    precision,
+)
+
+args = (0.9, 10.0, 0.3, 0.5)
+state = compute_orbit_state(*args)
+roots = [state[k] for k in ("r1", "r2", "r3", "r4", "En", "Lz", "Q")]
+
+
+def gamma():
+    return mino_freqs(*roots, *args)[3]
+
+
+def test_scoped():
+    assert get_precision() == DEFAULT_PREC
+    with precision(dps=40):
+        assert get_precision() == 136
+        assert gamma().context.prec == 136
+    assert get_precision() == DEFAULT_PREC
+    with pytest.raises(ValueError):
+        set_precision(prec=60, dps=20)
+
+
+def test_global_context_unused():
+    ref = gamma()
+    old = mpmath.mp.dps
+    mpmath.mp.dps = 100
+    try:
+        assert gamma() == ref
+    finally:
+        mpmath.mp.dps = old
+
+
+def test_threads():
+    with precision(prec=53):
+        low = gamma()
+    with precision(prec=200):
+        high = gamma()
+    results = {}
+
+    def work(prec):
+        set_precision(prec=prec)
+        results[prec] = [gamma() for __ in range(5)]
+
+    threads = [threading.Thread(target=work, args=(p,)) for p in (53, 200) * 2]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results[53] == [low] * 5
+    assert results[200] == [high] * 5
+    assert get_precision() == DEFAULT_PREC
@@ -0,0 +1,50 @@
+"""
+Test the r-theta resonance locator.
+"""
+import pytest
+import numpy as np
+from geodesic.frequencies_batch import mino_freqs_batch
+from geodesic.resonances import (
+    calc_separatrix_batch,
+    resonance_slr_batch,
+    trace_resonance,
+)
+
+
+def test_separatrix():
+    slr_sep = calc_separatrix_batch(
+        [0.0, 0.0, 0.9, 0.9], [0.0, 0.5, 0.0, 0.0], [1.0, 0.3, 1.0, -1.0]
+    )
+    # SC: 6 + 2 ecc; Kerr circular equatorial: ISCO radii
+    assert np.allclose(slr_sep, [6.0, 7.0, 2.320883041761887, 8.717352279606276], rtol=1e-11)
+
+
+def test_resonance_slr():
+    aa = np.array([0.0, 0.5, 0.9, 0.9])
+    ecc = np.array([0.2, 0.4, 0.1, 0.6])
+    x = np.array([0.5, -0.3, 0.8, 0.99])
+    pairs = [(3, -2), (2, -1), (4, -3), (1, 1)]
+    slr = resonance_slr_batch(aa, ecc, x, pairs)
+    assert slr.shape == (4, 4)
+    assert np.isnan(slr[:, 3]).all()  # Omega_r / Omega_theta = -1 is not bound
+
+    ups_r, ups_theta, __, __ = mino_freqs_batch(
+        aa[:, None], slr[:, :3], ecc[:, None], x[:, None]
+    )
+    assert np.allclose(ups_r / ups_theta, [2 / 3, 1 / 2, 3 / 4], rtol=1e-13)
+
+
+def test_trace_resonance():
+    ecc = np.linspace(0.05, 0.7, 12)
+    slr = trace_resonance(0.9, ecc, 0.5, 3, -2)
+    slr_ch = resonance_slr_batch(0.9, ecc, 0.5, [(3, -2)])[:, 0]
+    assert np.allclose(slr, slr_ch, rtol=1e-12)
+
+
+def test_trace_resonance_restarts_after_gap():
+    # an unbound point (ecc > 1) has no solution; the curve picks up after it
+    ecc = np.array([0.1, 0.3, 1.2, 0.4, 0.5])
+    slr = trace_resonance(0.9, ecc, 0.5, 3, -2)
+    slr_ch = resonance_slr_batch(0.9, ecc, 0.5, [(3, -2)])[:, 0]
+    assert np.isnan(slr[2]) and np.isnan(slr_ch[2])
+    assert np.allclose(np.delete(slr, 2), np.delete(slr_ch, 2), rtol=1e-12)
@@ -0,0 +1,50 @@
+"""
+Test the SQLite result cache.
+"""
+import pytest
+import numpy as np
+from geodesic.geodesic import calc_boyer_freqs
+from geodesic.result_cache import (
+    open_result_cache,
+    cached_constants,
+    cached_boyer_freqs,
+    purge,
+    default_version,
+)
+
+slr = np.array([10.0, 11.0, 12.0])
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = open_result_cache(str(tmp_path / "cache.sqlite"))
+    yield conn
+    conn.close()
+
+
+def count(conn):
+    return conn.execute("SELECT count(*) FROM results").fetchone()[0]
+
+
+def test_round_trip(conn):
+    omegas = cached_boyer_freqs(conn, 0.9, slr, 0.3, 0.5)
+    assert count(conn) == 3
+    assert np.array_equal(cached_boyer_freqs(conn, 0.9, slr, 0.3, 0.5), omegas)
+    assert count(conn) == 3
+    assert omegas[2][1] == calc_boyer_freqs(0.9, slr[1], 0.3, 0.5)[2]
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_keys_are_bit_exact(conn):
+    cached_constants(conn, 0.9, slr, 0.3, 0.5)
+    cached_constants(conn, 0.9, np.nextafter(slr, 20), 0.3, 0.5)
+    assert count(conn) == 6
+
+
+def test_version(conn):
+    cached_boyer_freqs(conn, 0.9, slr, 0.3, 0.5, version="old")
+    cached_boyer_freqs(conn, 0.9, slr, 0.3, 0.5)
+    assert count(conn) == 6
+    assert purge(conn) == 3
+    rows = conn.execute("SELECT DISTINCT version FROM results").fetchall()
+    assert rows == [(default_version(),)]
@@ -0,0 +1,52 @@
+"""
+Test the small-spin expansion of the constants and Mino frequencies.
+
+The expansion is compared with the Kerr expressions at spins where those are
+accurate, and with the SC expressions at aa = 0.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.frequencies_batch import mino_freqs_batch, mino_freqs_sc_batch
+from geodesic.frequencies_pert import (
+    constants_small_spin,
+    mino_freqs_small_spin,
+)
+
+slr = np.array([10.0, 10.0, 12.0, 8.0, 10.0, 15.0])
+ecc = np.array([0.3, 0.0, 0.5, 0.1, 0.3, 0.6])
+x = np.array([0.5, -0.7, 1.0, -1.0, 0.3, 0.9])
+
+
+def test_small_spin_sc_limit():
+    freqs = mino_freqs_small_spin(0.0, slr, ecc, x)
+    freqs_sc = mino_freqs_sc_batch(slr, ecc, x)
+    for f, f_sc in zip(freqs, freqs_sc):
+        assert np.allclose(f, f_sc, rtol=1e-14, atol=0)
+
+
+@pytest.mark.parametrize("aa", [1e-3, 1e-2])
+def test_small_spin_constants(aa):
+    consts = constants_small_spin(aa, slr, ecc, x, order=6)
+    consts_kerr = calc_constants_batch(aa, slr, ecc, x)
+    for c, c_kerr in zip(consts, consts_kerr):
+        assert np.allclose(c, c_kerr, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("aa", [1e-3, 1e-2])
+def test_small_spin_freqs(aa):
+    freqs = mino_freqs_small_spin(aa, slr, ecc, x, order=6)
+    freqs_kerr = mino_freqs_batch(aa, slr, ecc, x)
+    for f, f_kerr in zip(freqs, freqs_kerr):
+        assert np.allclose(f, f_kerr, rtol=1e-12, atol=0)
+
+
+def test_small_spin_order_convergence():
+    aa = 0.05
+    freqs_kerr = mino_freqs_batch(aa, slr, ecc, x)
+    errs = []
+    for order in [1, 3, 5]:
+        freqs = mino_freqs_small_spin(aa, slr, ecc, x, order)
+        errs.append(max(np.max(abs(f - fk) / abs(fk)) for f, fk in zip(freqs, freqs_kerr)))
+    assert errs[0] > errs[1] > errs[2]
+
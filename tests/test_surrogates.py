@@ -0,0 +1,66 @@
+"""
+Test the Chebyshev surrogates against the closed-form frequencies.
+"""
+import pytest
+import numpy as np
+from geodesic.constants.constants import calc_constants_batch
+from geodesic.frequencies_batch import mino_freqs_batch, boyer_freqs_batch
+from geodesic.resonances import calc_separatrix_batch
+from geodesic.surrogates import (
+    build_surrogate,
+    eval_surrogate,
+    eval_surrogate_boyer,
+    save_surrogate,
+    load_surrogate,
+    surrogate_error,
+)
+
+aa = 0.9
+dslr, ecc, x = (1.0, 10.0), (0.1, 0.4), (0.3, 0.8)
+tol = 1e-8
+
+
+@pytest.fixture(scope="module")
+def sur():
+    return build_surrogate(aa, dslr, ecc, x, tol=tol, n=8)
+
+
+@pytest.fixture(scope="module")
+def orbits():
+    rng = np.random.default_rng(1)
+    e = rng.uniform(*ecc, 200)
+    z = rng.uniform(*x, 200)
+    slr = calc_separatrix_batch(aa, e, z) + rng.uniform(*dslr, 200)
+    return slr, e, z
+
+
+def test_surrogate_accuracy(sur, orbits):
+    slr, e, z = orbits
+    exact = mino_freqs_batch(aa, slr, e, z) + calc_constants_batch(aa, slr, e, z)
+    approx = eval_surrogate(sur, slr, e, z)
+    for value, ref in zip(approx, exact):
+        assert abs(value - ref).max() <= 2 * tol * abs(ref).max()
+    assert max(surrogate_error(sur).values()) <= tol
+    assert sur["converged"].all()
+    omegas = boyer_freqs_batch(*exact[:4])
+    assert np.allclose(eval_surrogate_boyer(sur, slr, e, z), omegas, rtol=1e-7)
+
+
+def test_surrogate_round_trip(sur, orbits, tmp_path):
+    path = str(tmp_path / "sur.npz")
+    save_surrogate(path, sur)
+    loaded = load_surrogate(path)
+    assert np.array_equal(eval_surrogate(loaded, *orbits), eval_surrogate(sur, *orbits))
+
+
+def test_surrogate_outside_domain(sur):
+    assert np.isnan(eval_surrogate(sur, 12.0, 0.6, 0.5)).all()
+    with pytest.raises(ValueError):
+        build_surrogate(aa, (0.0, 10.0), ecc, x)
+
+
+def test_surrogate_not_converged():
+    # cells accepted at max_depth with an error above tol are flagged
+    sur = build_surrogate(aa, dslr, ecc, x, tol=1e-14, n=4, max_depth=1)
+    assert len(sur["converged"]) == 2 and not sur["converged"].any()
+    assert max(surrogate_error(sur).values()) > 1e-14
@@ -0,0 +1,99 @@
+"""
+Test the process-pool sweep runner.
+"""
+import pytest
+import numpy as np
+from geodesic.geodesic import calc_mino_freqs, calc_consts, mino_coords
+from geodesic.sweep import (
+    sweep,
+    trajectories,
+    trajectory,
+    orbit_class,
+    _chunks,
+    SharedArray,
+)
+
+# SC, polar, equatorial, spherical, generic, and an SC orbit with slr < 6
+aa = np.array([0.0, 0.9, 0.9, 0.9, 0.9, 0.0, 0.5])
+slr = np.array([10.0, 10.0, 10.0, 10.0, 10.0, 5.0, 11.0])
+ecc = np.array([0.3, 0.3, 0.3, 0.0, 0.3, 0.2, 0.1])
+x = np.array([0.5, 0.0, 1.0, 0.5, 0.5, 0.5, 0.7])
+
+
+def test_chunks():
+    cls = orbit_class(aa, slr, ecc, x)
+    assert list(cls) == [0, 1, 2, 3, 4, 0, 4]
+    chunks = _chunks(np.repeat(cls, 10), 4)
+    assert sorted(np.concatenate(chunks)) == list(range(70))
+    for chunk in chunks:
+        assert len(set(np.repeat(cls, 10)[chunk])) == 1
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_sweep(processes):
+    results, errors = sweep(
+        aa, slr, ecc, x, outputs=("mino_freqs", "constants"), processes=processes
+    )
+    assert [i for i, __ in errors] == [5]
+    assert "SystemExit" in errors[0][1]
+    for i in (0, 1, 2, 3, 4, 6):
+        args = aa[i], slr[i], ecc[i], x[i]
+        for name, func in (("mino_freqs", calc_mino_freqs), ("constants", calc_consts)):
+            ref = [float(v) for v in func(*args)]
+            assert np.allclose([v[i] for v in results[name]], ref, rtol=1e-14)
+    assert np.isnan([v[5] for v in results["mino_freqs"]]).all()
+
+
+def test_shared_array_views():
+    with SharedArray((3, 2)) as shared:
+        view = shared.array[1:]
+    # still mapped for the view after close
+    assert shared.array is None
+    assert np.isnan(view).all()
+    view[:] = 1.0
+    assert view.sum() == 4.0
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_trajectories(processes):
+    lam = np.linspace(0, 5, 4)
+    orbits = ([0.9, 0.0, 0.5], [10.0, 5.0, 12.0], [0.3, 0.2, 0.2], [0.5, 0.5, 0.7])
+    with SharedArray((3, 4, 4)) as out:
+        coords, errors = trajectories(lam, *orbits, processes=processes, out=out)
+        assert coords is out.array
+        assert [i for i, __ in errors] == [1]
+        assert np.isnan(coords[1]).all()
+        for i in (0, 2):
+            for j, m in enumerate(lam):
+                ref = mino_coords(m, *(v[i] for v in orbits))
+                assert np.allclose(coords[i, j], ref, rtol=1e-12, atol=1e-12)
+    # the result outlives the block
+    expected = coords.copy()
+    coords, __ = trajectories(lam, *orbits, processes=processes)
+    assert np.array_equal(coords, expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("processes, threads", [(1, False), (2, False), (3, True)])
+@pytest.mark.parametrize("backend", ["float64", "mpmath"])
+def test_trajectory(processes, threads, backend):
+    lam = np.linspace(0, 20, 9)
+    args = (0.9, 10.0, 0.3, 0.5)
+    coords = trajectory(
+        lam,
+        *args,
+        qr0=0.4,
+        qz0=0.2,
+        processes=processes,
+        threads=threads,
+        backend=backend,
+    )
+    ref = [mino_coords(m, *args, qr0=0.4, qz0=0.2) for m in lam]
+    if backend == "mpmath":
+        assert np.array_equal(coords, ref)
+    else:
+        assert np.allclose(coords, ref, rtol=1e-12, atol=1e-12)
+
+
+def test_trajectory_not_generic():
+    with pytest.raises(ValueError):
+        trajectory([0.0, 1.0], 0.9, 10.0, 0.0, 0.5, processes=1)